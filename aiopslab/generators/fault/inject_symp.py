@@ -7,8 +7,9 @@ import threading
 import time
 import yaml
 from typing import List
-from aiopslab.service.helm import Helm
 from aiopslab.service.kubectl import KubeCtl
+from aiopslab.service.infra import ChaosMesh
+from aiopslab.utils.run_scope import run_scoped
 from aiopslab.generators.fault.base import FaultInjector
 
 class SymptomFaultInjector(FaultInjector):
@@ -16,31 +17,11 @@ class SymptomFaultInjector(FaultInjector):
         super().__init__(namespace)
         self.namespace = namespace
         self.kubectl = KubeCtl()
-        self.kubectl.create_namespace_if_not_exist("chaos-mesh")
-        Helm.add_repo("chaos-mesh", "https://charts.chaos-mesh.org")
-        chaos_configs = {
-            "release_name": "chaos-mesh",
-            "chart_path": "chaos-mesh/chaos-mesh",
-            "namespace": "chaos-mesh",
-            "version": "2.6.2",
-        }
-
-        container_runtime = self.kubectl.get_container_runtime()
-
-        if "docker" in container_runtime:
-            pass
-        elif "containerd" in container_runtime:
-            chaos_configs["extra_args"] = [
-                "--set chaosDaemon.runtime=containerd",
-                "--set chaosDaemon.socketPath=/run/containerd/containerd.sock",
-            ]
-        else:
-            raise ValueError(f"Unsupported container runtime: {container_runtime}")
-
-        Helm.install(**chaos_configs)
+        # No-op when the infrastructure manager already keeps Chaos Mesh installed
+        ChaosMesh().deploy()
 
     def create_chaos_experiment(self, experiment_yaml: dict, experiment_name: str):
-        chaos_yaml_path = f"/tmp/{experiment_name}.yaml"
+        chaos_yaml_path = f"/tmp/{run_scoped(experiment_name)}.yaml"
         with open(chaos_yaml_path, "w") as file:
             yaml.dump(experiment_yaml, file)
         command = f"kubectl apply -f {chaos_yaml_path}"
@@ -48,7 +29,7 @@ class SymptomFaultInjector(FaultInjector):
         print(f"Applied {experiment_name} chaos experiment: {result}")
 
     def delete_chaos_experiment(self, experiment_name: str):
-        chaos_yaml_path = f"/tmp/{experiment_name}.yaml"
+        chaos_yaml_path = f"/tmp/{run_scoped(experiment_name)}.yaml"
         command = f"kubectl delete -f {chaos_yaml_path}"
         result = self.kubectl.exec_command(command)
         print(f"Cleaned up chaos experiment: {result}")
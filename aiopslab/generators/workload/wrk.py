@@ -3,9 +3,10 @@
 
 """Interface to the wrk workload generator."""
 
-from kubernetes import client, config
+from kubernetes import client
 from aiopslab.paths import BASE_DIR
-from aiopslab.config import get_kube_context
+from aiopslab.service.kube_client import get_api_client
+from aiopslab.utils.run_scope import run_scoped
 import yaml
 import time
 
@@ -19,8 +20,7 @@ class Wrk:
         self.threads = threads
         self.latency = latency
 
-        kube_context = get_kube_context()
-        config.load_kube_config(context=kube_context)
+        self.api_client = get_api_client()
     
     
     def create_configmap(self, name, namespace, payload_script_path):
@@ -32,7 +32,7 @@ class Wrk:
             data={payload_script_path.name: script_content},
         )
 
-        api_instance = client.CoreV1Api()
+        api_instance = client.CoreV1Api(self.api_client)
         try:
             print(f"Checking for existing ConfigMap '{name}'...")
             api_instance.delete_namespaced_config_map(name=name, namespace=namespace)
@@ -49,7 +49,7 @@ class Wrk:
         except client.exceptions.ApiException as e:
             print(f"Error creating ConfigMap '{name}': {e}")
 
-    def create_wrk_job(self, job_name, namespace, payload_script, url):
+    def create_wrk_job(self, job_name, namespace, payload_script, url, configmap_name="wrk2-payload-script"):
         wrk_job_yaml = BASE_DIR / "generators" / "workload" / "wrk-job-template.yaml"
         with open(wrk_job_yaml, "r") as f:
             job_template = yaml.safe_load(f)
@@ -74,7 +74,7 @@ class Wrk:
         job_template["spec"]["template"]["spec"]["volumes"] = [
             {
                 "name": "wrk2-scripts",
-                "configMap": {"name": "wrk2-payload-script"},
+                "configMap": {"name": configmap_name},
             }
         ]
         job_template["spec"]["template"]["spec"]["containers"][0]["volumeMounts"] = [
@@ -85,7 +85,7 @@ class Wrk:
             }
         ]
 
-        api_instance = client.BatchV1Api()
+        api_instance = client.BatchV1Api(self.api_client)
         try:
             existing_job = api_instance.read_namespaced_job(name=job_name, namespace=namespace)
             if existing_job:
@@ -125,14 +125,16 @@ class Wrk:
 
     def start_workload(self, payload_script, url):
         namespace = "default"
-        configmap_name = "wrk2-payload-script"
+        # Concurrent runs share the default namespace, so scope names per run
+        configmap_name = run_scoped("wrk2-payload-script")
 
         self.create_configmap(name=configmap_name, namespace=namespace, payload_script_path=payload_script)
 
         self.create_wrk_job(
-            job_name="wrk2-job",
+            job_name=run_scoped("wrk2-job"),
             namespace=namespace,
             payload_script=payload_script.name,
-            url=url
+            url=url,
+            configmap_name=configmap_name,
         )
 
@@ -6,9 +6,10 @@ import sys
 import pytz
 from datetime import datetime, timedelta
 
-from kubernetes import config, client
+from kubernetes import client
 from yaml import full_load
-from aiopslab.config import get_kube_context
+from aiopslab.service.informer import InformerCache
+from aiopslab.service.kube_client import get_api_client
 
 root_path = pathlib.Path(__file__).parent
 sys.path.append(root_path)
@@ -19,6 +20,11 @@ with open(root_path / "monitor_config.yaml", "r") as f:
 
 # root_config = full_load(open(root_path / "config.yaml", "r"))
 def get_pod_list(v1, namespace="default"):
+    if InformerCache.enabled:
+        pods = InformerCache.informer("pods", namespace, v1.list_namespaced_pod)
+        if pods.wait_fresh():
+            return [pod.metadata.name for pod in pods.list()]
+
     pod_list = v1.list_namespaced_pod(namespace)
     pod_names = []
     # list the names of all Pods and store their names in the list
@@ -28,6 +34,11 @@ def get_pod_list(v1, namespace="default"):
 
 
 def get_services_list(v1, namespace="default"):
+    if InformerCache.enabled:
+        services = InformerCache.informer("services", namespace, v1.list_namespaced_service)
+        if services.wait_fresh():
+            return [service.metadata.name for service in services.list()]
+
     # get all of the list under certain namespace
     service_list = v1.list_namespaced_service(namespace)
 
@@ -38,8 +49,16 @@ def get_services_list(v1, namespace="default"):
     return services_names
 
 
-config.kube_config.load_kube_config(config_file=monitor_config["kubernetes_path"], context=get_kube_context())
-v1 = client.CoreV1Api()
+def core_v1_api() -> client.CoreV1Api:
+    """CoreV1Api on the shared client of the monitored cluster (built on first use)."""
+    return client.CoreV1Api(get_api_client(config_file=monitor_config["kubernetes_path"]))
+
+
+def __getattr__(name):
+    # `v1` used to be built at import time; it is now created when first accessed
+    if name == "v1":
+        return core_v1_api()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # pod_list = [
 #     pod
@@ -0,0 +1,100 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Adaptive resolution for metric exports.
+
+The export step is picked from a ladder of round values so each series has
+roughly a target number of points, whatever the length of the window. At
+coarse steps, gauges are aggregated server-side with `*_over_time` so short
+spikes are not lost between two samples. Change points found in the coarse
+series mark the windows that are re-fetched at full resolution.
+"""
+
+import numpy as np
+import pandas as pd
+
+from aiopslab.observer.metric_cache import merge_intervals
+
+STEP_LADDER = [15, 30, 60, 120, 300, 600, 900, 1800, 3600, 7200, 21600, 86400]
+
+AGGREGATIONS = {"avg", "max", "min"}
+
+SERIES_KEYS = ["cmdb_id", "kpi_name"]
+
+
+def choose_step(window_seconds: float, target_points: int = 300, min_step: int = 15) -> int:
+    """Return the smallest ladder step (>= min_step) giving at most `target_points` per series."""
+    for step in STEP_LADDER:
+        if step >= min_step and window_seconds / step + 1 <= target_points:
+            return step
+    return max(STEP_LADDER[-1], min_step)
+
+
+def is_counter(metric: str) -> bool:
+    return metric.endswith("_total")
+
+
+def over_time_query(selector: str, metric: str, step: int, aggregation: str | None) -> str:
+    """Wrap a selector in `<aggregation>_over_time` with a range of one step.
+
+    Counters are left as is: their value at the end of a step already accounts
+    for everything that happened during it.
+    """
+    if not aggregation or is_counter(metric):
+        return selector
+    if aggregation not in AGGREGATIONS:
+        raise ValueError(f"Unsupported aggregation: {aggregation}")
+    return f"{aggregation}_over_time({selector}[{step}s])"
+
+
+def change_point_scores(df: pd.DataFrame, counter: bool = False) -> pd.Series:
+    """Score how abruptly the metric changes at each timestamp.
+
+    Each series' step-to-step changes (of its rate, for counters) are turned into
+    z-scores; a timestamp's score is the largest absolute z-score of any series.
+
+    Returns:
+        pd.Series: timestamp -> score, for the timestamps with a finite score.
+    """
+    if df is None or df.empty:
+        return pd.Series(dtype=float)
+
+    df = df.sort_values(SERIES_KEYS + ["timestamp"], kind="stable")
+    keys = [df[column] for column in SERIES_KEYS]
+    signal = df["value"].groupby(keys, observed=True).diff() if counter else df["value"]
+    delta = signal.groupby(keys, observed=True).diff()
+    grouped = delta.groupby(keys, observed=True)
+    z = (delta - grouped.transform("mean")) / grouped.transform("std")
+    z = z.abs().replace([np.inf, -np.inf], np.nan)
+
+    scores = z.groupby(df["timestamp"]).max()
+    return scores.dropna()
+
+
+def detail_windows(
+    scores: pd.Series,
+    threshold: float,
+    pad: float,
+    start: float,
+    end: float,
+    max_windows: int = 10,
+) -> list[tuple[float, float]]:
+    """Turn the strongest change points (score above `threshold`) into merged time windows."""
+    points = scores[scores > threshold].nlargest(max_windows).index
+    windows = [(max(start, t - pad), min(end, t + pad)) for t in points]
+    return merge_intervals([w for w in windows if w[0] < w[1]])
+
+
+def splice(coarse: pd.DataFrame | None, fine: pd.DataFrame | None, windows) -> pd.DataFrame | None:
+    """Replace the coarse samples inside `windows` with the full-resolution ones."""
+    if fine is None or fine.empty:
+        return coarse
+    if coarse is None or coarse.empty:
+        return fine
+
+    timestamps = coarse["timestamp"].to_numpy()
+    inside = np.zeros(len(coarse), dtype=bool)
+    for window_start, window_end in windows:
+        inside |= (timestamps >= window_start) & (timestamps <= window_end)
+    combined = pd.concat([coarse[~inside], fine], ignore_index=True)
+    return combined.sort_values(by="timestamp", kind="stable")
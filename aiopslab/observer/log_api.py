@@ -4,20 +4,30 @@
 import json
 import os
 import time
+from contextlib import suppress
 from datetime import datetime, timedelta, timezone
 from ssl import create_default_context
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from typing import Union
-from kubernetes import client, config
 
 import pandas as pd
 from elasticsearch import Elasticsearch
 from elasticsearch.exceptions import ConnectionTimeout
 
-from . import monitor_config, root_path, get_pod_list, get_services_list
-from aiopslab.config import get_kube_context
+from . import monitor_config, root_path, core_v1_api, get_pod_list, get_services_list
 from .utils.extract import merge_csv
 
+# The `_source` fields read by log_processing_hotel_reservation
+HOTEL_RESERVATION_LOG_FIELDS = [
+    "@timestamp",
+    "message",
+    "kubernetes.pod.name",
+    "kubernetes.container.name",
+    "kubernetes.namespace",
+    "kubernetes.node.name",
+]
+
 
 class LogAPI:
     def __init__(self, url: str, username: str, password: str):
@@ -44,9 +54,7 @@ class LogAPI:
 
     def initialize_pod_and_service_lists(self, custom_namespace=None):
         namespace = custom_namespace or monitor_config["namespace"]
-        kube_context = get_kube_context()
-        config.load_kube_config(context=kube_context)
-        v1 = client.CoreV1Api()
+        v1 = core_v1_api()
         pod_list = [
             pod
             for pod in get_pod_list(v1, namespace=namespace)
@@ -78,10 +86,80 @@ class LogAPI:
         else:
             merge_csv(path, csv_list, f"log_{int(time.time())}")
 
+    def _pit_search(self, indices, query, source=None, process=None, page_size=None):
+        """Read every hit matching `query` with a point in time and `search_after`.
+
+        The point in time spans all `indices` and is read in `log_extract_slices`
+        slices concurrently. Each page of hits is passed through `process` as soon
+        as it arrives, so raw hits don't accumulate.
+
+        Args:
+            indices: Index names or patterns.
+            query (dict): The query clause.
+            source (list[str]): Only return these `_source` fields (default: all).
+            process (Callable): Applied to each page's list of hits.
+            page_size (int): Hits per page.
+
+        Returns:
+            list: The processed pages, per slice in timestamp order.
+        """
+        if not indices:
+            return []
+        page_size = page_size or monitor_config.get("log_page_size", 5000)
+        slices = monitor_config.get("log_extract_slices", 4)
+        keep_alive = monitor_config.get("log_pit_keep_alive", "2m")
+        process = process or (lambda hits: hits)
+
+        pit_id = self.elastic.open_point_in_time(
+            index=",".join(sorted(indices)), keep_alive=keep_alive
+        )["id"]
+
+        def scan(slice_id):
+            nonlocal pit_id
+            pages, search_after = [], None
+            while True:
+                kwargs = {}
+                if slices > 1:
+                    kwargs["slice"] = {"id": slice_id, "max": slices}
+                if search_after is not None:
+                    kwargs["search_after"] = search_after
+                if source is not None:
+                    kwargs["source"] = source
+                page = self.elastic.search(
+                    pit={"id": pit_id, "keep_alive": keep_alive},
+                    query=query,
+                    # _shard_doc is the cheapest unique tiebreaker within a point in time
+                    sort=[{"@timestamp": {"order": "asc"}}, {"_shard_doc": "asc"}],
+                    size=page_size,
+                    track_total_hits=False,
+                    **kwargs,
+                )
+                # The id of a point in time may change between searches; use the latest
+                pit_id = page.get("pit_id", pit_id)
+                hits = page["hits"]["hits"]
+                if hits:
+                    pages.append(process(hits))
+                if len(hits) < page_size:
+                    return pages
+                search_after = hits[-1]["sort"]
+
+        try:
+            with ThreadPoolExecutor(max_workers=slices, thread_name_prefix="es-slice") as pool:
+                results = list(pool.map(scan, range(slices)))
+        except BaseException:
+            # Keep the search error; an unclosed point in time expires after keep_alive
+            with suppress(Exception):
+                self.elastic.close_point_in_time(id=pit_id)
+            raise
+
+        try:
+            self.elastic.close_point_in_time(id=pit_id)
+        except ConnectionTimeout as e:
+            print("Connection Timeout:", e)
+        return [page for pages in results for page in pages]
+
     # log data export
     def log_extract_(self, start_time=None, end_time=None):
-        quert_size = 7500
-
         indices = self.elastic.indices.get(index="logstash-*")
         indices = choose_index_template(indices, start_time, end_time)
         print("indices", indices)
@@ -96,52 +174,26 @@ class LogAPI:
             end_time = datetime.fromtimestamp(end_time, tz=timezone.utc).strftime(
                 "%Y-%m-%dT%H:%M:%SZ"
             )
-        # print(start_time, end_time)
-        query = {
-            "size": quert_size,
-            "query": {
-                "range": {"@timestamp": {"gte": start_time, "lte": end_time}}
-                # "bool": {
-                #     "must": [
-                #         {"range": {"@timestamp": {"gte": start_time, "lte": end_time}}}
-                #     ]
-                # }
-            },
-            # "sort": ["_doc"],
-            "sort": [{"@timestamp": {"order": "asc"}}],
-        }
-        data = []
+        query = {"range": {"@timestamp": {"gte": start_time, "lte": end_time}}}
 
         st_time = time.time()
-        for index in indices:
-            try:
-                page = self.elastic.search(index=index, body=query, scroll="15s")
-                # page = self.elastic.search(index="logstash-*", body=query, scroll="15s")
-                # print("Query being sent to Elasticsearch:")
-                # print(json.dumps(query, indent=2))
-                # print("Elasticsearch response:", page)
-                # print(query)
-                data.extend(page["hits"]["hits"])
-                # scroll_id = page["_scroll_id"]
-
-                # while True:
-                #     page = self.elastic.scroll(scroll_id=scroll_id, scroll="15s")
-                #     hits_len = len(page["hits"]["hits"])
-                #     data.extend(page["hits"]["hits"])
-                #     if hits_len < quert_size:
-                #         break
-                #     scroll_id = page["_scroll_id"]
-            except ConnectionTimeout as e:
-                print("Connection Timeout:", e)
-
-        print("search time: ", time.time() - st_time)
-        st_time = time.time()
+        try:
+            frames = self._pit_search(
+                indices,
+                query,
+                source=HOTEL_RESERVATION_LOG_FIELDS,
+                process=log_processing_hotel_reservation,
+            )
+        except ConnectionTimeout as e:
+            print("Connection Timeout:", e)
+            frames = []
+        print("search and process time: ", time.time() - st_time)
 
-        # TODO: extract data
-        # data = log_processing_online_boutique(data)
-        data = log_processing_hotel_reservation(data)
-        print("process time:", time.time() - st_time)
-        return data
+        if not frames:
+            return log_processing_hotel_reservation([])
+        data = pd.concat(frames, ignore_index=True)
+        # Slices come back interleaved
+        return data.sort_values("timestamp", kind="stable").reset_index(drop=True)
 
     def get_log_number_by_day(self, time_select):
         data = []
@@ -219,37 +271,23 @@ class LogAPI:
         start_time = datetime.fromtimestamp(start_time)
         end_time = datetime.fromtimestamp(end_time)
 
-        query_size = 2500
         # Elasticsearch query
         query = {
-            "query": {
-                "bool": {
-                    "must": [
-                        {"range": {"@timestamp": {"gte": start_time, "lte": end_time}}}
-                    ]
-                }
-            },
-            "sort": {"@timestamp": {"order": "asc"}},
-            "size": query_size,
+            "bool": {
+                "must": [
+                    {"range": {"@timestamp": {"gte": start_time, "lte": end_time}}}
+                ]
+            }
         }
         # return Elasticsearch query result
         data = []
 
-        for index in indices:
-            try:
-                page = self.elastic.search(index=index, body=query, scroll="15s")
-                data.extend(page["hits"]["hits"])
-                scroll_id = page["_scroll_id"]
-
-                while True:
-                    page = self.elastic.scroll(scroll_id=scroll_id, scroll="15s")
-                    hits_len = len(page["hits"]["hits"])
-                    data.extend(page["hits"]["hits"])
-                    if hits_len < query_size:
-                        break
-                    scroll_id = page["_scroll_id"]
-            except ConnectionTimeout as e:
-                print("Connection Timeout:", e)
+        try:
+            for hits in self._pit_search(indices, query):
+                data.extend(hits)
+            data.sort(key=lambda hit: hit["sort"])
+        except ConnectionTimeout as e:
+            print("Connection Timeout:", e)
         data = log_for_query_filter(data)
         print("len data", len(data))
         return data
@@ -3,21 +3,40 @@
 
 import os
 import time
-import subprocess
-import socket
-import select
-import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import Union
 from datetime import datetime, timedelta
-from kubernetes import client, config
+from urllib.parse import urlparse
 
 import pandas as pd
 import pytz
+import requests
 from prometheus_api_client import PrometheusConnect
-
-from aiopslab.observer import monitor_config, root_path, get_pod_list, get_services_list
-from aiopslab.config import get_kube_context
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from aiopslab.observer import (
+    monitor_config,
+    root_path,
+    core_v1_api,
+    get_pod_list,
+    get_services_list,
+)
+from aiopslab.observer.downsample import (
+    change_point_scores,
+    choose_step,
+    detail_windows,
+    is_counter,
+    over_time_query,
+    splice,
+)
+from aiopslab.observer.metric_cache import MetricCache, merge_intervals, metric_cache
+from aiopslab.observer.prom_decode import decode_matrix, matrix_to_frame, to_local_times
+from aiopslab.observer.telemetry_store import TelemetryWriter
+from aiopslab.service.port_forward import port_forwards
+
+PROMETHEUS_TARGET = ("observe", "svc/prometheus-server", 80)
 
 normal_metrics = [
     # cpu
@@ -137,110 +156,66 @@ def network_kpi_name_format(metric):
 
 class PrometheusAPI:
     # disable_ssl – (bool) if True, will skip prometheus server's http requests' SSL certificate
-    def __init__(self, url: str, namespace: str):
+    def __init__(self, url: str, namespace: str, max_workers: int | None = None):
         self.namespace = namespace
-        self.output_threads = []
-        self.port = self.find_free_port()
-        self.port_forward_process = None
-        self.stop_event = threading.Event()
+        self.port = None
         self.start_port_forward()
-        self.client = PrometheusConnect(url, disable_ssl=True)
+        self.max_workers = max_workers or monitor_config.get("metric_export_workers", 8)
+        self.session = requests.Session()
+        self.session.verify = False
+        self.client = PrometheusConnect(
+            self._local_url(url), disable_ssl=True, session=self.session
+        )
+        # Mounted after PrometheusConnect, which installs its own small-pool adapter for the url
+        self.session.mount(self.client.url, self._create_adapter())
+        self.export_stats = {}
         self.namespace = namespace
         self.pod_list, self.service_list = self.initialize_pod_and_service_lists(
             namespace
         )
     
-    def is_port_in_use(self, port):
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            return s.connect_ex(("127.0.0.1", port)) == 0
-    
-    def find_free_port(self, start=32000, end=32100):
-        for port in range(start, end):
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                if s.connect_ex(("127.0.0.1", port)) != 0:
-                    return port
-        raise RuntimeError("No free ports available in the range.")
-
-    def print_output(self, stream):
-        """Thread function to print output from a subprocess stream non-blockingly."""
-        while not self.stop_event.is_set():
-            ready, _, _ = select.select([stream], [], [], 0.1)
-            if ready:
-                try:
-                    line = stream.readline()
-                    if line:
-                        print(line, end="")
-                    else:
-                        break
-                except ValueError:
-                    break
+    def _local_url(self, url):
+        """Point a localhost Prometheus URL at the port-forward's local port."""
+        parsed = urlparse(url)
+        if parsed.hostname in ("localhost", "127.0.0.1"):
+            return parsed._replace(netloc=f"{parsed.hostname}:{self.port}").geturl()
+        return url
+
+    def _create_adapter(self):
+        """HTTP adapter with a connection pool sized for the export workers."""
+        return HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.max_workers,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=1,
+                status_forcelist=[408, 429, 500, 502, 503, 504],
+                allowed_methods=["GET", "POST"],
+            ),
+        )
 
     def start_port_forward(self):
-        """Starts port-forwarding to access Prometheus."""
-        if self.port_forward_process and self.port_forward_process.poll() is None:
-            print("Port-forwarding already active.")
-            return
-        
-        for attempt in range(3):
-            if self.is_port_in_use(self.port):
-                print(
-                    f"Port {self.port} is already in use. Attempt {attempt + 1} of 3. Retrying in 3 seconds..."
-                )
-                time.sleep(3)
-                continue
-
-            command = f"kubectl port-forward svc/prometheus-server {self.port}:80 -n observe"
-            self.port_forward_process = subprocess.Popen(
-                command,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-
-            thread_out = threading.Thread(
-                target=self.print_output, args=(self.port_forward_process.stdout,)
-            )
-            thread_err = threading.Thread(
-                target=self.print_output, args=(self.port_forward_process.stderr,)
-            )
-            thread_out.start()
-            thread_err.start()
-            self.output_threads.extend([thread_out, thread_err])
-
-            time.sleep(3)  # Wait a bit for the port-forward to establish
-
-            if self.port_forward_process.poll() is None:
-                print("Port forwarding established successfully.")
-                break
-            else:
-                print("Port forwarding failed. Retrying...")
+        """Acquires the shared port-forward to Prometheus."""
+        if self.port is None:
+            self.port = port_forwards.acquire(*PROMETHEUS_TARGET)
+
+    def ensure_port_forward(self):
+        """Health-checks the port-forward, re-acquiring it after `cleanup` and reconnecting
+        (and re-pointing the client) if needed."""
+        if self.port is None:
+            port = port_forwards.acquire(*PROMETHEUS_TARGET)
         else:
-            print("Failed to establish port forwarding after multiple attempts.")
+            port = port_forwards.ensure(*PROMETHEUS_TARGET)
+        if port != self.port:
+            self.port = port
+            self.client.url = self._local_url(self.client.url)
+            self.session.mount(self.client.url, self._create_adapter())
 
     def stop_port_forward(self):
-        """Stops the kubectl port-forward command and cleans up resources."""
-        if self.port_forward_process:
-            self.port_forward_process.terminate()
-            try:
-                self.port_forward_process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                print("Port-forward process did not terminate in time, killing...")
-                self.port_forward_process.kill()
-
-            self.stop_event.set()
-
-            if self.port_forward_process.stdout:
-                self.port_forward_process.stdout.close()
-            if self.port_forward_process.stderr:
-                self.port_forward_process.stderr.close()
-
-            print("Port forwarding stopped.")
-
-        for thread in self.output_threads:
-            thread.join(timeout=5)
-            if thread.is_alive():
-                print(f"Warning: Thread {thread.name} did not terminate cleanly.")
+        """Releases the shared port-forward (closed once no client uses it)."""
+        if self.port is not None:
+            port_forwards.release(*PROMETHEUS_TARGET)
+            self.port = None
 
     def cleanup(self):
         """Cleanup resources like port-forwarding."""
@@ -248,9 +223,7 @@ class PrometheusAPI:
 
     def initialize_pod_and_service_lists(self, custom_namespace=None):
         namespace = custom_namespace or monitor_config["namespace"]
-        kube_context = get_kube_context()
-        config.load_kube_config(context=kube_context)
-        v1 = client.CoreV1Api()
+        v1 = core_v1_api()
         pod_list = [
             pod
             for pod in get_pod_list(v1, namespace=namespace)
@@ -268,10 +241,16 @@ class PrometheusAPI:
         start_time: Union[int, datetime, str],
         end_time: Union[int, datetime, str],
         namespace: str = "default",
-        step: int = 60,
+        step: int | None = None,
     ):
         start_time = time_format_transform(start_time)
         end_time = time_format_transform(end_time)
+        if step is None:
+            step = choose_step(
+                (end_time - start_time).total_seconds(),
+                monitor_config.get("metric_target_points", 300),
+                monitor_config.get("metric_min_step", 15),
+            )
         interface = "eth0"
         if metric_name.endswith("_total") or metric_name in [
             "container_last_seen",
@@ -296,17 +275,203 @@ class PrometheusAPI:
         if len(data_raw) == 0:
             return {"error": f"No data found for metric {metric_name} and pod {pod}"}
         else:
-            data = []
-            for item in data_raw[0]["values"]:
-                date_time = datetime.fromtimestamp(int(item[0]))
-                date_time = date_time.astimezone(pytz.timezone("Asia/Shanghai"))
-                float_value = round(
-                    float(item[1]), 3
-                )  # float value is needed to be able to add it to the list as a whole.
-                data.append({"time": date_time, "value": float_value})
-            return data
-
-    def export_all_metrics(self, start_time, end_time, save_path, step=15):
+            timestamps, values, _ = decode_matrix(data_raw[:1])
+            times = to_local_times(timestamps, pytz.timezone("Asia/Shanghai"))
+            return [
+                {"time": date_time, "value": value}
+                for date_time, value in zip(times, values.round(3).tolist())
+            ]
+
+    def _query_metrics(self, metrics, start_time, end_time, step, aggregation=None):
+        """Query one or more metrics over one time window in a single request.
+
+        Several metrics are fetched with a `__name__` regex selector and split locally.
+        With an `aggregation` (avg, max, min), a single gauge is queried as
+        `<aggregation>_over_time` over each step.
+
+        Returns:
+            dict: metric -> pd.DataFrame of timestamp, cmdb_id, kpi_name, value rows.
+        """
+        if len(metrics) == 1:
+            query = f"{metrics[0]}{{namespace='{self.namespace}'}}"
+        else:
+            query = f"{{__name__=~'{'|'.join(metrics)}', namespace='{self.namespace}'}}"
+        if aggregation and len(metrics) == 1:
+            query = over_time_query(query, metrics[0], step, aggregation)
+        data_raw = self.client.custom_query_range(
+            query,
+            time_format_transform(start_time),
+            time_format_transform(end_time),
+            step=step,
+        )
+
+        # Per-series work only (labels); samples are decoded column-wise below
+        pods = set(self.pod_list)
+        by_metric = {}
+        for data in data_raw:
+            metric = data["metric"].get("__name__", metrics[0])
+            if metric not in metrics or data["metric"].get("pod") not in pods:
+                continue
+            cmdb_id = data["metric"]["instance"] + "." + data["metric"]["pod"]
+            kpi_name = metric
+            if metric in network_metrics:
+                kpi_name = network_kpi_name_format(data["metric"])
+            series, cmdb_ids, kpi_names = by_metric.setdefault(metric, ([], [], []))
+            series.append(data)
+            cmdb_ids.append(cmdb_id)
+            kpi_names.append(kpi_name)
+
+        return {
+            metric: matrix_to_frame(series, cmdb_ids, kpi_names)
+            for metric, (series, cmdb_ids, kpi_names) in by_metric.items()
+        }
+
+    def _plan_queries(self, metrics, window_seconds, step, aggregation=None):
+        """Group related metrics (e.g. all `container_cpu_*`) into batched queries.
+
+        A group whose response would exceed the `metric_batch_max_samples` budget
+        (estimated from current series counts) is split back into per-metric queries.
+        Gauges aggregated with `*_over_time` are always queried alone, since the
+        function drops the `__name__` label the batched results are split by.
+
+        Returns:
+            list[tuple[str, ...]]: The metrics fetched by each query.
+        """
+        singles = [(metric,) for metric in metrics if aggregation and not is_counter(metric)]
+        metrics = [metric for metric in metrics if (metric,) not in singles]
+        if not monitor_config.get("metric_batch_mode", True) or len(metrics) < 2:
+            return [(metric,) for metric in metrics] + singles
+
+        groups = {}
+        for metric in metrics:
+            groups.setdefault("_".join(metric.split("_")[:2]), []).append(metric)
+
+        try:
+            series = {
+                item["metric"]["__name__"]: int(item["value"][1])
+                for item in self.client.custom_query(
+                    f"count by (__name__) ({{__name__=~'{'|'.join(metrics)}', "
+                    f"namespace='{self.namespace}'}})"
+                )
+            }
+        except Exception as e:
+            print(f"Could not estimate series counts ({e}); using per-metric queries.")
+            return [(metric,) for metric in metrics] + singles
+
+        budget = monitor_config.get("metric_batch_max_samples", 500000)
+        points = window_seconds // step + 1
+        queries = []
+        for group in groups.values():
+            samples = sum(series.get(metric, 0) for metric in group) * points
+            if len(group) > 1 and samples <= budget:
+                queries.append(tuple(group))
+            else:
+                queries.extend((metric,) for metric in group)
+        return queries + singles
+
+    def _cache_key(self, metric, step, aggregation):
+        return (self.namespace, step, aggregation, metric)
+
+    def _plan_tasks(self, cache, windows, step, aggregation):
+        """List the (metrics, step, aggregation, window) queries needed to cover `windows`.
+
+        Ranges already cached are skipped; the remaining gaps are split into
+        2-hour windows, and every (metric group, window) is one query.
+        """
+        interval_time = 2 * 60 * 60
+        longest = max(window_end - window_start for window_start, window_end in windows)
+        tasks = []
+        for metrics in self._plan_queries(
+            normal_metrics, int(min(interval_time, longest)), step, aggregation
+        ):
+            gaps = merge_intervals(
+                [
+                    gap
+                    for metric in metrics
+                    for window_start, window_end in windows
+                    for gap in cache.missing(
+                        self._cache_key(metric, step, aggregation), window_start, window_end
+                    )
+                ]
+            )
+            for gap_start, gap_end in gaps:
+                while gap_start < gap_end:
+                    window_end = min(gap_start + interval_time, gap_end)
+                    tasks.append((metrics, step, aggregation, (gap_start, window_end)))
+                    gap_start = window_end
+        return tasks
+
+    def _run_tasks(self, tasks, cache, now, latencies, errors):
+        """Run the planned queries concurrently and add their results to the cache."""
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="prom-export"
+        ) as pool:
+
+            def timed_query(metrics, step, aggregation, window):
+                query_start = time.time()
+                dfs = self._query_metrics(
+                    metrics,
+                    datetime.fromtimestamp(window[0]),
+                    datetime.fromtimestamp(window[1]),
+                    step,
+                    aggregation,
+                )
+                return dfs, time.time() - query_start
+
+            futures = {pool.submit(timed_query, *task): task for task in tasks}
+            for done, future in enumerate(as_completed(futures), start=1):
+                metrics, step, aggregation, window = futures[future]
+                key = ("|".join(metrics), window)
+                try:
+                    dfs, latencies[key] = future.result()
+                    for metric in metrics:
+                        cache.add(
+                            self._cache_key(metric, step, aggregation),
+                            *window,
+                            dfs.get(metric),
+                            now=now,
+                        )
+                except Exception as e:
+                    errors[key] = str(e)
+                if done % max(1, len(tasks) // 4) == 0 or done == len(tasks):
+                    print(f"Metric export (step={step}s): {done}/{len(tasks)} queries done")
+
+    def _detail_windows(self, cache, start_ts, end_ts, step, aggregation):
+        """Find the time windows around change points of the coarse export."""
+        scores = [
+            change_point_scores(
+                cache.get(self._cache_key(metric, step, aggregation), start_ts, end_ts),
+                counter=is_counter(metric),
+            )
+            for metric in normal_metrics
+        ]
+        scores = [score for score in scores if not score.empty]
+        if not scores:
+            return []
+        return detail_windows(
+            pd.concat(scores).groupby(level=0).max(),
+            threshold=monitor_config.get("metric_change_point_threshold", 4.0),
+            pad=2 * step,
+            start=start_ts,
+            end=end_ts,
+            max_windows=monitor_config.get("metric_change_point_max_windows", 10),
+        )
+
+    def export_all_metrics(self, start_time, end_time, save_path, step=None):
+        """Export the container metrics of the namespace between two times.
+
+        Args:
+            start_time: Start of the window (datetime, unix time or numeric string).
+            end_time: End of the window.
+            save_path (str): Directory under which a `metric_<timestamp>` folder is created.
+            step (int): Resolution in seconds. By default it is chosen from the window
+                length (see `metric_target_points`); at coarse steps, gauges are
+                aggregated with `*_over_time`, and change points are re-exported
+                at `metric_min_step`.
+
+        Returns:
+            str: A message with the export directory and its folder structure.
+        """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         save_path = os.path.join(save_path, f"metric_{timestamp}")
         if not os.path.exists(save_path):
@@ -319,96 +484,85 @@ class PrometheusAPI:
         istio_save_path = os.path.join(save_path, "istio")
         os.makedirs(istio_save_path, exist_ok=True)
 
-        # interval_time = 2 * 60 * 60
-        interval_time = timedelta(seconds=2 * 60 * 60)
-        while start_time < end_time:
-            if start_time + interval_time > end_time:
-                current_et = end_time
-            else:
-                current_et = start_time + interval_time
-            for metric in normal_metrics:
-                data_raw = self.client.custom_query_range(
-                    f"{metric}{{namespace='{self.namespace}'}}",
-                    time_format_transform(start_time),
-                    time_format_transform(current_et),
-                    step=step,
-                )
-                # Debugging print statements
-                # print(f"Query: {metric}{{namespace='{self.namespace}'}}")
-                # print(f"Start Time: {start_time}, End Time: {current_et}")
-                # print(f"Data Raw Length: {len(data_raw)}")
-                # print(f"Data Raw: {data_raw}")
-                if len(data_raw) == 0:
-                    continue
-                timestamp_list = []
-                cmdb_id_list = []
-                kpi_list = []
-                value_list = []
-                for data in data_raw:
-                    if data["metric"]["pod"] not in self.pod_list:
-                        continue
-                    cmdb_id = data["metric"]["instance"] + "." + data["metric"]["pod"]
-                    if cmdb_id == "":
-                        continue
-                    kpi_name = metric
-                    if metric in network_metrics:
-                        kpi_name = network_kpi_name_format(data["metric"])
-                    for d in data["values"]:
-                        timestamp_list.append(int(d[0]))
-                        cmdb_id_list.append(cmdb_id)
-                        kpi_list.append(kpi_name)
-                        value_list.append(round(float(d[1]), 3))
-                dt = pd.DataFrame(
-                    {
-                        "timestamp": timestamp_list,
-                        "cmdb_id": cmdb_id_list,
-                        "kpi_name": kpi_list,
-                        "value": value_list,
-                    }
-                )
-                dt = dt.sort_values(by="timestamp")
-                file_path = os.path.join(container_save_path, "kpi_" + metric + ".csv")
-                if os.path.exists(file_path):
-                    with open(file_path, "a", encoding="utf-8", newline="") as f:
-                        dt.to_csv(f, header=False, index=False)
-                else:
-                    dt.to_csv(file_path, index=False)
-            self.cleanup() # Stop port-forwarding after metrics are exported
-
-            # # for metric in istio_metrics:
-            #     data_raw = self.client.custom_query_range(f"{metric}{{namespace='{namespace}'}}", time_format_transform(start_time), time_format_transform(current_et), step=step)
-            #     if len(data_raw) == 0:
-            #         continue
-            #     timestamp_list = []
-            #     cmdb_id_list = []
-            #     kpi_list = []
-            #     value_list = []
-            #     for data in data_raw:
-            #         cmdb_id = istio_cmdb_id_format(data['metric'])
-            #         pod_name = cmdb_id.split('.')[0]
-            #         if cmdb_id == '' or pod_name not in pod_list:
-            #             continue
-            #         kpi_name = istio_kpi_name_format(data['metric'])
-            #         for d in data['values']:
-            #             timestamp_list.append(int(d[0]))
-            #             cmdb_id_list.append(cmdb_id)
-            #             kpi_list.append(kpi_name)
-            #             value_list.append(round(float(d[1]), 3))
-            #     dt = pd.DataFrame({
-            #         'timestamp': timestamp_list,
-            #         'cmdb_id': cmdb_id_list,
-            #         'kpi_name': kpi_list,
-            #         'value': value_list
-            #     })
-            #     dt = dt.sort_values(by='timestamp')
-            #     file_path = os.path.join(istio_save_path, 'kpi_'+metric+'.csv')
-            #     if os.path.exists(file_path):
-            #         with open(file_path, 'a', encoding='utf-8', newline='') as f:
-            #             dt.to_csv(f, header=False, index=False)
-            #     else:
-            #         dt.to_csv(file_path, index=False)
-            start_time = current_et
-            
+        self.ensure_port_forward()
+        start_time = time_format_transform(start_time)
+        end_time = time_format_transform(end_time)
+        start_ts, end_ts = start_time.timestamp(), end_time.timestamp()
+
+        min_step = monitor_config.get("metric_min_step", 15)
+        if step is None:
+            step = choose_step(
+                end_ts - start_ts, monitor_config.get("metric_target_points", 300), min_step
+            )
+        aggregation = None
+        if step > min_step:
+            aggregation = monitor_config.get("metric_downsample_aggregation", "avg")
+            aggregation = None if aggregation == "none" else aggregation
+
+        # Samples fetched by earlier exports are reused; only the gaps are queried
+        if monitor_config.get("metric_cache", True):
+            cache = metric_cache
+        else:
+            cache = MetricCache(max_bytes=float("inf"), lag=0)
+
+        # Port-forwarding stays up until every query is done
+        started = time.time()
+        latencies, errors = {}, {}
+        windows = []
+        try:
+            tasks = self._plan_tasks(cache, [(start_ts, end_ts)], step, aggregation)
+            self._run_tasks(tasks, cache, started, latencies, errors)
+
+            if step > min_step and monitor_config.get("metric_change_point_detail", True):
+                windows = self._detail_windows(cache, start_ts, end_ts, step, aggregation)
+                if windows:
+                    detail_tasks = self._plan_tasks(cache, windows, min_step, None)
+                    self._run_tasks(detail_tasks, cache, started, latencies, errors)
+                    tasks += detail_tasks
+        finally:
+            self.cleanup()  # Stop port-forwarding after metrics are exported
+
+        rows, metrics_with_data = 0, 0
+        for metric in normal_metrics:
+            dt = cache.get(self._cache_key(metric, step, aggregation), start_ts, end_ts)
+            if windows:
+                fine = [
+                    cache.get(self._cache_key(metric, min_step, None), *window)
+                    for window in windows
+                ]
+                fine = [df for df in fine if df is not None and not df.empty]
+                dt = splice(dt, pd.concat(fine) if fine else None, windows)
+            if dt is None or dt.empty:
+                continue
+            with TelemetryWriter(os.path.join(container_save_path, "kpi_" + metric)) as writer:
+                writer.write(dt)
+            rows += writer.rows
+            metrics_with_data += 1
+
+        self.export_stats = {
+            "step": step,
+            "aggregation": aggregation,
+            "detail_windows": windows,
+            "queries": len(tasks),
+            "failed": len(errors),
+            "metrics_with_data": metrics_with_data,
+            "rows": rows,
+            "elapsed": time.time() - started,
+            "slowest_query": max(latencies.values(), default=0.0),
+        }
+        print(
+            f"Metric export finished: {len(tasks)} queries ({len(errors)} failed), "
+            f"{rows} rows in {self.export_stats['elapsed']:.2f}s "
+            f"(slowest query {self.export_stats['slowest_query']:.2f}s, workers={self.max_workers})"
+        )
+        if step > min_step:
+            print(
+                f"Exported at step={step}s (aggregation: {aggregation or 'none'}), "
+                f"full {min_step}s resolution in {len(windows)} change-point window(s)"
+            )
+        for (metric, window), error in errors.items():
+            print(f"Failed to export {metric} ({window[0]:.0f}-{window[1]:.0f}): {error}")
+
         # Print the folder structure
         export_msg = f"Metrics data exported to directory: {save_path}\n\nFolder structure of exported metrics:\n"
         for root, dirs, files in os.walk(save_path):
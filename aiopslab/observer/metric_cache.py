@@ -0,0 +1,135 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""In-process cache of exported metric samples.
+
+Entries are keyed by (namespace, step, aggregation, metric) and record which
+time ranges have already been fetched. A later export over an overlapping range only
+queries the gaps (typically the new tail) and serves the rest from memory.
+The least recently used entries are evicted past a byte budget.
+
+Fetched samples are appended as chunks and only merged (and deduplicated) when
+an entry is read, so a long run of small additions stays linear.
+"""
+
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from aiopslab.observer import monitor_config
+
+KEY_COLUMNS = ["timestamp", "cmdb_id", "kpi_name"]
+
+
+def merge_intervals(intervals: list[tuple[float, float]]) -> list[tuple[float, float]]:
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class MetricCache:
+    """Time-range aware sample cache with LRU eviction.
+
+    Args:
+        max_bytes (int): Memory budget for cached samples.
+        lag (float): Seconds before "now" that are never marked as covered, since
+            the latest samples may not have been scraped yet when first queried.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, lag: float = 30):
+        self.max_bytes = max_bytes
+        self.lag = lag
+        self._entries: OrderedDict[tuple, dict] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def missing(self, key: tuple, start: float, end: float) -> list[tuple[float, float]]:
+        """Return the sub-ranges of [start, end] that are not cached for `key`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            covered = entry["intervals"] if entry else []
+
+        gaps, cursor = [], start
+        for covered_start, covered_end in covered:
+            if covered_end <= cursor:
+                continue
+            if covered_start >= end:
+                break
+            if covered_start > cursor:
+                gaps.append((cursor, covered_start))
+            cursor = max(cursor, covered_end)
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def add(self, key: tuple, start: float, end: float, df: pd.DataFrame | None, now: float):
+        """Store the samples fetched for [start, end] (an empty range is cached as well)."""
+        covered_end = min(end, now - self.lag)
+        with self._lock:
+            entry = self._entries.pop(key, None) or {
+                "intervals": [],
+                "chunks": [],
+                "bytes": 0,
+                "merged": True,
+            }
+            if df is not None and not df.empty:
+                entry["chunks"].append(df)
+                entry["merged"] = False
+                size = int(df.memory_usage(deep=True).sum())
+                entry["bytes"] += size
+                self._bytes += size
+            if covered_end > start:
+                entry["intervals"] = merge_intervals(
+                    entry["intervals"] + [(start, covered_end)]
+                )
+            self._entries[key] = entry
+            self._evict(keep=key)
+
+    def _merged(self, entry: dict) -> pd.DataFrame:
+        """Merge an entry's chunks into one deduplicated frame (later samples win)."""
+        if not entry["chunks"]:
+            return pd.DataFrame(columns=KEY_COLUMNS + ["value"])
+        if not entry["merged"]:
+            merged = pd.concat(entry["chunks"], ignore_index=True)
+            merged = merged.drop_duplicates(subset=KEY_COLUMNS, keep="last")
+            entry["chunks"] = [merged]
+            entry["merged"] = True
+            size = int(merged.memory_usage(deep=True).sum())
+            self._bytes += size - entry["bytes"]
+            entry["bytes"] = size
+        return entry["chunks"][0]
+
+    def get(self, key: tuple, start: float, end: float) -> pd.DataFrame | None:
+        """Return the cached samples of `key` within [start, end], sorted by timestamp."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            df = self._merged(entry)
+        df = df[(df["timestamp"] >= start) & (df["timestamp"] <= end)]
+        return df.sort_values(by="timestamp", kind="stable")
+
+    def _evict(self, keep: tuple):
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            if key == keep:
+                self._entries.move_to_end(key)
+                key = next(iter(self._entries))
+            self._bytes -= self._entries.pop(key)["bytes"]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+# Shared by every PrometheusAPI in the process
+metric_cache = MetricCache(
+    max_bytes=int(monitor_config.get("metric_cache_max_bytes", 256 * 1024 * 1024))
+)
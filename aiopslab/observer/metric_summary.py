@@ -0,0 +1,118 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Per-series summaries of exported metrics.
+
+Instead of every sample, each (cmdb_id, kpi_name) series is reduced to a row
+of statistics: min, max, mean, percentiles, last value, trend and an anomaly
+score. All statistics are computed with grouped column operations over the
+whole file at once.
+
+The anomaly score is the largest deviation of a sample from the rolling median
+of the samples before it, in units of the series' noise level. The noise level
+is estimated robustly from the MAD of consecutive differences, so a level shift
+does not inflate it. Since the score is a maximum over many samples, a series
+is flagged only above the level that pure Gaussian noise would exceed with
+probability `false_alarm_rate` over that many samples.
+"""
+
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+SERIES_KEYS = ["cmdb_id", "kpi_name"]
+
+# Scales a MAD to a standard deviation for Gaussian data
+MAD_TO_STD = 1.4826
+# Relative efficiency of the MAD as a scale estimate for Gaussian data
+MAD_EFFICIENCY = 0.37
+
+
+def _noise_level(delta: pd.Series, keys: list) -> pd.Series:
+    """Per-sample noise standard deviation of each series, from its step-to-step changes."""
+    deviation = (delta - delta.groupby(keys, observed=True, sort=False).transform("median")).abs()
+    grouped = deviation.groupby(keys, observed=True, sort=False)
+    mad = grouped.transform("median") * MAD_TO_STD
+    # Mostly constant series (MAD of 0) fall back to the mean absolute deviation
+    mean_abs = grouped.transform("mean") * np.sqrt(np.pi / 2)
+    # The difference of two samples has twice the variance of one
+    return mad.where(mad > 0, mean_abs) / np.sqrt(2)
+
+
+def summarize_metrics(
+    df: pd.DataFrame,
+    window: int = 20,
+    warmup: int = 10,
+    threshold: float = 3.0,
+    false_alarm_rate: float = 0.01,
+) -> pd.DataFrame:
+    """Summarize every series of a metrics DataFrame.
+
+    Args:
+        df (pd.DataFrame): Exported metrics (timestamp, cmdb_id, kpi_name, value).
+        window (int): Samples in the rolling median baseline.
+        warmup (int): Samples needed before a series is scored.
+        threshold (float): Lowest anomaly score at which a series is flagged.
+        false_alarm_rate (float): Chance of flagging a noise-only series; sets the
+            flagging level from the number of scored samples.
+
+    Returns:
+        pd.DataFrame: One row per series, most anomalous first.
+    """
+    df = df.dropna(subset=["value"]).sort_values(SERIES_KEYS + ["timestamp"], kind="stable")
+    df = df.reset_index(drop=True)
+    keys = [df[column] for column in SERIES_KEYS]
+    grouped = df.groupby(keys, observed=True, sort=False)["value"]
+
+    summary = grouped.agg(["count", "min", "max", "mean", "last"])
+    percentiles = grouped.quantile([0.5, 0.95, 0.99]).unstack()
+    percentiles.columns = ["p50", "p95", "p99"]
+    summary = summary.join(percentiles)
+
+    # Least-squares slope per series, from grouped sums (time relative to the series start)
+    t = df["timestamp"] - df.groupby(keys, observed=True, sort=False)["timestamp"].transform("min")
+    sums = pd.DataFrame({"t": t, "v": df["value"], "tt": t * t, "tv": t * df["value"]}).groupby(
+        keys, observed=True, sort=False
+    ).sum()
+    n = summary["count"]
+    denominator = n * sums["tt"] - sums["t"] ** 2
+    slope = (n * sums["tv"] - sums["t"] * sums["v"]) / denominator.where(denominator != 0)
+    summary["slope_per_min"] = slope * 60
+
+    # Deviation of each sample from the rolling median of the previous samples
+    rolling = grouped.rolling(window, min_periods=warmup)
+    levels = list(range(len(SERIES_KEYS)))
+    baseline = rolling.median().reset_index(level=levels, drop=True).sort_index()
+    samples = rolling.count().reset_index(level=levels, drop=True).sort_index()
+    baseline = baseline.groupby(keys, observed=True, sort=False).shift()
+    samples = samples.groupby(keys, observed=True, sort=False).shift()
+    noise = _noise_level(grouped.diff(), keys)
+    # The baseline itself is noisy: the median of k samples has variance ~ pi/(2k) * sigma^2
+    spread = noise * np.sqrt(1 + np.pi / (2 * samples))
+    score = ((df["value"] - baseline).abs() / spread.where(spread > 0)).replace(np.inf, np.nan)
+    scores = score.groupby(keys, observed=True, sort=False)
+    summary["anomaly_score"] = scores.max()
+
+    # Level that the largest of n Gaussian scores exceeds with probability false_alarm_rate,
+    # widened (as for a t statistic) since the noise level is itself estimated from the series
+    scored = scores.count().clip(lower=1)
+    z = scored.map(lambda n: NormalDist().inv_cdf(1 - false_alarm_rate / (2 * n)))
+    dof = MAD_EFFICIENCY * summary["count"].clip(lower=2)
+    limit = z + (z**3 + z) / (4 * dof)
+    summary["anomalous"] = summary["anomaly_score"] > np.maximum(limit, threshold)
+
+    summary = summary.sort_values(
+        ["anomaly_score", "slope_per_min"], ascending=False, na_position="last", key=abs
+    )
+    return summary.reset_index()
+
+
+def format_summary(summary: pd.DataFrame, rows: int, top_k: int = 20) -> str:
+    """Render the `top_k` first series of a summary as text."""
+    flagged = int(summary["anomalous"].sum())
+    header = (
+        f"{len(summary)} series ({rows} samples), {flagged} flagged as anomalous. "
+        f"Showing the {min(top_k, len(summary))} most anomalous:\n"
+    )
+    return header + summary.head(top_k).to_string(index=False, float_format="{:.4g}".format)
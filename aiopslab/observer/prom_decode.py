@@ -0,0 +1,60 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Vectorized decoding of Prometheus matrix (range query) results.
+
+A matrix result is a list of series, each with a label dict and a list of
+`[unix_time, "value"]` pairs. Instead of converting samples one by one, all
+pairs are flattened into a single NumPy array and converted per column.
+"""
+
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+
+def decode_matrix(series: list[dict]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Flatten the samples of a list of series.
+
+    Returns:
+        tuple: (timestamps as int64 seconds, values as float64, index of each sample's series)
+    """
+    counts = np.fromiter((len(s["values"]) for s in series), dtype=np.int64, count=len(series))
+    if counts.sum() == 0:
+        return np.empty(0, np.int64), np.empty(0, np.float64), np.empty(0, np.int64)
+
+    samples = np.array(list(chain.from_iterable(s["values"] for s in series)), dtype=object)
+    timestamps = samples[:, 0].astype(np.float64).astype(np.int64)
+    values = samples[:, 1].astype(np.float64)  # parses "NaN" and "+Inf" as well
+    series_index = np.repeat(np.arange(len(series)), counts)
+    return timestamps, values, series_index
+
+
+def matrix_to_frame(series: list[dict], cmdb_ids: list[str], kpi_names: list[str]) -> pd.DataFrame:
+    """Build the export DataFrame (timestamp, cmdb_id, kpi_name, value) of a list of series.
+
+    Args:
+        series (list[dict]): Matrix result entries.
+        cmdb_ids (list[str]): The cmdb_id of each series.
+        kpi_names (list[str]): The kpi_name of each series.
+    """
+    timestamps, values, series_index = decode_matrix(series)
+    return pd.DataFrame(
+        {
+            "timestamp": timestamps,
+            "cmdb_id": _categorical(cmdb_ids, series_index),
+            "kpi_name": _categorical(kpi_names, series_index),
+            "value": values.round(3),
+        }
+    )
+
+
+def _categorical(per_series: list[str], series_index: np.ndarray) -> pd.Categorical:
+    codes, categories = pd.factorize(pd.Series(per_series, dtype=object))
+    return pd.Categorical.from_codes(codes[series_index], categories=categories)
+
+
+def to_local_times(timestamps: np.ndarray, tz) -> list:
+    """Convert unix seconds to timezone-aware datetimes in one column operation."""
+    return list(pd.to_datetime(timestamps, unit="s", utc=True).tz_convert(tz).to_pydatetime())
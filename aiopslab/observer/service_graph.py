@@ -0,0 +1,222 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Incrementally maintained service dependency graph with RED metrics per edge.
+
+Each span whose parent belongs to another service adds a call on the
+caller -> callee edge. Edges keep their request count, error count and a
+log-scale duration histogram, so rates, error rates and percentiles can be
+read at any time and new spans are folded in without revisiting old ones.
+
+Spans are deduplicated by (trace_id, span_id), over a bounded number of the
+most recent spans. A span whose parent has not been seen yet is held back (up
+to a bound) until a later update brings it. Rates are computed over the time
+windows the updates covered, so idle gaps between exports do not dilute them.
+
+There is one graph per application namespace and run (see `graph_for`), so
+concurrent or successive problems never mix their calls.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from aiopslab.observer.metric_cache import merge_intervals
+from aiopslab.observer.telemetry_store import read_table
+from aiopslab.utils.run_scope import get_run_id
+
+# Duration histogram bucket bounds, in µs: 1µs to 100s, 20 buckets per decade
+BUCKETS = np.geomspace(1, 1e8, 161)
+
+SPAN_KEYS = ["trace_id", "span_id"]
+
+
+def _hashes(df: pd.DataFrame, columns: list[str]) -> np.ndarray:
+    return pd.util.hash_pandas_object(df[columns].astype(str), index=False).to_numpy()
+
+
+class ServiceGraph:
+    """Caller -> callee graph of services, updated from new span rows.
+
+    Args:
+        max_spans (int): Recent spans kept to resolve the parents of later spans.
+        max_pending (int): Spans waiting for their parent.
+        max_seen (int): Recent span keys remembered to drop spans that were already added.
+        include_internal (bool): Also count calls within a service.
+    """
+
+    def __init__(
+        self,
+        max_spans: int = 200000,
+        max_pending: int = 50000,
+        max_seen: int = 1000000,
+        include_internal=False,
+    ):
+        self.max_spans = max_spans
+        self.max_pending = max_pending
+        self.max_seen = max_seen
+        self.include_internal = include_internal
+        self.edges: dict[tuple[str, str], dict] = {}
+        self.files = set()
+        # Time windows (µs) covered by the updates so far, merged
+        self.windows: list[tuple[float, float]] = []
+        self._seen: OrderedDict[int, None] = OrderedDict()
+        self._spans = pd.DataFrame(columns=["trace_id", "parent_span", "caller"])
+        self._pending = pd.DataFrame()
+        self._lock = threading.Lock()
+
+    def update(self, df: pd.DataFrame) -> int:
+        """Fold new span rows into the graph. Returns the number of new spans."""
+        if df.empty:
+            return 0
+        df = df.copy()
+        df["trace_id"] = df["trace_id"].astype(str)
+        df["span_id"] = df["span_id"].astype(str)
+        df["parent_span"] = df["parent_span"].astype(str)
+
+        with self._lock:
+            hashes = _hashes(df, SPAN_KEYS)
+            new = np.array([h not in self._seen for h in hashes.tolist()], dtype=bool)
+            new &= ~pd.Series(hashes).duplicated().to_numpy()
+            df = df[new]
+            if df.empty:
+                return 0
+            self._seen.update(dict.fromkeys(hashes[new].tolist()))
+            while len(self._seen) > self.max_seen:
+                self._seen.popitem(last=False)
+
+            start, end = df["start_time"].min(), (df["start_time"] + df["duration"]).max()
+            self.windows = merge_intervals(self.windows + [(float(start), float(end))])
+
+            # Each span can be the parent of later spans
+            parents = df[["trace_id", "span_id", "service_name"]].set_axis(
+                ["trace_id", "parent_span", "caller"], axis=1
+            )
+            self._spans = pd.concat([self._spans, parents], ignore_index=True).tail(self.max_spans)
+
+            children = pd.concat([self._pending, df], ignore_index=True)
+            children = children[children["parent_span"] != "ROOT"]
+            joined = children.merge(self._spans, on=["trace_id", "parent_span"], how="left")
+            pending = joined[joined["caller"].isna()].drop(columns="caller")
+            self._pending = pending.tail(self.max_pending)
+            self._add_calls(joined[joined["caller"].notna()])
+            return len(df)
+
+    def _add_calls(self, calls: pd.DataFrame):
+        if not self.include_internal:
+            calls = calls[calls["caller"] != calls["service_name"]]
+        if calls.empty:
+            return
+        calls = calls.assign(
+            bucket=np.searchsorted(BUCKETS, calls["duration"].to_numpy(dtype=np.float64)),
+            error=calls["has_error"].astype(str).str.lower() == "true",
+        )
+        keys = [calls["caller"], calls["service_name"]]
+        totals = calls.groupby(keys, observed=True).agg(
+            count=("error", "size"), errors=("error", "sum")
+        )
+        histograms = calls.groupby(keys + [calls["bucket"]], observed=True).size()
+
+        for (caller, callee), row in totals.iterrows():
+            edge = self.edges.setdefault(
+                (caller, callee),
+                {"count": 0, "errors": 0, "histogram": np.zeros(len(BUCKETS) + 1, dtype=np.int64)},
+            )
+            edge["count"] += int(row["count"])
+            edge["errors"] += int(row["errors"])
+        for (caller, callee, bucket), count in histograms.items():
+            self.edges[(caller, callee)]["histogram"][bucket] += count
+
+    def ingest_file(self, file_path: str) -> int:
+        """Update from an exported traces file, unless it was already ingested.
+
+        Exports streamed into the graph (see `mark_ingested`) are not read again.
+        """
+        key = (os.path.abspath(file_path), os.path.getmtime(file_path))
+        if key in self.files:
+            return 0
+        columns = SPAN_KEYS + ["parent_span", "service_name", "start_time", "duration", "has_error"]
+        added = self.update(read_table(file_path, columns=columns))
+        self.files.add(key)
+        return added
+
+    def mark_ingested(self, file_path: str):
+        """Record that a file's spans were already fed through `update` (e.g. while exporting)."""
+        self.files.add((os.path.abspath(file_path), os.path.getmtime(file_path)))
+
+    @staticmethod
+    def _percentile(histogram: np.ndarray, q: float) -> float:
+        """Upper bound (ms) of the bucket holding the q-quantile."""
+        cumulative = np.cumsum(histogram)
+        if cumulative[-1] == 0:
+            return float("nan")
+        bucket = int(np.searchsorted(cumulative, q * cumulative[-1]))
+        return float(BUCKETS[min(bucket, len(BUCKETS) - 1)]) / 1000
+
+    def table(self) -> pd.DataFrame:
+        """One row per edge: rate (req/s), error rate and p50/p95/p99 latency (ms)."""
+        with self._lock:
+            seconds = max(sum(end - start for start, end in self.windows), 1) / 1_000_000
+            rows = [
+                {
+                    "caller": caller,
+                    "callee": callee,
+                    "requests": edge["count"],
+                    "rate": edge["count"] / seconds,
+                    "error_rate": edge["errors"] / edge["count"],
+                    "p50": self._percentile(edge["histogram"], 0.5),
+                    "p95": self._percentile(edge["histogram"], 0.95),
+                    "p99": self._percentile(edge["histogram"], 0.99),
+                }
+                for (caller, callee), edge in self.edges.items()
+            ]
+        return pd.DataFrame(
+            rows, columns=["caller", "callee", "requests", "rate", "error_rate", "p50", "p95", "p99"]
+        )
+
+    def adjacency(self) -> dict[str, list[dict]]:
+        """caller -> its outgoing edges with their metrics, busiest first."""
+        table = self.table().sort_values("requests", ascending=False)
+        return {
+            caller: edges.drop(columns="caller").to_dict("records")
+            for caller, edges in table.groupby("caller", sort=True)
+        }
+
+    def degraded(self, top_k: int = 10) -> pd.DataFrame:
+        """The edges with the highest error rates, then the slowest tails."""
+        table = self.table()
+        return table.sort_values(["error_rate", "p99"], ascending=False).head(top_k)
+
+
+_graphs: dict[tuple[str, str | None], ServiceGraph] = {}
+_graphs_lock = threading.Lock()
+
+
+def graph_for(namespace: str) -> ServiceGraph:
+    """The graph of the traces exported from `namespace` in the current run."""
+    with _graphs_lock:
+        return _graphs.setdefault((namespace, get_run_id()), ServiceGraph())
+
+
+def graph_for_file(file_path: str) -> ServiceGraph:
+    """The graph a traces file was exported into, or a new graph for a file from elsewhere.
+
+    The graph of an export is the cumulative graph of its namespace and run, which
+    also holds the spans of that run's other exports.
+    """
+    path = os.path.abspath(file_path)
+    with _graphs_lock:
+        for graph in _graphs.values():
+            if any(ingested == path for ingested, _ in graph.files):
+                return graph
+    return ServiceGraph()
+
+
+def drop_graphs(namespace: str):
+    """Forget the graphs of `namespace` (e.g. once its problem is cleaned up)."""
+    with _graphs_lock:
+        for key in [key for key in _graphs if key[0] == namespace]:
+            del _graphs[key]
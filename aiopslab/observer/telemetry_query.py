@@ -0,0 +1,144 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Paginated, filtered queries over exported telemetry files.
+
+A query selects rows (by service, pod, KPI, time range or generic filters),
+optionally groups and aggregates them, sorts, and returns one page plus the
+total number of matching rows. Files are read through `read_table`, so
+repeated queries on a CSV or Arrow file reuse its parsed copy.
+"""
+
+import pandas as pd
+
+from aiopslab.observer.telemetry_store import read_table
+
+# Time column of each telemetry kind, and how many of its units make a second
+TIME_COLUMNS = {"timestamp": 1, "start_time": 1_000_000}
+
+AGGREGATES = {"count", "sum", "mean", "min", "max", "median", "nunique", "p95", "p99"}
+
+
+def _aggregate(name: str):
+    if name not in AGGREGATES:
+        raise ValueError(f"Unsupported aggregate '{name}'; use one of {sorted(AGGREGATES)}")
+    if name.startswith("p"):
+        q = int(name[1:]) / 100
+        return lambda series: series.quantile(q)
+    return name
+
+
+def table_columns(file_path: str) -> list[str]:
+    """Return the column names of a telemetry file."""
+    if file_path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(file_path).names
+    return list(read_table(file_path).columns)
+
+
+def build_filters(
+    columns: list[str],
+    service: str | None = None,
+    pod: str | None = None,
+    kpi: str | None = None,
+    start: float | None = None,
+    end: float | None = None,
+) -> list[tuple]:
+    """Translate the shorthand selectors into (column, op, value) filters for a file's columns.
+
+    Args:
+        columns (list[str]): The columns of the file.
+        service (str): Service name (traces), or a substring of cmdb_id (metrics).
+        pod (str): Substring of the pod part of cmdb_id.
+        kpi (str): Substring of kpi_name.
+        start (float): Unix time in seconds; rows before it are dropped.
+        end (float): Unix time in seconds; rows after it are dropped.
+    """
+    filters = []
+    if service:
+        if "service_name" in columns:
+            filters.append(("service_name", "==", service))
+        else:
+            filters.append(("cmdb_id", "contains", service))
+    if pod:
+        filters.append(("cmdb_id", "contains", pod))
+    if kpi:
+        filters.append(("kpi_name", "contains", kpi))
+
+    time_column = next((c for c in TIME_COLUMNS if c in columns), None)
+    if time_column is None and (start is not None or end is not None):
+        raise ValueError("The file has no time column to filter on")
+    if start is not None:
+        filters.append((time_column, ">=", start * TIME_COLUMNS[time_column]))
+    if end is not None:
+        filters.append((time_column, "<=", end * TIME_COLUMNS[time_column]))
+    return filters
+
+
+def query_table(
+    file_path: str,
+    columns: list[str] | None = None,
+    filters: list[tuple] | None = None,
+    group_by: list[str] | None = None,
+    aggregates: dict | None = None,
+    sort_by: str | list[str] | None = None,
+    descending: bool = False,
+    limit: int = 50,
+    offset: int = 0,
+) -> tuple[pd.DataFrame, int]:
+    """Run a query on one telemetry file.
+
+    Args:
+        file_path (str): A .csv, .parquet or .arrow file.
+        columns (list[str]): The columns to return (ignored with `group_by`).
+        filters (list[tuple]): Row filters as (column, op, value); see `read_table`.
+        group_by (list[str]): Columns to group by.
+        aggregates (dict): column -> aggregate (or list of them) computed per group:
+            count, sum, mean, min, max, median, nunique, p95, p99. Defaults to counting rows.
+        sort_by (str | list[str]): Columns to sort by.
+        descending (bool): Sort in descending order.
+        limit (int): Page size.
+        offset (int): Number of rows to skip.
+
+    Returns:
+        tuple: (the requested page, the total number of result rows)
+    """
+    sort_by = [sort_by] if isinstance(sort_by, str) else list(sort_by or [])
+    needed = None
+    if group_by:
+        needed = list(dict.fromkeys(list(group_by) + list(aggregates or {})))
+    elif columns:
+        needed = list(dict.fromkeys(list(columns) + sort_by))
+    df = read_table(file_path, columns=needed, filters=filters)
+
+    if group_by:
+        grouped = df.groupby(list(group_by), observed=True, dropna=False)
+        if aggregates:
+            named = {}
+            for column, names in aggregates.items():
+                for name in [names] if isinstance(names, str) else names:
+                    named[f"{column}_{name}"] = (column, _aggregate(name))
+            df = grouped.agg(**named).reset_index()
+        else:
+            df = grouped.size().rename("count").reset_index()
+
+    if sort_by:
+        df = df.sort_values(sort_by, ascending=not descending, kind="stable")
+    if columns and not group_by:
+        df = df[list(columns)]
+
+    total = len(df)
+    return df.iloc[offset : offset + limit], total
+
+
+def format_page(page: pd.DataFrame, total: int, offset: int) -> str:
+    """Render a result page with its position in the full result."""
+    if total == 0:
+        return "No matching rows."
+    if page.empty:
+        return f"No rows at offset {offset} ({total} matching rows)."
+    text = f"Rows {offset + 1}-{offset + len(page)} of {total}:\n" + page.to_string(index=False)
+    if offset + len(page) < total:
+        text += f"\nMore rows available: use offset={offset + len(page)} for the next page."
+    return text
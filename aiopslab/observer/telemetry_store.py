@@ -0,0 +1,232 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Storage backend for exported telemetry (metrics and traces).
+
+CSV is the default; `telemetry_format: parquet` (or `arrow`) in monitor_config.yaml
+writes Parquet (or Arrow IPC) files instead, with repeated string columns
+dictionary-encoded. The columnar formats need the optional `pyarrow` dependency.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from aiopslab.observer import monitor_config
+
+EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+
+# Repeated string columns stored as dictionaries (integer codes + one copy of each value)
+DICTIONARY_COLUMNS = ["cmdb_id", "kpi_name", "service_name", "operation_name", "response"]
+
+
+def telemetry_format() -> str:
+    """Return the configured format, falling back to CSV when pyarrow is missing."""
+    fmt = monitor_config.get("telemetry_format", "csv")
+    if fmt not in EXTENSIONS:
+        raise ValueError(f"Unsupported telemetry_format: {fmt}")
+    if fmt != "csv":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print(f"pyarrow is not installed; writing telemetry as CSV instead of {fmt}.")
+            return "csv"
+    return fmt
+
+
+def _to_arrow(df: pd.DataFrame, dictionary: bool = True):
+    import pyarrow as pa
+
+    df = df.copy()
+    for column in df.columns:
+        # e.g. response codes mix ints and strings
+        if df[column].dtype == object:
+            df[column] = df[column].astype(str)
+        elif isinstance(df[column].dtype, pd.CategoricalDtype) and not dictionary:
+            df[column] = df[column].astype(str)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if not dictionary:
+        return table
+    for column in DICTIONARY_COLUMNS:
+        if column in table.column_names:
+            index = table.column_names.index(column)
+            table = table.set_column(
+                index, column, table.column(column).dictionary_encode()
+            )
+    return table
+
+
+class TelemetryWriter:
+    """Appends DataFrame batches to one telemetry file.
+
+    Parquet writes each batch as its own row group (dictionaries per row group).
+    An Arrow file has a single dictionary per column, grown across batches.
+
+    Args:
+        path (str): Output path without extension; the format's extension is added.
+        fmt (str): "csv", "parquet" or "arrow" (default: from monitor_config.yaml).
+    """
+
+    def __init__(self, path: str, fmt: str | None = None):
+        self.format = fmt or telemetry_format()
+        self.path = path + EXTENSIONS[self.format]
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+        # Arrow: column -> value -> code, shared by all batches of the file
+        self._dictionaries: dict[str, dict] = {}
+
+    def write(self, df: pd.DataFrame):
+        if df.empty:
+            return
+        self.rows += len(df)
+
+        if self.format == "csv":
+            df.to_csv(self.path, mode="a", header=self._schema is None, index=False)
+            self._schema = True
+            return
+
+        if self.format == "parquet":
+            table = _to_arrow(df)
+        else:
+            table = self._encode(_to_arrow(df, dictionary=False))
+        if self._writer is None:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            self._schema = table.schema
+            if self.format == "parquet":
+                self._writer = pq.ParquetWriter(
+                    self.path, self._schema, use_dictionary=True, compression="zstd"
+                )
+            else:
+                # Each batch's dictionary extends the previous one: written as deltas
+                options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+                self._writer = pa.ipc.new_file(self.path, self._schema, options=options)
+        else:
+            table = table.cast(self._schema)
+        self._writer.write_table(table)
+
+    def _encode(self, table):
+        """Dictionary-encode `DICTIONARY_COLUMNS` against the file's growing dictionaries."""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        for column in DICTIONARY_COLUMNS:
+            if column not in table.column_names:
+                continue
+            values = table.column(column).combine_chunks()
+            codes = self._dictionaries.setdefault(column, {})
+            for value in pc.unique(values).to_pylist():
+                if value is not None:
+                    codes.setdefault(value, len(codes))
+            dictionary = pa.array(list(codes), pa.string())
+            encoded = pa.DictionaryArray.from_arrays(
+                pc.index_in(values, value_set=dictionary).cast(pa.int32()), dictionary
+            )
+            table = table.set_column(table.column_names.index(column), column, encoded)
+        return table
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_table(df: pd.DataFrame, path: str, fmt: str | None = None) -> str:
+    """Write a DataFrame in one go. Returns the path of the written file."""
+    with TelemetryWriter(path, fmt) as writer:
+        writer.write(df)
+    return writer.path
+
+
+_frame_cache: OrderedDict[tuple, pd.DataFrame] = OrderedDict()
+_frame_cache_lock = threading.Lock()
+
+
+def _load_frame(file_path: str) -> pd.DataFrame:
+    """Parse a CSV or Arrow file, reusing the result while the file is unchanged.
+
+    Cached frames are shared; `read_table` returns copies of them.
+    """
+    stat = os.stat(file_path)
+    key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+    with _frame_cache_lock:
+        if key in _frame_cache:
+            _frame_cache.move_to_end(key)
+            return _frame_cache[key]
+
+    if file_path.endswith(".arrow"):
+        import pyarrow as pa
+
+        with pa.memory_map(file_path) as source:
+            table = pa.ipc.open_file(source).read_all()
+        df = table.to_pandas()
+    else:
+        df = pd.read_csv(file_path)
+
+    with _frame_cache_lock:
+        _frame_cache[key] = df
+        while len(_frame_cache) > monitor_config.get("telemetry_read_cache_files", 8):
+            _frame_cache.popitem(last=False)
+    return df
+
+
+def apply_filters(df: pd.DataFrame, filters: list[tuple] | None) -> pd.DataFrame:
+    """Keep the rows matching every (column, op, value) filter (see `read_table`)."""
+    for column, op, value in filters or []:
+        series = df[column]
+        mask = {
+            "==": lambda: series == value,
+            "=": lambda: series == value,
+            "!=": lambda: series != value,
+            "<": lambda: series < value,
+            "<=": lambda: series <= value,
+            ">": lambda: series > value,
+            ">=": lambda: series >= value,
+            "in": lambda: series.isin(value),
+            "contains": lambda: series.astype(str).str.contains(value, regex=False),
+        }[op]()
+        df = df[mask]
+    return df
+
+
+def read_table(
+    file_path: str,
+    columns: list[str] | None = None,
+    filters: list[tuple] | None = None,
+) -> pd.DataFrame:
+    """Read a telemetry file (format from its extension).
+
+    Args:
+        file_path (str): A .csv, .parquet or .arrow file.
+        columns (list[str]): Only read these columns.
+        filters (list[tuple]): Row filters as (column, op, value), op one of
+            ==, !=, <, <=, >, >=, in, contains. For Parquet they also prune row groups.
+
+    Returns:
+        pd.DataFrame: The selected rows and columns.
+    """
+    if file_path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        pushdown = [f for f in filters or [] if f[1] != "contains"]
+        table = pq.read_table(
+            file_path,
+            columns=list(dict.fromkeys((columns or []) + [f[0] for f in filters or []])) or None,
+            filters=pushdown or None,
+        )
+        df = apply_filters(table.to_pandas(), [f for f in filters or [] if f[1] == "contains"])
+        return df[columns] if columns else df
+
+    # The cached frame is shared: callers always get their own copy
+    df = apply_filters(_load_frame(file_path), filters)
+    return df[columns].copy() if columns else df.copy()
@@ -0,0 +1,230 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Span-tree analysis of exported traces.
+
+The flat span rows (trace_id, span_id, parent_span, ...) are linked into trees
+once, by joining each span to its parent within its trace. On top of the trees:
+
+- self time: a span's duration not covered by any of its children,
+- error propagation: whether an erroring span is where the error originated
+  (none of its children failed) or only passed a child's error on,
+- per-operation latency percentiles,
+- the critical path of the slowest traces: the chain of spans that determined
+  when each trace finished.
+
+Everything except the critical path walk is computed with grouped column
+operations over all spans at once.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Bound on tree depth, so malformed parent links (cycles) cannot loop forever
+MAX_DEPTH = 256
+
+
+def link_spans(df: pd.DataFrame) -> pd.DataFrame:
+    """Return the spans with `end_time` and `parent_idx` (row of the parent, -1 for roots).
+
+    Spans whose parent is missing from the export are treated as roots.
+    """
+    df = df.drop_duplicates(subset=["trace_id", "span_id"]).reset_index(drop=True)
+    df["has_error"] = df["has_error"].astype(str).str.lower() == "true"
+    df["end_time"] = df["start_time"] + df["duration"]
+
+    # IDs may have been read back as numbers; compare them as strings
+    trace_ids = df["trace_id"].astype(str)
+    index = pd.Series(
+        np.arange(len(df)), index=pd.MultiIndex.from_arrays([trace_ids, df["span_id"].astype(str)])
+    )
+    parents = pd.MultiIndex.from_arrays([trace_ids, df["parent_span"].astype(str)])
+    df["parent_idx"] = index.reindex(parents).fillna(-1).astype(np.int64).to_numpy()
+    return df
+
+
+def self_times(df: pd.DataFrame) -> np.ndarray:
+    """Duration of each span minus the union of its children's intervals (clipped to the span)."""
+    children = df[df["parent_idx"] >= 0]
+    parent = children["parent_idx"].to_numpy()
+    start = np.maximum(children["start_time"].to_numpy(), df["start_time"].to_numpy()[parent])
+    end = np.minimum(children["end_time"].to_numpy(), df["end_time"].to_numpy()[parent])
+
+    intervals = pd.DataFrame({"parent": parent, "start": start, "end": end})
+    intervals = intervals[intervals["end"] > intervals["start"]].sort_values(["parent", "start"])
+    # Union length per parent: each interval adds what extends past the furthest end so far
+    reach = intervals.groupby("parent")["end"].cummax()
+    previous = reach.groupby(intervals["parent"]).shift().fillna(-np.inf)
+    added = (intervals["end"] - np.maximum(intervals["start"], previous)).clip(lower=0)
+    covered = added.groupby(intervals["parent"]).sum()
+
+    result = df["duration"].to_numpy(dtype=np.float64).copy()
+    result[covered.index.to_numpy()] -= covered.to_numpy()
+    return np.maximum(result, 0)
+
+
+def error_origins(df: pd.DataFrame) -> np.ndarray:
+    """True for erroring spans none of whose children failed."""
+    failed_children = df.loc[df["has_error"] & (df["parent_idx"] >= 0), "parent_idx"].unique()
+    has_failed_child = np.zeros(len(df), dtype=bool)
+    has_failed_child[failed_children] = True
+    return df["has_error"].to_numpy() & ~has_failed_child
+
+
+def operation_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """Latency percentiles (ms), self time and error counts per (service, operation)."""
+    grouped = df.groupby(["service_name", "operation_name"], observed=True)
+    stats = grouped.agg(
+        count=("duration", "size"),
+        errors=("has_error", "sum"),
+        error_origins=("error_origin", "sum"),
+        self_p50=("self_time", "median"),
+    )
+    percentiles = grouped["duration"].quantile([0.5, 0.95, 0.99]).unstack()
+    percentiles.columns = ["p50", "p95", "p99"]
+    stats = stats.join(percentiles)
+    for column in ["p50", "p95", "p99", "self_p50"]:
+        stats[column] = stats[column] / 1000
+    stats = stats[["count", "p50", "p95", "p99", "self_p50", "errors", "error_origins"]]
+    return stats.sort_values("p99", ascending=False).reset_index()
+
+
+def critical_path(spans: pd.DataFrame, root: int) -> list[tuple[int, float]]:
+    """Walk the critical path of one trace from its root span.
+
+    Starting at the end of a span, the child that finished last (before the
+    current point) is on the critical path; the walk continues into it and
+    then before its start. The time not covered by critical children is the
+    span's own contribution.
+
+    Args:
+        spans (pd.DataFrame): The linked spans of one trace (see `link_spans`).
+        root (int): Row index of the root span.
+
+    Returns:
+        list[tuple[int, float]]: (row index, critical time in µs) of each span on the path.
+    """
+    children = {}
+    for idx, parent in zip(spans.index, spans["parent_idx"]):
+        if parent >= 0:
+            children.setdefault(parent, []).append(idx)
+    start, end = spans["start_time"].to_dict(), spans["end_time"].to_dict()
+
+    path = []
+
+    def walk(idx, limit):
+        span_end = min(end[idx], limit)
+        cursor, own = span_end, 0.0
+        for child in sorted(children.get(idx, []), key=lambda c: end[c], reverse=True):
+            if start[child] >= cursor:
+                continue
+            child_end = min(end[child], cursor)
+            own += cursor - child_end
+            walk(child, child_end)
+            cursor = max(start[child], start[idx])
+            if cursor <= start[idx]:
+                break
+        own += max(0, cursor - start[idx])
+        path.append((idx, own))
+
+    walk(root, end[root])
+    return path
+
+
+def analyze_traces(df: pd.DataFrame, slowest: int = 20) -> dict:
+    """Run the span-tree analyses on exported traces.
+
+    Args:
+        df (pd.DataFrame): Exported span rows.
+        slowest (int): Number of slowest traces whose critical paths are walked.
+
+    Returns:
+        dict: "operations" (per-operation stats), "error_origins" (where errors start,
+        and the root operations they reach) and "critical_path" (critical time per
+        service and operation over the slowest traces), as DataFrames; "traces" and
+        "spans" counts.
+    """
+    df = link_spans(df)
+    df["self_time"] = self_times(df)
+    df["error_origin"] = error_origins(df)
+
+    # Root of every span, by following parent links for all spans at once
+    root = np.arange(len(df))
+    parent = df["parent_idx"].to_numpy()
+    for _ in range(MAX_DEPTH):
+        up = parent[root]
+        moving = up >= 0
+        if not moving.any():
+            break
+        root = np.where(moving, up, root)
+    df["root_idx"] = root
+
+    origins = df[df["error_origin"]]
+    root_ops = df["service_name"].to_numpy()[root] + ":" + df["operation_name"].to_numpy()[root]
+    errors = (
+        origins.assign(root_operation=root_ops[origins.index])
+        .groupby(["service_name", "operation_name"], observed=True)
+        .agg(
+            count=("span_id", "size"),
+            root_operations=("root_operation", lambda s: ", ".join(s.unique()[:3])),
+        )
+        .sort_values("count", ascending=False)
+        .reset_index()
+    )
+
+    roots = df[df["parent_idx"] < 0]
+    slowest_roots = roots.nlargest(slowest, "duration")
+    contributions = []
+    for root_idx in slowest_roots.index:
+        spans = df[df["root_idx"] == root_idx]
+        contributions += critical_path(spans, root_idx)
+    if contributions:
+        rows, times = zip(*contributions)
+        critical = (
+            pd.DataFrame(
+                {
+                    "service_name": df["service_name"].to_numpy()[list(rows)],
+                    "operation_name": df["operation_name"].to_numpy()[list(rows)],
+                    "critical_ms": np.array(times) / 1000,
+                }
+            )
+            .groupby(["service_name", "operation_name"], observed=True)["critical_ms"]
+            .sum()
+            .sort_values(ascending=False)
+            .reset_index()
+        )
+        critical["share"] = critical["critical_ms"] / critical["critical_ms"].sum()
+    else:
+        critical = pd.DataFrame(columns=["service_name", "operation_name", "critical_ms", "share"])
+
+    return {
+        "traces": df["trace_id"].nunique(),
+        "spans": len(df),
+        "operations": operation_stats(df),
+        "error_origins": errors,
+        "critical_path": critical,
+        "slowest": len(slowest_roots),
+    }
+
+
+def format_analysis(result: dict, top_k: int = 10) -> str:
+    """Render the analysis as compact text tables."""
+    fmt = "{:.4g}".format
+    sections = [
+        f"{result['traces']} traces, {result['spans']} spans.",
+        f"Operations by p99 latency (ms; self_p50 excludes time spent in children):\n"
+        + result["operations"].head(top_k).to_string(index=False, float_format=fmt),
+    ]
+    if result["error_origins"].empty:
+        sections.append("No erroring spans.")
+    else:
+        sections.append(
+            "Error origins (erroring spans with no failed child) and the root operations they reach:\n"
+            + result["error_origins"].head(top_k).to_string(index=False)
+        )
+    if not result["critical_path"].empty:
+        sections.append(
+            f"Critical path time over the {result['slowest']} slowest traces:\n"
+            + result["critical_path"].head(top_k).to_string(index=False, float_format=fmt)
+        )
+    return "\n\n".join(sections)
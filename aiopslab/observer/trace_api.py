@@ -3,38 +3,72 @@
 
 import json
 import os
-import socket
 import time
-import select
 import subprocess
-import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from queue import Queue
+from typing import Iterator
 
 import requests
 import pandas as pd
-
-from aiopslab.observer import root_path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from aiopslab.observer import monitor_config, root_path
+from aiopslab.observer.service_graph import graph_for
+from aiopslab.observer.telemetry_store import TelemetryWriter, write_table
+from aiopslab.observer.trace_store import TraceStore
+from aiopslab.observer.trace_stream import (
+    SPAN_COLUMNS,
+    SpanBatcher,
+    flatten_spans,
+    iter_json_array,
+)
+from aiopslab.service.port_forward import port_forwards
+from aiopslab.utils.run_scope import base_namespace
 
 
 class TraceAPI:
     def __init__(self, namespace: str):
-        self.port_forward_process = None
         self.namespace = namespace
-        self.stop_event = threading.Event()
-        self.output_threads = []
+        self.app_namespace = base_namespace(namespace)
+        self.port_forward_target = None
+        self.max_workers = monitor_config.get("trace_fetch_workers", 8)
+        self.page_limit = monitor_config.get("trace_page_limit", 1000)
+        self.session = self._create_session()
 
-        if self.namespace == "astronomy-shop":
+        if self.app_namespace == "astronomy-shop":
             # No NodePort in astronomy shop
-            self.base_url = "http://localhost:16686/jaeger/ui"
-            self.start_port_forward()
+            port = self.start_port_forward()
+            self.base_url = f"http://localhost:{port}/jaeger/ui"
         else:
             # Other namespaces may expose a NodePort
             node_port = self.get_nodeport("jaeger", namespace)
             if node_port:
                 self.base_url = f"http://localhost:{node_port}"
             else:
-                self.base_url = "http://localhost:16686"
-                self.start_port_forward()
+                port = self.start_port_forward()
+                self.base_url = f"http://localhost:{port}"
+
+    def _create_session(self) -> requests.Session:
+        """HTTP session with a connection pool sized for the fetch workers."""
+        session = requests.Session()
+        if self.app_namespace == "astronomy-shop":
+            session.headers["Accept"] = "application/json"
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.max_workers,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["GET"],
+            ),
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
 
     def get_nodeport(self, service_name, namespace):
         """Fetch the NodePort for the given service."""
@@ -59,28 +93,6 @@ class TraceAPI:
             print(f"Error getting NodePort: {e.output}")
             return None
 
-    def print_output(self, stream):
-        """Thread function to print output from a subprocess stream non-blockingly."""
-        while not self.stop_event.is_set():
-            # Check if there is content to read
-            ready, _, _ = select.select([stream], [], [], 0.1)  # 0.1-second timeout
-            if ready:
-                try:
-                    line = stream.readline()
-                    if line:
-                        print(line, end="")
-                    else:
-                        break  # Exit if no more data and process ended
-                except ValueError as e:
-                    print("Stream closed:", e)
-                    break
-            if self.port_forward_process.poll() is not None:
-                break
-
-    def is_port_in_use(self, port):
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            return s.connect_ex(("127.0.0.1", port)) == 0
-        
     def get_jaeger_pod_name(self):
         try:
             from aiopslab.service.kubectl import KubeCtl
@@ -96,97 +108,32 @@ class TraceAPI:
             print("Error getting Jaeger pod name:", e)
             raise
 
-    def start_port_forward(self):
-        """Starts kubectl port-forward command to access Jaeger service or pod."""
-        for attempt in range(3):
-            if self.is_port_in_use(16686):
-                print(
-                    f"Port 16686 is already in use. Attempt {attempt + 1} of 3. Retrying in 3 seconds..."
-                )
-                time.sleep(3)
-                continue
-
-            # Use pod port-forwarding for astronomy-shop only
-            if self.namespace == "astronomy-shop":
-                pod_name = self.get_jaeger_pod_name()
-                command = f"kubectl port-forward pod/{pod_name} 16686:16686 -n {self.namespace}"
-            else:
-                command = f"kubectl port-forward svc/jaeger 16686:16686 -n {self.namespace}"
-
-            print("Starting port-forward with command:", command)
-            self.port_forward_process = subprocess.Popen(
-                command,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-
-            thread_out = threading.Thread(
-                target=self.print_output, args=(self.port_forward_process.stdout,)
-            )
-            thread_err = threading.Thread(
-                target=self.print_output, args=(self.port_forward_process.stderr,)
-            )
-            thread_out.start()
-            thread_err.start()
-
-            time.sleep(3)  # Let port-forward initialize
-
-            if self.port_forward_process.poll() is None:
-                print("Port forwarding established successfully.")
-                break
-            else:
-                print("Port forwarding failed. Retrying...")
+    def start_port_forward(self) -> int:
+        """Acquires a shared port-forward to the Jaeger service (or pod) and returns its local port."""
+        # Use pod port-forwarding for astronomy-shop only
+        if self.app_namespace == "astronomy-shop":
+            target = f"pod/{self.get_jaeger_pod_name()}"
         else:
-            print("Failed to establish port forwarding after 3 attempts.")
+            target = "svc/jaeger"
 
-        # TODO: modify this command for other microservices
-        # command = "kubectl port-forward svc/jaeger 16686:16686 -n hotel-reservation"
-        # self.port_forward_process = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-
-        # thread_out = threading.Thread(target=self.print_output, args=(self.port_forward_process.stdout,))
-        # thread_err = threading.Thread(target=self.print_output, args=(self.port_forward_process.stderr,))
-        # thread_out.start()
-        # thread_err.start()
-        # # self.output_threads.extend([thread_out, thread_err])
-        # time.sleep(3)  # Wait a bit for the port-forward to establish
+        self.port_forward_target = (self.namespace, target, 16686)
+        return port_forwards.acquire(*self.port_forward_target)
 
     def stop_port_forward(self):
-        if self.port_forward_process:
-            self.stop_event.set()  # Signal threads to exit
-            try:
-                self.port_forward_process.terminate()
-                self.port_forward_process.wait(timeout=5)
-            except Exception as e:
-                print("Error terminating port-forward process:", e)
-
-            try:
-                if self.port_forward_process.stdout:
-                    self.port_forward_process.stdout.close()
-                if self.port_forward_process.stderr:
-                    self.port_forward_process.stderr.close()
-            except Exception as e:
-                print("Error closing process streams:", e)
-            self.port_forward_process = None
-
+        if self.port_forward_target:
+            port_forwards.release(*self.port_forward_target)
+            self.port_forward_target = None
 
     def cleanup(self):
         self.stop_port_forward()
-        for thread in self.output_threads:
-            thread.join(timeout=5)
-            if thread.is_alive():
-                print(f"Thread {thread.name} could not be joined and may need to be stopped forcefully.")
-        self.output_threads.clear()
         print("Cleanup completed.")
 
     def get_services(self) -> list:
         """Fetch a list of services from the tracing API."""
         url = f"{self.base_url}/api/services"
-        headers = {"Accept": "application/json"} if self.namespace == "astronomy-shop" else {}
 
         try:
-            response = requests.get(url, headers=headers)
+            response = self.session.get(url, timeout=30)
             response.raise_for_status()
             return response.json().get("data", [])
         except Exception as e:
@@ -202,27 +149,162 @@ class TraceAPI:
     ) -> list:
         """
         Fetch traces for a specific service between start_time and end_time.
-        If limit is not specified, all available traces are fetched.
+
+        Jaeger returns at most `limit` traces per query. If limit is not specified,
+        all traces are fetched in pages of `trace_page_limit`: a window that fills
+        a page is split in two, down to `trace_min_window_seconds`.
         """
-        lookback = int((datetime.now() - start_time).total_seconds())
-        url = f"{self.base_url}/api/traces?service={service_name}&lookback={lookback}s"
+        start_us = int(start_time.timestamp() * 1_000_000)
+        end_us = int(end_time.timestamp() * 1_000_000)
         if limit is not None:
-            url += f"&limit={limit}"
+            return self._query_traces(service_name, start_us, end_us, limit)
+
+        min_window_us = monitor_config.get("trace_min_window_seconds", 5) * 1_000_000
+        traces, windows = [], [(start_us, end_us)]
+        while windows:
+            window_start, window_end = windows.pop()
+            page = self._query_traces(service_name, window_start, window_end, self.page_limit)
+            if len(page) >= self.page_limit and window_end - window_start > min_window_us:
+                middle = (window_start + window_end) // 2
+                windows += [(middle + 1, window_end), (window_start, middle)]
+            else:
+                traces.extend(page)
+        return traces
 
-        headers = {"Accept": "application/json"} if self.namespace == "astronomy-shop" else {}
+    def _query_traces(self, service_name, start_us, end_us, limit) -> list:
+        """One `/api/traces` query with microsecond bounds."""
+        params = {"service": service_name, "start": start_us, "end": end_us, "limit": limit}
         try:
-            response = requests.get(url, headers=headers)
+            response = self.session.get(f"{self.base_url}/api/traces", params=params, timeout=60)
             response.raise_for_status()
             return response.json().get("data", [])
         except requests.RequestException as e:
             print(f"Failed to get traces for {service_name}: {e}")
             return []
 
+    def iter_traces(
+        self,
+        service_name: str,
+        start_time: datetime,
+        end_time: datetime,
+        limit: int = None,
+    ) -> Iterator[dict]:
+        """
+        Stream the traces of a service, decoding each response while it downloads.
+
+        Pages like `get_traces`: a window whose response fills a page is dropped as
+        soon as the page is full and split in two, so only leaf windows are yielded
+        (at most one page of traces is held at a time). A trace that spans a split
+        point, or was returned for several services, may still be yielded more than
+        once; consumers drop the copies (see `SpanBatcher`).
+        """
+        page_limit = limit or self.page_limit
+        min_window_us = monitor_config.get("trace_min_window_seconds", 5) * 1_000_000
+        start_us = int(start_time.timestamp() * 1_000_000)
+        end_us = int(end_time.timestamp() * 1_000_000)
+        windows = [(start_us, end_us)]
+        while windows:
+            window_start, window_end = windows.pop()
+            params = {
+                "service": service_name,
+                "start": window_start,
+                "end": window_end,
+                "limit": page_limit,
+            }
+            splittable = limit is None and window_end - window_start > min_window_us
+            page = []
+            try:
+                with self.session.get(
+                    f"{self.base_url}/api/traces", params=params, timeout=60, stream=True
+                ) as response:
+                    response.raise_for_status()
+                    for trace in iter_json_array(response.iter_content(chunk_size=64 * 1024)):
+                        page.append(trace)
+                        if splittable and len(page) >= page_limit:
+                            break
+            except (requests.RequestException, ValueError) as e:
+                print(f"Failed to get traces for {service_name}: {e}")
+                continue
+
+            if splittable and len(page) >= page_limit:
+                middle = (window_start + window_end) // 2
+                windows += [(middle + 1, window_end), (window_start, middle)]
+            else:
+                yield from page
+
+    def export_traces(
+        self, start_time: datetime, end_time: datetime, path: str, limit: int = None
+    ) -> str:
+        """
+        Export the traces of all services to a file with bounded memory.
+
+        Services are streamed concurrently into a bounded queue; a single consumer
+        flattens the traces into span batches of `trace_batch_spans` rows and writes
+        each batch as soon as it fills. Batches also update the service graph of the namespace.
+        """
+        services = [s for s in self.get_services() or [] if s != "jaeger-all-in-one"]
+        os.makedirs(path, exist_ok=True)
+
+        started = time.time()
+        done = object()
+        traces = Queue(maxsize=monitor_config.get("trace_queue_size", 256))
+
+        def produce(service):
+            try:
+                for trace in self.iter_traces(service, start_time, end_time, limit):
+                    traces.put(trace)
+            except Exception as e:
+                print(f"Failed to stream traces for {service}: {e}")
+            finally:
+                traces.put(done)
+
+        with TelemetryWriter(os.path.join(path, f"traces_{int(time.time())}")) as writer:
+            graph = graph_for(self.namespace)
+            batcher = SpanBatcher(
+                writer,
+                monitor_config.get("trace_batch_spans", 10000),
+                on_batch=graph.update,
+                max_tracked_spans=monitor_config.get("trace_dedup_spans", 1000000),
+                max_tracked_traces=monitor_config.get("trace_dedup_traces", 1000000),
+            )
+            with ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="jaeger-stream"
+            ) as pool:
+                for service in services:
+                    pool.submit(produce, service)
+
+                # Keep draining after a failure so that no producer stays blocked on the queue
+                remaining, error = len(services), None
+                while remaining:
+                    trace = traces.get()
+                    if trace is done:
+                        remaining -= 1
+                    elif error is None:
+                        try:
+                            batcher.add(trace)
+                        except Exception as e:
+                            error = e
+            if error is not None:
+                raise error
+            batcher.flush()
+
+        self.cleanup()  # Stop port-forwarding after traces are exported
+        print(
+            f"Streamed traces of {len(services)} services in {time.time() - started:.2f}s "
+            f"({batcher.stats()})"
+        )
+        if writer.rows == 0:
+            return "No traces found in the given time range."
+        graph.mark_ingested(writer.path)
+        return f"Traces data exported to: {writer.path}"
+
     def extract_traces(
         self, start_time: datetime, end_time: datetime, limit: int = None
     ) -> list:
         """
         Extract traces for all services between start_time and end_time.
+        Services are queried concurrently, with at most `trace_fetch_workers` in flight.
+        A trace returned for several services is kept once, with the spans of all copies.
         """
         services = self.get_services()
         print(f"services: {services}")
@@ -232,21 +314,33 @@ class TraceAPI:
         if services is None:
             print("No services found.")
             return all_traces
-        for service in services:
-            if service == "jaeger-all-in-one":  # Skip utility service
-                continue
-            traces = self.get_traces(
-                service_name=service,
-                start_time=start_time,
-                end_time=end_time,
-                limit=limit,
-            )
-            for trace in traces:
-                for span in trace["spans"]:
-                    span["serviceName"] = trace["processes"][span["processID"]][
-                        "serviceName"
-                    ]
-                all_traces.append(trace)  # Collect the trace with service name included
+        services = [s for s in services if s != "jaeger-all-in-one"]  # Skip utility service
+
+        started = time.time()
+        store = TraceStore()
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="jaeger-fetch"
+        ) as pool:
+            futures = [
+                pool.submit(
+                    self.get_traces,
+                    service_name=service,
+                    start_time=start_time,
+                    end_time=end_time,
+                    limit=limit,
+                )
+                for service in services
+            ]
+            # Merged as each service's results arrive (the store is only touched here)
+            for future in as_completed(futures):
+                for trace in future.result():
+                    store.add(trace)  # Spans get their service name included
+        print(
+            f"Fetched traces of {len(services)} services in {time.time() - started:.2f}s "
+            f"({store.stats()})"
+        )
+
+        all_traces = store.traces()
         self.cleanup()
         print("Cleanup completed.")
         # print(f"all_traces: {all_traces}")
@@ -254,65 +348,13 @@ class TraceAPI:
 
     def process_traces(self, traces) -> pd.DataFrame:
         """Process raw traces data into a structured DataFrame."""
-        trace_id_list = []
-        span_id_list = []
-        service_name_list = []
-        operation_name_list = []
-        start_time_list = []
-        duration_list = []
-        parent_span_list = []
-        error_list = []
-        response_list = []
-
-        for trace in traces:
-            trace_id = trace["traceID"]
-            for span in trace["spans"]:
-                trace_id_list.append(trace_id)
-                span_id_list.append(span["spanID"])
-                parent_span = "ROOT"
-                if "references" in span:
-                    for ref in span["references"]:
-                        if ref["refType"] == "CHILD_OF":
-                            parent_span = ref["spanID"]
-                            break
-                parent_span_list.append(parent_span)
-
-                service_name_list.append(
-                    span["serviceName"]
-                )  # Use the correct service name from the span
-                operation_name_list.append(span["operationName"])
-                start_time_list.append(span["startTime"])
-                duration_list.append(span["duration"])
-
-                has_error = False
-                response = "Unknown"
-                for tag in span.get("tags", []):
-                    if tag["key"] == "error" and tag["value"] == True:
-                        has_error = True
-                    if tag["key"] == "http.status_code" or tag["key"] == "response_class":
-                        response = tag["value"]
-                error_list.append(has_error)
-                response_list.append(response)
-
-        df = pd.DataFrame(
-            {
-                "trace_id": trace_id_list,
-                "span_id": span_id_list,
-                "parent_span": parent_span_list,
-                "service_name": service_name_list,
-                "operation_name": operation_name_list,
-                "start_time": start_time_list,
-                "duration": duration_list,
-                "has_error": error_list,
-                "response": response_list,
-            }
+        return pd.DataFrame(
+            [row for trace in traces for row in flatten_spans(trace)], columns=SPAN_COLUMNS
         )
-        return df
 
     def save_traces(self, df, path) -> str:
         os.makedirs(path, exist_ok=True)
-        file_path = os.path.join(path, f"traces_{int(time.time())}.csv")
-        df.to_csv(file_path, index=False)
+        file_path = write_table(df, os.path.join(path, f"traces_{int(time.time())}"))
         self.cleanup() # Stop port-forwarding after traces are exported
         return f"Traces data exported to: {file_path}"
 
@@ -0,0 +1,78 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Deduplicating store of Jaeger traces.
+
+Jaeger is queried per service, so a request crossing five services comes back
+five times, possibly with different subsets of its spans. The store keys traces
+by traceID and merges the spans of every copy (by spanID), so each trace and
+span is kept once no matter how many services returned it.
+"""
+
+
+class TraceStore:
+    """Traces keyed by traceID, with the spans of partial copies merged."""
+
+    def __init__(self):
+        self._traces: dict[str, dict] = {}
+        self._span_ids: dict[str, set] = {}
+        self.received_traces = 0
+        self.received_spans = 0
+
+    def add(self, trace: dict):
+        """Add one trace from a Jaeger response, merging it with an earlier copy."""
+        spans = trace.get("spans", [])
+        self.received_traces += 1
+        self.received_spans += len(spans)
+        processes = trace.get("processes", {})
+        for span in spans:
+            if "serviceName" not in span:
+                span["serviceName"] = processes[span["processID"]]["serviceName"]
+
+        trace_id = trace["traceID"]
+        stored = self._traces.get(trace_id)
+        if stored is None:
+            self._traces[trace_id] = trace
+            self._span_ids[trace_id] = {span["spanID"] for span in spans}
+            return
+
+        span_ids = self._span_ids[trace_id]
+        # Process IDs ("p1", "p2", ...) are local to each response: map them onto the stored ones
+        process_keys = {}
+        for span in spans:
+            if span["spanID"] in span_ids:
+                continue
+            process_id = span["processID"]
+            if process_id not in process_keys:
+                process_keys[process_id] = self._process_key(stored, processes[process_id])
+            span["processID"] = process_keys[process_id]
+            stored["spans"].append(span)
+            span_ids.add(span["spanID"])
+
+    @staticmethod
+    def _process_key(stored: dict, process: dict) -> str:
+        stored_processes = stored.setdefault("processes", {})
+        for key, value in stored_processes.items():
+            if value == process:
+                return key
+        key = f"p{len(stored_processes) + 1}"
+        while key in stored_processes:
+            key += "'"
+        stored_processes[key] = process
+        return key
+
+    def __len__(self):
+        return len(self._traces)
+
+    @property
+    def span_count(self) -> int:
+        return sum(len(span_ids) for span_ids in self._span_ids.values())
+
+    def traces(self) -> list[dict]:
+        return list(self._traces.values())
+
+    def stats(self) -> str:
+        return (
+            f"traces: {self.received_traces} received, {len(self)} unique; "
+            f"spans: {self.received_spans} received, {self.span_count} unique"
+        )
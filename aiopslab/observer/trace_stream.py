@@ -0,0 +1,218 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Streaming parsing and export of Jaeger traces with bounded memory.
+
+A Jaeger response (`{"data": [trace, ...], ...}`) is decoded one trace at a
+time while it is downloaded, and each trace is flattened into span rows as
+soon as it is decoded. Rows accumulate in a fixed-size columnar batch that is
+written to disk when full, so memory does not grow with the number of traces.
+
+To drop the copies of a trace returned for several services, the span IDs
+written so far are kept per trace, for the most recently seen traces only (up
+to a bound on the number of spans). Past that bound only the trace ID is kept,
+and a later copy of the trace is dropped whole: Jaeger returns the complete
+trace for every service, so it carries no new spans. Trace IDs are bounded too;
+copies of forgotten traces are written again, and counted in `stats()`.
+"""
+
+import codecs
+import json
+from collections import OrderedDict
+from typing import Iterable, Iterator
+
+import pandas as pd
+
+SPAN_COLUMNS = [
+    "trace_id",
+    "span_id",
+    "parent_span",
+    "service_name",
+    "operation_name",
+    "start_time",
+    "duration",
+    "has_error",
+    "response",
+]
+
+_decoder = json.JSONDecoder()
+
+
+def iter_json_array(chunks: Iterable[bytes], key: str = "data") -> Iterator:
+    """Yield the items of the top-level array `key` of a JSON object, decoding incrementally.
+
+    Args:
+        chunks (Iterable[bytes]): The document, in pieces (e.g. `response.iter_content()`).
+        key (str): The member holding the array.
+    """
+    buffer = ""
+    chunks = iter(chunks)
+    marker = f'"{key}"'
+    utf8 = codecs.getincrementaldecoder("utf-8")()  # chunks may split multi-byte characters
+
+    def more() -> bool:
+        nonlocal buffer
+        chunk = next(chunks, None)
+        if chunk is None:
+            return False
+        buffer += utf8.decode(chunk) if isinstance(chunk, bytes) else chunk
+        return True
+
+    # Find the start of the array
+    while True:
+        position = buffer.find(marker)
+        if position != -1:
+            bracket = buffer.find("[", position + len(marker))
+            if bracket != -1:
+                if buffer[position + len(marker) : bracket].strip() != ":":
+                    raise ValueError(f"'{key}' is not an array")
+                buffer = buffer[bracket + 1 :]
+                break
+        if not more():
+            return  # no such array (e.g. "data": null)
+
+    while True:
+        stripped = buffer.lstrip(" \t\r\n,")
+        if not stripped:
+            buffer = ""
+            if not more():
+                raise ValueError("Truncated JSON array")
+            continue
+        if stripped[0] == "]":
+            return
+        try:
+            item, end = _decoder.raw_decode(stripped)
+        except json.JSONDecodeError:
+            # The item is not complete yet
+            buffer = stripped
+            if not more():
+                raise
+            continue
+        buffer = stripped[end:]
+        yield item
+
+
+def flatten_spans(trace: dict) -> Iterator[tuple]:
+    """Yield one row (in `SPAN_COLUMNS` order) per span of a Jaeger trace."""
+    trace_id = trace["traceID"]
+    processes = trace.get("processes", {})
+    for span in trace["spans"]:
+        parent_span = "ROOT"
+        for ref in span.get("references", []):
+            if ref["refType"] == "CHILD_OF":
+                parent_span = ref["spanID"]
+                break
+
+        service_name = span.get("serviceName") or processes[span["processID"]]["serviceName"]
+
+        has_error = False
+        response = "Unknown"
+        for tag in span.get("tags", []):
+            if tag["key"] == "error" and tag["value"] == True:
+                has_error = True
+            if tag["key"] == "http.status_code" or tag["key"] == "response_class":
+                response = tag["value"]
+
+        yield (
+            trace_id,
+            span["spanID"],
+            parent_span,
+            service_name,
+            span["operationName"],
+            span["startTime"],
+            span["duration"],
+            has_error,
+            response,
+        )
+
+
+class SpanBatcher:
+    """Flattens traces into fixed-size columnar batches handed to a writer.
+
+    Args:
+        writer: Receives each full batch as a DataFrame (e.g. a `TelemetryWriter`).
+        batch_size (int): Span rows per batch.
+        on_batch (Callable): Also called with each batch once written.
+        max_tracked_spans (int): Span IDs remembered for deduplication, over the
+            most recently seen traces.
+        max_tracked_traces (int): IDs of traces whose span IDs were forgotten,
+            remembered to drop their later copies.
+    """
+
+    def __init__(
+        self,
+        writer,
+        batch_size: int = 10000,
+        on_batch=None,
+        max_tracked_spans: int = 1000000,
+        max_tracked_traces: int = 1000000,
+    ):
+        self.writer = writer
+        self.batch_size = batch_size
+        self.on_batch = on_batch
+        self.max_tracked_spans = max_tracked_spans
+        self.max_tracked_traces = max_tracked_traces
+        self._columns = [[] for _ in SPAN_COLUMNS]
+        # trace ID hash -> hashes of its written span IDs, least recently seen first
+        self._traces: OrderedDict[int, set] = OrderedDict()
+        self._tracked_spans = 0
+        # trace ID hashes of traces evicted from `_traces`, oldest first
+        self._evicted: OrderedDict[int, None] = OrderedDict()
+        self.received_traces = 0
+        self.unique_traces = 0
+        self.received_spans = 0
+        self.spans = 0
+        self.forgotten_traces = 0
+
+    def add(self, trace: dict):
+        self.received_traces += 1
+        key = hash(trace["traceID"])
+        if key in self._evicted:
+            self.received_spans += len(trace["spans"])
+            return
+        seen = self._traces.get(key)
+        if seen is None:
+            seen = self._traces[key] = set()
+            self.unique_traces += 1
+        else:
+            self._traces.move_to_end(key)
+        for row in flatten_spans(trace):
+            self.received_spans += 1
+            span_key = hash(row[1])
+            if span_key in seen:
+                continue
+            seen.add(span_key)
+            self._tracked_spans += 1
+            for column, value in zip(self._columns, row):
+                column.append(value)
+            self.spans += 1
+            if len(self._columns[0]) >= self.batch_size:
+                self.flush()
+
+        while self._tracked_spans > self.max_tracked_spans and len(self._traces) > 1:
+            evicted, spans = self._traces.popitem(last=False)
+            self._tracked_spans -= len(spans)
+            self._evicted[evicted] = None
+        while len(self._evicted) > self.max_tracked_traces:
+            self._evicted.popitem(last=False)
+            self.forgotten_traces += 1
+
+    def flush(self):
+        if self._columns[0]:
+            batch = pd.DataFrame(dict(zip(SPAN_COLUMNS, self._columns)))
+            self.writer.write(batch)
+            if self.on_batch:
+                self.on_batch(batch)
+            self._columns = [[] for _ in SPAN_COLUMNS]
+
+    def stats(self) -> str:
+        stats = (
+            f"traces: {self.received_traces} received, {self.unique_traces} unique; "
+            f"spans: {self.received_spans} received, {self.spans} unique"
+        )
+        if self.forgotten_traces:
+            stats += (
+                f"; {self.forgotten_traces} trace IDs forgotten, "
+                f"later copies of those traces may be duplicated"
+            )
+        return stats
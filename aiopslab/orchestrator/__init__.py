@@ -2,3 +2,4 @@
 # Licensed under the MIT License.
 
 from .orchestrator import Orchestrator
+from .batch import BatchRunner
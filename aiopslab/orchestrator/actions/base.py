@@ -10,10 +10,13 @@ from aiopslab.utils.actions import action, read, write
 from aiopslab.service.kubectl import KubeCtl
 from aiopslab.service.dock import Docker
 from aiopslab.service.shell import Shell
+from aiopslab.utils.run_scope import base_namespace, run_scoped
 
 # from aiopslab.observer import initialize_pod_and_service_lists
 from aiopslab.observer.metric_api import PrometheusAPI
 from aiopslab.observer.trace_api import TraceAPI
+from aiopslab.observer import metric_summary, service_graph, telemetry_query, trace_analysis
+from aiopslab.observer.telemetry_store import read_table
 
 
 class TaskActions:
@@ -41,19 +44,22 @@ class TaskActions:
         
         else:
             kubectl = KubeCtl()
+            app_namespace = base_namespace(namespace)
             try:
-                if namespace == "test-social-network":
+                if app_namespace == "test-social-network":
                     user_service_pod = kubectl.get_pod_name(namespace, f"app={service}")
-                elif namespace == "test-hotel-reservation":
+                elif app_namespace == "test-hotel-reservation":
                     user_service_pod = kubectl.get_pod_name(
                         namespace, f"io.kompose.service={service}"
                     )
-                elif namespace == "astronomy-shop":
+                elif app_namespace == "astronomy-shop":
                     user_service_pod = kubectl.get_pod_name(
                         namespace, f"app.kubernetes.io/name={service}"
                     )
                 elif namespace == "default" and "wrk2-job" in service:
-                    user_service_pod = kubectl.get_pod_name(namespace, f"job-name=wrk2-job")
+                    user_service_pod = kubectl.get_pod_name(
+                        namespace, f"job-name={run_scoped('wrk2-job')}"
+                    )
                 else:
                         raise Exception
                 logs = kubectl.get_pod_logs(user_service_pod, namespace)
@@ -112,7 +118,7 @@ class TaskActions:
 
         # Export all metrics and save to the specified path
         save_dir_str = prometheus_api.export_all_metrics(
-            start_time=start_time, end_time=end_time, save_path=save_path, step=15
+            start_time=start_time, end_time=end_time, save_path=save_path
         )
 
         return save_dir_str
@@ -121,10 +127,10 @@ class TaskActions:
     @read
     def read_metrics(file_path: str) -> str:
         """
-        Reads and returns metrics from a specified CSV file.
+        Reads and returns metrics from a specified file.
 
         Args:
-            file_path (str): Path to the metrics file (CSV format).
+            file_path (str): Path to the metrics file (CSV, Parquet or Arrow format).
 
         Returns:
             str: The requested metrics or an error message.
@@ -133,13 +139,120 @@ class TaskActions:
             return f"error: Metrics file '{file_path}' not found."
 
         try:
-            df_metrics = pd.read_csv(file_path)
+            df_metrics = read_table(file_path)
 
             return df_metrics.to_string(index=False)
 
         except Exception as e:
             return f"Failed to read metrics: {str(e)}"
 
+    @staticmethod
+    @read
+    def summarize_metrics(file_path: str, top_k: int = 20) -> str:
+        """
+        Summarizes metrics per series (cmdb_id, kpi_name) instead of returning every sample:
+        min, max, mean, p50/p95/p99, last value, slope per minute and an anomaly score
+        (deviation from the series' recent median, in units of its noise level). The most anomalous series come first.
+
+        Args:
+            file_path (str): Path to a metrics file, or to a directory of exported metrics.
+            top_k (int): The number of series to return.
+
+        Returns:
+            str: The series summaries or an error message.
+        """
+        if not os.path.exists(file_path):
+            return f"error: Metrics path '{file_path}' not found."
+
+        try:
+            if os.path.isdir(file_path):
+                files = [
+                    os.path.join(root, name)
+                    for root, _, names in os.walk(file_path)
+                    for name in sorted(names)
+                    if name.endswith((".csv", ".parquet", ".arrow"))
+                ]
+            else:
+                files = [file_path]
+            tables = [read_table(path) for path in files]
+            tables = [df for df in tables if not df.empty]
+            if not tables:
+                return f"No metrics found in '{file_path}'."
+
+            df_metrics = pd.concat(tables, ignore_index=True)
+            summary = metric_summary.summarize_metrics(df_metrics)
+            return metric_summary.format_summary(summary, len(df_metrics), top_k)
+
+        except Exception as e:
+            return f"Failed to summarize metrics: {str(e)}"
+
+    @staticmethod
+    @read
+    def query_telemetry(
+        file_path: str,
+        service: str = None,
+        pod: str = None,
+        kpi: str = None,
+        start: float = None,
+        end: float = None,
+        columns: list = None,
+        filters: list = None,
+        group_by: list = None,
+        aggregates: dict = None,
+        sort_by: str = None,
+        descending: bool = False,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> str:
+        """
+        Queries an exported metrics or traces file and returns one page of the result,
+        instead of the whole file.
+
+        Args:
+            file_path (str): Path to the metrics or traces file.
+            service (str): Only rows of this service.
+            pod (str): Only rows whose cmdb_id contains this pod name.
+            kpi (str): Only rows whose kpi_name contains this text.
+            start (float): Only rows at or after this unix time (seconds).
+            end (float): Only rows at or before this unix time (seconds).
+            columns (list): The columns to return.
+            filters (list): Extra filters as [column, op, value] with op one of
+                ==, !=, <, <=, >, >=, in, contains. E.g. [["duration", ">", 100000]].
+            group_by (list): Columns to group by, e.g. ["service_name", "operation_name"].
+            aggregates (dict): Aggregates per group, e.g. {"duration": ["mean", "p99"]}
+                (count, sum, mean, min, max, median, nunique, p95, p99). Default: row count.
+            sort_by (str): Column to sort by.
+            descending (bool): Sort in descending order.
+            limit (int): The number of rows to return.
+            offset (int): The number of rows to skip (for the next pages).
+
+        Returns:
+            str: The requested rows or an error message.
+        """
+        if not os.path.exists(file_path):
+            return f"error: Telemetry file '{file_path}' not found."
+
+        try:
+            query_filters = telemetry_query.build_filters(
+                telemetry_query.table_columns(file_path), service, pod, kpi, start, end
+            )
+            query_filters += [tuple(f) for f in filters or []]
+            page, total = telemetry_query.query_table(
+                file_path,
+                columns=columns,
+                filters=query_filters,
+                group_by=group_by,
+                aggregates=aggregates,
+                sort_by=sort_by,
+                descending=descending,
+                limit=limit,
+                offset=offset,
+            )
+            return telemetry_query.format_page(page, total, offset)
+
+        except Exception as e:
+            return f"Failed to query telemetry: {str(e)}"
+
     @staticmethod
     @read
     def get_traces(namespace: str, duration: int = 5) -> str:
@@ -159,22 +272,20 @@ class TaskActions:
 
         end_time = datetime.now()
         start_time = end_time - timedelta(minutes=duration)
-
-        traces = trace_api.extract_traces(start_time=start_time, end_time=end_time)
-        df_traces = trace_api.process_traces(traces)
         save_path = os.path.join(os.getcwd(), "trace_output")
 
-        return trace_api.save_traces(df_traces, save_path)
+        # Streamed to disk in batches, so long lookbacks don't hold every trace in memory
+        return trace_api.export_traces(start_time, end_time, save_path)
         # return f"Trace data exported to: {save_path}"
 
     @staticmethod
     @read
     def read_traces(file_path: str) -> str:
         """
-        Reads and returns traces from a specified CSV file.
+        Reads and returns traces from a specified file.
 
         Args:
-            file_path (str): Path to the traces file (CSV format).
+            file_path (str): Path to the traces file (CSV, Parquet or Arrow format).
 
         Returns:
             str: The requested traces or an error message.
@@ -183,13 +294,91 @@ class TaskActions:
             return f"error: Traces file '{file_path}' not found."
 
         try:
-            df_traces = pd.read_csv(file_path)
+            df_traces = read_table(file_path)
 
             return df_traces.to_string(index=False)
 
         except Exception as e:
             return f"Failed to read traces: {str(e)}"
 
+    @staticmethod
+    @read
+    def analyze_traces(file_path: str, top_k: int = 10) -> str:
+        """
+        Analyzes the span trees of exported traces instead of returning raw spans:
+        latency percentiles and self time per operation, where errors originate
+        (and which requests they reach), and which operations make up the critical
+        path of the slowest traces.
+
+        Args:
+            file_path (str): Path to the traces file.
+            top_k (int): The number of rows per table.
+
+        Returns:
+            str: The analysis or an error message.
+        """
+        if not os.path.exists(file_path):
+            return f"error: Traces file '{file_path}' not found."
+
+        try:
+            df_traces = read_table(file_path)
+            if df_traces.empty:
+                return f"No spans found in '{file_path}'."
+
+            result = trace_analysis.analyze_traces(df_traces)
+            return trace_analysis.format_analysis(result, top_k)
+
+        except Exception as e:
+            return f"Failed to analyze traces: {str(e)}"
+
+    @staticmethod
+    @read
+    def get_service_graph(file_path: str, view: str = "degraded", top_k: int = 10) -> str:
+        """
+        Returns the service dependency graph built from exported traces, with request
+        rate, error rate and p50/p95/p99 latency (ms) on each caller -> callee edge.
+        The graph is cumulative: it covers every traces export of the current problem
+        (not only the given file), and each export adds only the spans not seen before.
+
+        Args:
+            file_path (str): Path to a traces file exported by get_traces; selects the
+                problem's graph. A file from elsewhere gets a graph of its own.
+            view (str): "degraded" for the top_k edges by error rate then p99 latency,
+                or "adjacency" for every caller with its outgoing edges.
+            top_k (int): The number of edges in the "degraded" view.
+
+        Returns:
+            str: The graph or an error message.
+        """
+        if not os.path.exists(file_path):
+            return f"error: Traces file '{file_path}' not found."
+        if view not in ("degraded", "adjacency"):
+            return f"error: Unknown view '{view}'. Use 'degraded' or 'adjacency'."
+
+        try:
+            graph = service_graph.graph_for_file(file_path)
+            # Exports of this problem were folded in while streaming; this only reads other files
+            graph.ingest_file(file_path)
+            if not graph.edges:
+                return "No calls between services found in the traces."
+
+            fmt = "{:.4g}".format
+            header = f"Cumulative graph over {len(graph.files)} traces file(s):\n"
+            if view == "degraded":
+                return header + graph.degraded(top_k).to_string(index=False, float_format=fmt)
+            return header + "\n".join(
+                f"{caller} -> "
+                + ", ".join(
+                    f"{e['callee']} (rate={e['rate']:.3g}/s, errors={e['error_rate']:.1%}, "
+                    f"p99={e['p99']:.3g}ms)"
+                    for e in edges
+                )
+                for caller, edges in graph.adjacency().items()
+            )
+
+        except Exception as e:
+            return f"Failed to build service graph: {str(e)}"
+
     @staticmethod
     # @read
     # NOTE: disabled for now, since seems like a cheat for code changes
@@ -0,0 +1,144 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Batch runner that executes several problems concurrently."""
+
+import asyncio
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable
+
+from aiopslab.orchestrator.orchestrator import Orchestrator
+from aiopslab.orchestrator.problems.registry import ProblemRegistry
+from aiopslab.service.infra import InfraManager
+from aiopslab.service.informer import InformerCache
+from aiopslab.utils.run_scope import run_scope
+
+
+class BatchRunner:
+    """Run many problems at once, each with its own orchestrator, session and namespace.
+
+    Every run is given a short run id; application namespaces (and shared object
+    names such as the wrk2 job) are suffixed with it, e.g. `test-hotel-reservation-3a9f`,
+    so concurrent runs deploy, inject faults and clean up independently.
+    Shared infrastructure (OpenEBS, Prometheus, Chaos Mesh) is kept warm by one
+    persistent InfraManager, created only if a problem runs on the cluster:
+    installed once, health-checked between problems and torn down when the batch ends.
+    """
+
+    def __init__(
+        self,
+        agent_factory: Callable,
+        agent_name: str = "agent",
+        max_concurrency: int = 4,
+        max_steps: int = 30,
+        results_dir=None,
+        isolate_namespaces: bool | None = None,
+        keep_infra: bool = False,
+    ):
+        """
+        Args:
+            agent_factory (Callable): Returns a fresh agent for each problem.
+            agent_name (str): Name the agent is registered with.
+            max_concurrency (int): Maximum number of problems running at the same time.
+            max_steps (int): Maximum number of agent steps per problem.
+            results_dir (str): Directory where session results are written.
+            isolate_namespaces (bool): Rewrite namespaces per run (default: only when concurrent).
+            keep_infra (bool): Leave the shared infrastructure installed after the batch.
+        """
+        self.agent_factory = agent_factory
+        self.agent_name = agent_name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_steps = max_steps
+        self.results_dir = results_dir
+        self.isolate_namespaces = (
+            self.max_concurrency > 1 if isolate_namespaces is None else isolate_namespaces
+        )
+        self.keep_infra = keep_infra
+        self.infra = None  # created by `run` when a problem needs the cluster infrastructure
+        if self.max_concurrency > 1:
+            # Serve repeated pod/service/deployment reads from shared watches
+            InformerCache.enable()
+        self.probs = ProblemRegistry()
+
+    def run(self, problem_ids: list[str] | None = None) -> dict:
+        """Run the given problems (default: the whole registry).
+
+        Args:
+            problem_ids (list[str]): Problem identifiers to run.
+
+        Returns:
+            dict: problem id -> {"run_id", "duration", "output"} or {"run_id", "duration", "error"}.
+        """
+        problem_ids = problem_ids or self.probs.get_problem_ids()
+        needs_infra = any(
+            self.probs.get_problem_deployment(pid) != "docker" for pid in problem_ids
+        )
+
+        if needs_infra:
+            self.infra = self.infra or InfraManager(persistent=True)
+            self.infra.setup()
+
+        results = {}
+        start = time.time()
+        try:
+            with ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix="aiopslab-run"
+            ) as pool:
+                futures = {
+                    pool.submit(self._run_one, pid): pid for pid in problem_ids
+                }
+                for future in as_completed(futures):
+                    pid = futures[future]
+                    results[pid] = future.result()
+                    status = "failed" if "error" in results[pid] else "done"
+                    print(
+                        f"[{len(results)}/{len(problem_ids)}] {pid} {status} "
+                        f"in {results[pid]['duration']:.1f}s"
+                    )
+        finally:
+            InformerCache.stop_all()
+            if self.infra and not self.keep_infra:
+                self.infra.close()
+
+        print(
+            f"Batch finished: {len(results)} problems in {time.time() - start:.1f}s "
+            f"(concurrency={self.max_concurrency})"
+        )
+        if self.infra:
+            print(f"Infrastructure timings: {self.infra.timings}")
+        return results
+
+    def _run_one(self, problem_id: str) -> dict:
+        """Run a single problem end-to-end inside its own run scope."""
+        run_id = uuid.uuid4().hex[:4] if self.isolate_namespaces else None
+        start = time.time()
+
+        with run_scope(run_id):
+            try:
+                agent = self.agent_factory()
+                orchestrator = Orchestrator(
+                    results_dir=self.results_dir, infra=self.infra
+                )
+                orchestrator.register_agent(agent, name=self.agent_name)
+
+                problem_desc, instructs, apis = orchestrator.init_problem(problem_id)
+                agent.init_context(problem_desc, instructs, apis)
+                output = asyncio.run(
+                    orchestrator.start_problem(max_steps=self.max_steps)
+                )
+                return {
+                    "run_id": run_id,
+                    "duration": time.time() - start,
+                    "output": output,
+                }
+            except Exception as e:
+                print(f"Error while running problem {problem_id}: {e}")
+                traceback.print_exc()
+                return {
+                    "run_id": run_id,
+                    "duration": time.time() - start,
+                    "error": str(e),
+                }
@@ -10,16 +10,20 @@ from aiopslab.orchestrator.problems.registry import ProblemRegistry
 from aiopslab.orchestrator.parser import ResponseParser
 from aiopslab.utils.status import *
 from aiopslab.utils.critical_section import CriticalSection
-from aiopslab.service.telemetry.prometheus import Prometheus
+from aiopslab.service.infra import InfraManager
+from aiopslab.observer import service_graph
+from aiopslab.service.shell import Shell
+from aiopslab.utils.run_scope import bind_run_scope
 import time
 import inspect
 import asyncio
 import atexit
+import functools
 import os
 
 
 class Orchestrator:
-    def __init__(self, results_dir=None):
+    def __init__(self, results_dir=None, infra=None):
         self.agent = None
         self.session = None
         self.parser = ResponseParser()
@@ -30,6 +34,28 @@ class Orchestrator:
         self.kubectl = KubeCtl()
         self.use_wandb = os.getenv("USE_WANDB", "false").lower() == "true"
         self.results_dir = results_dir
+        # Shared infrastructure (OpenEBS, Prometheus, ...); a BatchRunner passes
+        # one persistent manager to all of its orchestrators and closes it itself.
+        # Otherwise one is created on first use (see `infra`).
+        self._owns_infra = infra is None
+        self._infra = infra
+        self._exit_cleanup = None
+
+    @property
+    def infra(self) -> InfraManager:
+        """The infrastructure manager, created by the first problem that needs it."""
+        if self._infra is None:
+            self._infra = InfraManager()
+            if self._infra.persistent:
+                # Persistent infrastructure outlives problems; tear it down with the process
+                atexit.register(self.close)
+        return self._infra
+
+    def close(self):
+        """Tear down the infrastructure this orchestrator created (kept by persistent mode)."""
+        if self._owns_infra and self._infra is not None:
+            self._infra.close()
+            atexit.unregister(self.close)
 
     def init_problem(self, problem_id: str):
         """Initialize a problem instance for the agent to solve.
@@ -51,21 +77,7 @@ class Orchestrator:
         self.session.set_agent(self.agent_name)
 
         if deployment != "docker":
-            print("Setting up OpenEBS...")
-
-            # Install OpenEBS
-            self.kubectl.exec_command(
-                "kubectl apply -f https://openebs.github.io/charts/openebs-operator.yaml"
-            )
-            self.kubectl.exec_command(
-                "kubectl patch storageclass openebs-hostpath -p '{\"metadata\": {\"annotations\":{\"storageclass.kubernetes.io/is-default-class\":\"true\"}}}'"
-            )
-            self.kubectl.wait_for_ready("openebs")
-            print("OpenEBS setup completed.")
-
-            # Setup and deploy Prometheus
-            self.prometheus = Prometheus()
-            self.prometheus.deploy()
+            self.infra.before_problem()
 
         # deploy service
         prob.app.delete()
@@ -76,7 +88,12 @@ class Orchestrator:
         with CriticalSection():
             # inject fault
             prob.inject_fault()
-            atexit.register(exit_cleanup_fault, prob=prob)
+            # a per-problem callback, so concurrent runs only unregister their own;
+            # bound to the run id, since atexit handlers don't see the run's context
+            self._exit_cleanup = bind_run_scope(
+                functools.partial(exit_cleanup_fault, prob=prob)
+            )
+            atexit.register(self._exit_cleanup)
 
         # Check if start_workload is async or sync
         if inspect.iscoroutinefunction(prob.start_workload):
@@ -177,7 +194,7 @@ class Orchestrator:
             with CriticalSection():
                 print("Some exception happened. Recovering the injected fault...")
                 self.session.problem.recover_fault()
-                atexit.unregister(exit_cleanup_fault)
+                atexit.unregister(self._exit_cleanup)
             raise e
 
         self.session.end()
@@ -196,22 +213,18 @@ class Orchestrator:
 
         with CriticalSection():
             self.session.problem.recover_fault()
-            atexit.unregister(exit_cleanup_fault)
+            atexit.unregister(self._exit_cleanup)
             
         # Beyond recovering from fault,
         # I feel sometimes it is safer to delete the whole namespace.
         # But this will take more time.
         # if not self.session.problem.sys_status_after_recovery():
         self.session.problem.app.cleanup()
+        service_graph.drop_graphs(self.session.problem.namespace)
+        Shell.close_session()
         
         if self.session.problem.namespace != "docker":
-            self.prometheus.teardown()
-            print("Uninstalling OpenEBS...")
-            self.kubectl.exec_command("kubectl delete sc openebs-hostpath openebs-device --ignore-not-found")
-            self.kubectl.exec_command(
-                "kubectl delete -f https://openebs.github.io/charts/openebs-operator.yaml"
-            )
-            self.kubectl.wait_for_namespace_deletion("openebs")
+            self.infra.after_problem()
 
         self.execution_end_time = time.time()
         total_execution_time = self.execution_end_time - self.execution_start_time
@@ -183,7 +183,7 @@ class AssignNonExistentNodeSocialNetMitigation(
         super().eval(soln, trace, duration)
 
         # Check if all services (not only faulty service) is back to normal (Running)
-        pod_list = self.kubectl.list_pods(self.namespace)
+        pod_list = self.kubectl.list_pods(self.namespace, consistent=True)
         all_normal = True
 
         # Check if the faulty service exists
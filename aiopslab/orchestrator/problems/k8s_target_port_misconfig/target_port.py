@@ -177,7 +177,7 @@ class K8STargetPortMisconfigMitigation(K8STargetPortMisconfigBaseTask, Mitigatio
 
         if all_normal:
             # Check if all services (not only faulty service) is back to normal (Running)
-            pod_list = self.kubectl.list_pods(self.namespace)
+            pod_list = self.kubectl.list_pods(self.namespace, consistent=True)
             for pod in pod_list.items:
                 if pod.status.container_statuses:
                     # Check container statuses
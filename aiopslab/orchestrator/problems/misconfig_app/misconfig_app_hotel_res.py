@@ -170,7 +170,7 @@ class MisconfigAppHotelResMitigation(MisconfigAppHotelResBaseTask, MitigationTas
         all_normal = True
         # Polling for 1 minute to check if all services are back to normal
         for _ in range(12): # 5 seconds interval, 12 times, total 1 minute
-            pod_list = self.kubectl.list_pods(self.namespace)
+            pod_list = self.kubectl.list_pods(self.namespace, consistent=True)
             for pod in pod_list.items:
                 # Check container statuses
                 for container_status in pod.status.container_statuses:
@@ -165,7 +165,7 @@ class RedeployWithoutPVMitigation(RedeployWithoutPVBaseTask, MitigationTask):
         super().eval(soln, trace, duration)
 
         # Check if all services (not only faulty service) is back to normal (Running)
-        pod_list = self.kubectl.list_pods(self.namespace)
+        pod_list = self.kubectl.list_pods(self.namespace, consistent=True)
         all_normal = True
 
         for pod in pod_list.items:
@@ -195,7 +195,7 @@ class ScalePodSocialNetMitigation(ScalePodSocialNetBaseTask, MitigationTask):
                 all_normal = False
 
         # Check if all services are running normally
-        pod_list = self.kubectl.list_pods(self.namespace)
+        pod_list = self.kubectl.list_pods(self.namespace, consistent=True)
         for pod in pod_list.items:
             for container_status in pod.status.container_statuses:
                 if (
@@ -56,7 +56,7 @@ class Task:
             self.add_result("reasoning_score", score)
 
     def sys_status_after_recovery(self) -> bool:
-        pod_list = self.kubectl.list_pods(self.namespace)
+        pod_list = self.kubectl.list_pods(self.namespace, consistent=True)
         all_normal = True
 
         for pod in pod_list.items:
@@ -3,6 +3,7 @@
 
 import json
 from aiopslab.paths import TARGET_MICROSERVICES
+from aiopslab.utils.run_scope import run_namespace
 
 
 class Application:
@@ -26,9 +27,13 @@ class Application:
             metadata = json.load(file)
 
         self.name = metadata["Name"]
-        self.namespace = metadata["Namespace"]
+        self.namespace = run_namespace(metadata["Namespace"])
         if "Helm Config" in metadata:
             self.helm_configs = metadata["Helm Config"]
+            if "namespace" in self.helm_configs:
+                self.helm_configs["namespace"] = run_namespace(
+                    self.helm_configs["namespace"]
+                )
             chart_path = self.helm_configs.get("chart_path")
             
             if chart_path and not self.helm_configs.get("remote_chart", False):
@@ -59,7 +64,7 @@ class Application:
         """
         app_json = self.get_app_json()
         app_name = app_json.get("Name", "")
-        namespace = app_json.get("Namespace", "")
+        namespace = self.namespace or app_json.get("Namespace", "")
         desc = app_json.get("Desc", "")
         supported_operations = app_json.get("Supported Operations", [])
         operations_str = "\n".join([f"  - {op}" for op in supported_operations])
@@ -70,14 +75,7 @@ class Application:
 
     def create_namespace(self):
         """Create the namespace for the application if it doesn't exist."""
-        result = self.kubectl.exec_command(f"kubectl get namespace {self.namespace}")
-        if "notfound" in result.lower():
-            print(f"Namespace {self.namespace} not found. Creating namespace.")
-            create_namespace_command = f"kubectl create namespace {self.namespace}"
-            create_result = self.kubectl.exec_command(create_namespace_command)
-            print(f"Namespace {self.namespace} created successfully: {create_result}")
-        else:
-            print(f"Namespace {self.namespace} already exists.")
+        self.kubectl.create_namespace_if_not_exist(self.namespace)
 
     def cleanup(self):
         """Delete the entire namespace for the application."""
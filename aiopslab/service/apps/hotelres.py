@@ -1,7 +1,6 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
 
-import time
 from aiopslab.service.kubectl import KubeCtl
 from aiopslab.service.apps.base import Application
 from aiopslab.paths import FAULT_SCRIPTS, HOTEL_RES_METADATA
@@ -76,7 +75,11 @@ class HotelReservation(Application):
         print(f"Deploying Kubernetes configurations in namespace: {self.namespace}")
         self.kubectl.apply_configs(self.namespace, self.k8s_deploy_path)
         print(f"Waiting for stability...")
-        time.sleep(30)
+        # Faulty deployments may never become ready; return early only if they do
+        try:
+            self.kubectl.wait_for_ready(self.namespace, max_wait=30)
+        except TimeoutError:
+            print(f"Pods in namespace {self.namespace} are not ready after 30s; continuing")
 
     def delete(self):
         """Delete the configmap."""
@@ -84,27 +87,13 @@ class HotelReservation(Application):
 
     def cleanup(self):
         """Delete the entire namespace for the hotel reservation application."""
+        # delete_namespace blocks (via watch) until the namespace is gone,
+        # at which point its PVs are released and can be swept
         self.kubectl.delete_namespace(self.namespace)
-        time.sleep(10)
-        pvs = self.kubectl.exec_command(
-            "kubectl get pv --no-headers | grep 'test-hotel-reservation' | awk '{print $1}'"
-        ).splitlines()
-
-        for pv in pvs:
-            # Check if the PV is in a 'Terminating' state and remove the finalizers if necessary
-            self._remove_pv_finalizers(pv)
-            delete_command = f"kubectl delete pv {pv}"
-            delete_result = self.kubectl.exec_command(delete_command)
-            print(f"Deleted PersistentVolume {pv}: {delete_result.strip()}")
-        time.sleep(5)
-
-    def _remove_pv_finalizers(self, pv_name: str):
-        """Remove finalizers from the PersistentVolume to prevent it from being stuck in a 'Terminating' state."""
-        # Patch the PersistentVolume to remove finalizers if it is stuck
-        patch_command = (
-            f'kubectl patch pv {pv_name} -p \'{{"metadata":{{"finalizers":null}}}}\''
-        )
-        _ = self.kubectl.exec_command(patch_command)
+
+        # Clears finalizers first so released PVs do not get stuck in 'Terminating'
+        for pv in self.kubectl.delete_released_pvs(self.namespace):
+            print(f"Deleted PersistentVolume {pv}")
 
     # helper methods
     def _prepare_configmap_data(self, script_files: list) -> dict:
@@ -28,17 +28,16 @@ class SocialNetwork(Application):
         self.frontend_port = metadata.get("frontend_port", 8080)
 
     def create_tls_secret(self):
-        check_sec = f"kubectl get secret mongodb-tls -n {self.namespace}"
-        result = self.kubectl.exec_command(check_sec)
-        if "notfound" in result.lower():
-            create_sec_command = (
-                f"kubectl create secret generic mongodb-tls "
-                f"--from-file=tls.pem={self.local_tls_path}/tls.pem "
-                f"--from-file=ca.crt={self.local_tls_path}/ca.crt "
-                f"-n {self.namespace}"
-            )
-            create_result = self.kubectl.exec_command(create_sec_command)
-            print(f"TLS secret created: {create_result.strip()}")
+        created = self.kubectl.create_secret_if_not_exist(
+            "mongodb-tls",
+            self.namespace,
+            {
+                "tls.pem": self.local_tls_path / "tls.pem",
+                "ca.crt": self.local_tls_path / "ca.crt",
+            },
+        )
+        if created:
+            print("TLS secret created: secret/mongodb-tls created")
         else:
             print("TLS secret already exists. Skipping creation.")
 
@@ -0,0 +1,197 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Long-lived shell sessions inside a Docker container (e.g. kind's control plane).
+
+Instead of one `docker exec` per command, a session keeps a single
+`docker exec -i <container> sh` process open and sends commands over its stdin.
+Every command is tagged with a request id; the container side runs it in a
+child shell, captures stdout/stderr to temp files and answers with one framed
+line `<sentinel> <id> <exit code> <b64 stdout> <b64 stderr>`, which a reader
+thread routes back to the waiting caller. Commands are base64-encoded on the
+way in, so no quote escaping is needed. A timeout is enforced inside the
+container (with `timeout`), so a timed-out command still returns its partial
+output and the session stays usable.
+"""
+
+import math
+
+import base64
+import queue
+import subprocess
+import threading
+import uuid
+
+SENTINEL = "__AIOPSLAB_DONE__"
+
+# Exit code of `timeout` when the command timed out
+TIMEOUT_EXIT_CODE = 124
+
+# Seconds to wait for the framed reply past the command's own timeout
+REPLY_GRACE = 5
+
+# Runs one framed request; $1 is the request id, $2 the base64-encoded command,
+# $3 the timeout in seconds (none if empty)
+_RUNNER = (
+    "__aiopslab_run() {{ "
+    "o=/tmp/.aiopslab-$1.out; e=/tmp/.aiopslab-$1.err; t=; "
+    '[ -n "$3" ] && command -v timeout >/dev/null 2>&1 && t="timeout -k 2 $3"; '
+    '$t sh -c "$(printf %s "$2" | base64 -d)" </dev/null >"$o" 2>"$e"; rc=$?; '
+    'printf "{sentinel} %s %s " "$1" "$rc"; base64 -w0 <"$o"; printf " "; '
+    'base64 -w0 <"$e"; printf "\\n"; rm -f "$o" "$e"; }}\n'
+).format(sentinel=SENTINEL)
+
+
+class ShellTimeout(Exception):
+    """The command did not finish in time; carries the output it produced until then."""
+
+    def __init__(self, message: str, stdout: str = "", stderr: str = ""):
+        super().__init__(message)
+        self.stdout = stdout
+        self.stderr = stderr
+
+
+class ShellUnavailable(RuntimeError):
+    """The session could not be started or died before the command was sent."""
+
+
+class DockerShellSession:
+    """One persistent `sh` inside a container; runs one command at a time."""
+
+    def __init__(self, container_name: str):
+        self.container_name = container_name
+        try:
+            self.proc = subprocess.Popen(
+                ["docker", "exec", "-i", container_name, "sh"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError as e:
+            raise ShellUnavailable(f"Cannot start a shell session in {container_name}: {e}")
+        self._pending: dict[str, queue.Queue] = {}
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(
+            target=self._read_loop, name=f"docker-shell-{container_name}", daemon=True
+        )
+        self._reader.start()
+        try:
+            self._send(_RUNNER)
+        except OSError as e:
+            self.close()
+            raise ShellUnavailable(f"Shell session in {container_name} died: {e}")
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def _send(self, data: str):
+        self.proc.stdin.write(data.encode("utf-8"))
+        self.proc.stdin.flush()
+
+    def _read_loop(self):
+        for raw in self.proc.stdout:
+            parts = raw.decode("utf-8", errors="replace").rstrip("\n").split(" ")
+            if len(parts) < 3 or parts[0] != SENTINEL:
+                continue
+            request_id, returncode = parts[1], int(parts[2])
+            stdout = base64.b64decode(parts[3]) if len(parts) > 3 else b""
+            stderr = base64.b64decode(parts[4]) if len(parts) > 4 else b""
+            with self._lock:
+                waiter = self._pending.pop(request_id, None)
+            if waiter:
+                waiter.put(
+                    (
+                        returncode,
+                        stdout.decode("utf-8", errors="replace"),
+                        stderr.decode("utf-8", errors="replace"),
+                    )
+                )
+
+        # The shell exited: wake up anyone still waiting
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for waiter in pending.values():
+            waiter.put(None)
+
+    def run(self, command: str, timeout: float | None = None) -> tuple[int, str, str]:
+        """Run a command and return (exit code, stdout, stderr).
+
+        Raises:
+            ShellTimeout: If the command does not finish within `timeout` seconds, with
+                its partial output. Should the session not answer either, it is closed,
+                since the command may still be running in it.
+            ShellUnavailable: If the session died before the command was sent.
+            RuntimeError: If the session died after the command was sent (it may have run).
+        """
+        request_id = uuid.uuid4().hex[:12]
+        waiter = queue.Queue(maxsize=1)
+        with self._lock:
+            self._pending[request_id] = waiter
+
+        encoded = base64.b64encode(command.encode("utf-8")).decode("ascii")
+        seconds = max(1, math.ceil(timeout)) if timeout else ""
+        try:
+            try:
+                self._send(f"__aiopslab_run {request_id} {encoded} {seconds}\n")
+            except OSError as e:
+                self.close()
+                raise ShellUnavailable(f"Shell session in {self.container_name} died: {e}")
+            result = waiter.get(timeout=seconds + REPLY_GRACE if timeout else None)
+        except queue.Empty:
+            self.close()
+            raise ShellTimeout(f"Command timed out after {timeout}s: {command}")
+        finally:
+            with self._lock:
+                self._pending.pop(request_id, None)
+
+        if result is None:
+            raise RuntimeError(f"Shell session in {self.container_name} exited")
+        if timeout and result[0] == TIMEOUT_EXIT_CODE:
+            raise ShellTimeout(f"Command timed out after {timeout}s: {command}", *result[1:])
+        return result
+
+    def close(self):
+        if self.alive:
+            self.proc.kill()
+        self.proc.wait()
+
+
+class DockerShellPool:
+    """Hands out persistent sessions per container; concurrent callers get separate sessions."""
+
+    def __init__(self, max_sessions: int = 4):
+        self.max_sessions = max_sessions
+        self._idle: dict[str, list[DockerShellSession]] = {}
+        self._lock = threading.Lock()
+
+    def run(self, container_name: str, command: str, timeout: float | None = None):
+        session = self._acquire(container_name)
+        try:
+            return session.run(command, timeout=timeout)
+        finally:
+            self._release(session)
+
+    def _acquire(self, container_name: str) -> DockerShellSession:
+        with self._lock:
+            idle = self._idle.setdefault(container_name, [])
+            while idle:
+                session = idle.pop()
+                if session.alive:
+                    return session
+        return DockerShellSession(container_name)
+
+    def _release(self, session: DockerShellSession):
+        with self._lock:
+            idle = self._idle.setdefault(session.container_name, [])
+            if session.alive and len(idle) < self.max_sessions:
+                idle.append(session)
+                return
+        session.close()
+
+    def close(self):
+        with self._lock:
+            sessions = [s for idle in self._idle.values() for s in idle]
+            self._idle.clear()
+        for session in sessions:
+            session.close()
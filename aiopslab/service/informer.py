@@ -0,0 +1,238 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""In-process informer cache for namespaced K8S objects (pods, services, deployments).
+
+Each (kind, namespace) pair is backed by one informer: a background thread that
+lists the objects once and then follows a watch, keeping an in-memory copy.
+All KubeCtl instances in the process share the same informers, so repeated
+lookups (get_logs, evals, status checks, telemetry pod lists) no longer issue
+a full LIST against the API server. Lookups return deep copies, so callers may
+modify the objects they get without corrupting the shared cache.
+"""
+
+import copy
+import threading
+import time
+from collections import deque
+
+from kubernetes import watch
+from kubernetes.client.rest import ApiException
+
+from aiopslab.config import Config
+from aiopslab.paths import BASE_DIR
+
+config = Config(BASE_DIR / "config.yml")
+
+
+def match_labels(labels: dict | None, selector: str | None) -> bool:
+    """Evaluate a K8S label selector string against a label dict.
+
+    Supports `k=v`, `k==v`, `k!=v`, `k`, `!k`, `k in (a,b)` and `k notin (a,b)`.
+    """
+    if not selector:
+        return True
+    labels = labels or {}
+
+    # split on commas that are not inside a set expression
+    terms, depth, current = [], 0, ""
+    for ch in selector:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            terms.append(current)
+            current = ""
+        else:
+            current += ch
+    terms.append(current)
+
+    for term in (t.strip() for t in terms):
+        if not term:
+            continue
+        if " notin " in term or " in " in term:
+            negate = " notin " in term
+            key, values = term.split(" notin " if negate else " in ", 1)
+            values = {v.strip() for v in values.strip().strip("()").split(",")}
+            found = labels.get(key.strip()) in values
+            if found == negate:
+                return False
+        elif "!=" in term:
+            key, value = term.split("!=", 1)
+            if labels.get(key.strip()) == value.strip():
+                return False
+        elif "=" in term:
+            key, value = term.replace("==", "=").split("=", 1)
+            if labels.get(key.strip()) != value.strip():
+                return False
+        elif term.startswith("!"):
+            if term[1:].strip() in labels:
+                return False
+        elif term not in labels:
+            return False
+    return True
+
+
+class Informer:
+    """Keeps an in-memory, watch-fed copy of one kind of object in one namespace."""
+
+    def __init__(self, kind: str, namespace: str, list_func, resync_backoff: int = 2):
+        self.kind = kind
+        self.namespace = namespace
+        self.list_func = list_func
+        self.resync_backoff = resync_backoff
+        self.objects = {}
+        self.resource_version = None
+        # Resource versions are opaque and cannot be ordered: remember the recent ones seen,
+        # and count relists (a relist is newer than anything written before it started)
+        self._observed = deque(maxlen=4096)
+        self._relists = 0
+
+        self._cond = threading.Condition()
+        self._synced = threading.Event()
+        self._stop = threading.Event()
+        self._watch = None
+        self._thread = threading.Thread(
+            target=self._run, name=f"informer-{kind}-{namespace}", daemon=True
+        )
+        self._thread.start()
+
+    def _relist(self):
+        resp = self.list_func(self.namespace)
+        with self._cond:
+            self.objects = {obj.metadata.name: obj for obj in resp.items}
+            self.resource_version = resp.metadata.resource_version
+            self._relists += 1
+            self._synced.set()
+            self._cond.notify_all()
+
+    def _run(self):
+        relist = True
+        while not self._stop.is_set():
+            try:
+                if relist:
+                    self._relist()
+                    relist = False
+                self._watch = watch.Watch()
+                for event in self._watch.stream(
+                    self.list_func,
+                    self.namespace,
+                    resource_version=self.resource_version,
+                    timeout_seconds=300,
+                    allow_watch_bookmarks=True,
+                ):
+                    obj = event["object"]
+                    with self._cond:
+                        if event["type"] == "DELETED":
+                            self.objects.pop(obj.metadata.name, None)
+                        elif event["type"] in ("ADDED", "MODIFIED"):
+                            self.objects[obj.metadata.name] = obj
+                        # BOOKMARK events only carry the latest resource version
+                        self.resource_version = obj.metadata.resource_version
+                        self._observed.append(self.resource_version)
+                        self._cond.notify_all()
+                    if self._stop.is_set():
+                        break
+            except ApiException as e:
+                relist = True
+                if e.status != 410:  # 410 Gone: resource version expired, just re-list
+                    print(f"Informer {self.kind}/{self.namespace} error: {e}")
+                    time.sleep(self.resync_backoff)
+            except Exception as e:
+                relist = True
+                if not self._stop.is_set():
+                    print(f"Informer {self.kind}/{self.namespace} error: {e}")
+                    time.sleep(self.resync_backoff)
+
+    def stop(self):
+        self._stop.set()
+        if self._watch:
+            self._watch.stop()
+
+    def wait_fresh(self, resource_version: str | None = None, timeout: float = 30) -> bool:
+        """Block until the informer has synced and reflects `resource_version`.
+
+        `resource_version` is the version of an object this process wrote; it is
+        reflected once a watch event carries it or a relist started after this call.
+        """
+        deadline = time.time() + timeout
+        with self._cond:
+            relists = self._relists
+        if not self._synced.wait(timeout):
+            return False
+        with self._cond:
+            while not (
+                resource_version is None
+                or resource_version == self.resource_version
+                or resource_version in self._observed
+                or self._relists > relists
+            ):
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def list(self, label_selector: str | None = None) -> list:
+        with self._cond:
+            objects = list(self.objects.values())
+        return [copy.deepcopy(o) for o in objects if match_labels(o.metadata.labels, label_selector)]
+
+    def get(self, name: str):
+        with self._cond:
+            return copy.deepcopy(self.objects.get(name))
+
+    def by_owner(self, owner_name: str, owner_kind: str | None = None) -> list:
+        """Return objects with an owner reference to `owner_name` (optionally of `owner_kind`)."""
+        with self._cond:
+            objects = list(self.objects.values())
+        return [
+            copy.deepcopy(o)
+            for o in objects
+            if any(
+                ref.name == owner_name and (owner_kind is None or ref.kind == owner_kind)
+                for ref in (o.metadata.owner_references or [])
+            )
+        ]
+
+
+class InformerCache:
+    """Process-wide registry of informers keyed by (kind, namespace).
+
+    Disabled by default; enable it with `informer_cache: true` in config.yml or
+    `InformerCache.enable()` (BatchRunner does this for concurrent sweeps).
+    """
+
+    enabled = bool(config.get("informer_cache", False))
+    _informers: dict[tuple[str, str], Informer] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def enable(cls, enabled: bool = True):
+        cls.enabled = enabled
+        if not enabled:
+            cls.stop_all()
+
+    @classmethod
+    def informer(cls, kind: str, namespace: str, list_func) -> Informer:
+        """Return the shared informer for (kind, namespace), starting it on first use."""
+        key = (kind, namespace)
+        with cls._lock:
+            if key not in cls._informers:
+                cls._informers[key] = Informer(kind, namespace, list_func)
+            return cls._informers[key]
+
+    @classmethod
+    def stop(cls, namespace: str):
+        """Stop every informer of a namespace (e.g. when it is deleted)."""
+        with cls._lock:
+            for key in [k for k in cls._informers if k[1] == namespace]:
+                cls._informers.pop(key).stop()
+
+    @classmethod
+    def stop_all(cls):
+        with cls._lock:
+            for informer in cls._informers.values():
+                informer.stop()
+            cls._informers.clear()
@@ -0,0 +1,191 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Lifecycle of the cluster-wide infrastructure shared by all problems."""
+
+import threading
+import time
+
+from aiopslab.service.helm import Helm
+from aiopslab.service.kubectl import KubeCtl
+from aiopslab.service.telemetry.prometheus import Prometheus
+from aiopslab.config import Config
+from aiopslab.paths import BASE_DIR
+
+config = Config(BASE_DIR / "config.yml")
+
+OPENEBS_OPERATOR_URL = "https://openebs.github.io/charts/openebs-operator.yaml"
+
+
+class OpenEBS:
+    """OpenEBS local-PV provisioner (default storage class for the applications)."""
+
+    name = "openebs"
+    namespace = "openebs"
+
+    def __init__(self):
+        self.kubectl = KubeCtl()
+
+    def deploy(self):
+        print("Setting up OpenEBS...")
+        self.kubectl.exec_command(f"kubectl apply -f {OPENEBS_OPERATOR_URL}")
+        self.kubectl.exec_command(
+            "kubectl patch storageclass openebs-hostpath -p '{\"metadata\": {\"annotations\":{\"storageclass.kubernetes.io/is-default-class\":\"true\"}}}'"
+        )
+        self.kubectl.wait_for_ready(self.namespace)
+        print("OpenEBS setup completed.")
+
+    def teardown(self):
+        print("Uninstalling OpenEBS...")
+        self.kubectl.exec_command(
+            "kubectl delete sc openebs-hostpath openebs-device --ignore-not-found"
+        )
+        self.kubectl.exec_command(f"kubectl delete -f {OPENEBS_OPERATOR_URL}")
+        self.kubectl.wait_for_namespace_deletion(self.namespace)
+
+    def is_healthy(self) -> bool:
+        return self.kubectl.are_pods_ready(self.namespace)
+
+
+class ChaosMesh:
+    """Chaos Mesh controller used by the symptomatic fault injectors."""
+
+    name = "chaos-mesh"
+    namespace = "chaos-mesh"
+
+    def __init__(self):
+        self.kubectl = KubeCtl()
+        self.helm_configs = {
+            "release_name": "chaos-mesh",
+            "chart_path": "chaos-mesh/chaos-mesh",
+            "namespace": self.namespace,
+            "version": "2.6.2",
+        }
+
+    def deploy(self):
+        """Install Chaos Mesh unless the release already exists."""
+        if Helm.exists_release(self.helm_configs["release_name"], self.namespace):
+            print("Chaos Mesh is already installed. Skipping installation.")
+            return
+
+        self.kubectl.create_namespace_if_not_exist(self.namespace)
+        Helm.add_repo("chaos-mesh", "https://charts.chaos-mesh.org")
+        chaos_configs = dict(self.helm_configs)
+
+        container_runtime = self.kubectl.get_container_runtime()
+
+        if "docker" in container_runtime:
+            pass
+        elif "containerd" in container_runtime:
+            chaos_configs["extra_args"] = [
+                "--set chaosDaemon.runtime=containerd",
+                "--set chaosDaemon.socketPath=/run/containerd/containerd.sock",
+            ]
+        else:
+            raise ValueError(f"Unsupported container runtime: {container_runtime}")
+
+        Helm.install(**chaos_configs)
+
+    def teardown(self):
+        Helm.uninstall(**self.helm_configs)
+
+    def is_healthy(self) -> bool:
+        return self.kubectl.are_pods_ready(self.namespace)
+
+
+class PrometheusComponent(Prometheus):
+    """Prometheus with the component interface used by InfraManager."""
+
+    name = "prometheus"
+
+    def is_healthy(self) -> bool:
+        return self._is_prometheus_running()
+
+
+class InfraManager:
+    """Installs, health-checks and tears down shared infrastructure.
+
+    Two modes are supported:
+        - per-problem (default): components are installed before every problem and
+          uninstalled right after it, which matches the original orchestrator behavior.
+        - persistent: components are installed once, health-checked (and repaired)
+          before every problem, and only torn down by an explicit `close()`.
+
+    Persistent mode is enabled with `persistent_infra: true` in config.yml or by
+    passing `persistent=True`. A single manager can be shared by concurrent runs.
+    """
+
+    COMPONENTS = {
+        "openebs": OpenEBS,
+        "prometheus": PrometheusComponent,
+        "chaos-mesh": ChaosMesh,
+    }
+
+    def __init__(self, persistent: bool | None = None, components: list[str] | None = None):
+        """
+        Args:
+            persistent (bool): Keep components installed across problems (default: from config.yml).
+            components (list[str]): Components to manage. Chaos Mesh is only managed
+                in persistent mode by default; otherwise the injectors install it lazily.
+        """
+        self.persistent = (
+            config.get("persistent_infra", False) if persistent is None else persistent
+        )
+        if components is None:
+            components = ["openebs", "prometheus"]
+            if self.persistent:
+                components.append("chaos-mesh")
+
+        self.components = [self.COMPONENTS[name]() for name in components]
+        self.installed = False
+        self.timings = {}
+        self._lock = threading.Lock()
+
+    def setup(self):
+        """Install every managed component that is missing or unhealthy."""
+        with self._lock:
+            for component in self.components:
+                self._ensure(component, force=not self.installed and not self.persistent)
+            self.installed = True
+
+    def teardown(self):
+        """Uninstall every managed component (in reverse installation order)."""
+        with self._lock:
+            for component in reversed(self.components):
+                start = time.time()
+                component.teardown()
+                self.timings[f"{component.name}.teardown"] = time.time() - start
+            self.installed = False
+
+    def health_check(self) -> dict:
+        """Return the health of every managed component.
+
+        Returns:
+            dict: component name -> bool
+        """
+        return {component.name: component.is_healthy() for component in self.components}
+
+    def before_problem(self):
+        """Called by the orchestrator before a problem is deployed."""
+        self.setup()
+
+    def after_problem(self):
+        """Called by the orchestrator after a problem is cleaned up."""
+        if not self.persistent:
+            self.teardown()
+
+    def close(self):
+        """End of a sweep: tear down persistent infrastructure."""
+        if self.installed:
+            self.teardown()
+
+    def _ensure(self, component, force=False):
+        if not force and component.is_healthy():
+            return
+
+        if not force:
+            print(f"{component.name} is missing or unhealthy. (Re)installing...")
+
+        start = time.time()
+        component.deploy()
+        self.timings[f"{component.name}.deploy"] = time.time() - start
@@ -0,0 +1,108 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Process-wide Kubernetes API client factory.
+
+Parsing the kubeconfig and opening new TLS connections on every `KubeCtl()`
+is expensive, so one `ApiClient` is built per (kubeconfig, context) and shared
+by every component. The underlying urllib3 pool is thread-safe; its size and
+TCP keep-alive are configurable in config.yml.
+"""
+
+import os
+import socket
+import threading
+
+from kubernetes import client, config
+from urllib3.connection import HTTPConnection
+
+from aiopslab.config import Config, get_kube_context
+from aiopslab.paths import BASE_DIR
+
+config_yaml = Config(BASE_DIR / "config.yml")
+
+_clients: dict[tuple[str | None, str | None], client.ApiClient] = {}
+_lock = threading.Lock()
+
+
+def _keepalive_socket_options() -> list:
+    """TCP keep-alive options so idle pooled connections survive NATs and LBs."""
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    # Not every platform exposes the tuning knobs (e.g. TCP_KEEPIDLE on macOS)
+    for name, value in (("TCP_KEEPIDLE", 30), ("TCP_KEEPINTVL", 10), ("TCP_KEEPCNT", 3)):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return options
+
+
+def _apply_socket_options(api_client: client.ApiClient, options: list):
+    """Make sure the client's connection pools use `options`.
+
+    Older kubernetes clients ignore `Configuration.socket_options`, so it is set on
+    the urllib3 pool manager directly (no connection has been opened yet).
+    """
+    pool_kw = api_client.rest_client.pool_manager.connection_pool_kw
+    if pool_kw.get("socket_options") != options:
+        pool_kw["socket_options"] = options
+
+
+def _normalize_config_file(config_file: str | None) -> str | None:
+    if config_file is None:
+        return None
+    path = os.path.expanduser(config_file)
+    default = os.path.expanduser(config.kube_config.KUBE_CONFIG_DEFAULT_LOCATION)
+    return None if path == default else path
+
+
+def get_api_client(context: str | None = None, config_file: str | None = None) -> client.ApiClient:
+    """Return the shared API client for a kube context, creating it on first use.
+
+    Args:
+        context (str): Kube context (default: the one resolved from config.yml).
+        config_file (str): Kubeconfig path (default: $KUBECONFIG or ~/.kube/config).
+
+    Returns:
+        client.ApiClient: A thread-safe client to pass to `client.CoreV1Api(...)` etc.
+    """
+    context = context or get_kube_context()
+    key = (_normalize_config_file(config_file), context)
+
+    with _lock:
+        if key not in _clients:
+            configuration = client.Configuration()
+            config.load_kube_config(
+                config_file=key[0], context=context, client_configuration=configuration
+            )
+            configuration.connection_pool_maxsize = int(
+                config_yaml.get("kube_client_pool_size", 32)
+            )
+            if config_yaml.get("kube_client_keepalive", True):
+                configuration.socket_options = _keepalive_socket_options()
+
+            # Code that still builds APIs without an explicit client gets the same settings
+            if not _clients:
+                client.Configuration.set_default(configuration)
+
+            api_client = client.ApiClient(configuration)
+            if configuration.socket_options:
+                _apply_socket_options(api_client, configuration.socket_options)
+            _clients[key] = api_client
+        return _clients[key]
+
+
+_dynamic_clients: dict[int, "dynamic.DynamicClient"] = {}
+
+
+def get_dynamic_client(api_client: client.ApiClient | None = None):
+    """Return the shared discovery-backed dynamic client for an API client.
+
+    Used to apply and delete arbitrary manifests without knowing their kinds upfront.
+    """
+    from kubernetes import dynamic
+
+    api_client = api_client or get_api_client()
+    with _lock:
+        if id(api_client) not in _dynamic_clients:
+            _dynamic_clients[id(api_client)] = dynamic.DynamicClient(api_client)
+        return _dynamic_clients[id(api_client)]
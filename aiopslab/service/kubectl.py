@@ -3,42 +3,147 @@
 
 """Interface to K8S controller service."""
 
+import base64
 import json
+import os
 import time
 import subprocess
+import threading
+import yaml
+from concurrent.futures import ThreadPoolExecutor
 from rich.console import Console
-from kubernetes import client, config
+from kubernetes import client, watch
 from kubernetes.client.rest import ApiException
+from kubernetes.dynamic.exceptions import ResourceNotFoundError, ResourceNotUniqueError
 from aiopslab.config import Config, get_kube_context
+from aiopslab.service.informer import InformerCache
+from aiopslab.service.kube_client import get_api_client, get_dynamic_client
+from aiopslab.utils.run_scope import bind_run_scope
 from aiopslab.paths import BASE_DIR
 
 config_yaml = Config(BASE_DIR / "config.yml")
 
+# Use the Python client instead of `kubectl` subprocesses where an equivalent exists
+NATIVE_API = bool(config_yaml.get("kubectl_native_api", True))
+FIELD_MANAGER = "aiopslab"
+MANIFEST_EXTENSIONS = (".yaml", ".yml", ".json")
+APPLY_WORKERS = int(config_yaml.get("manifest_apply_workers", 8))
+
+# Resources are applied in waves; kinds in the same wave do not depend on each other.
+# Anything not listed (Services, Deployments, StatefulSets, ...) goes in the last wave.
+APPLY_WAVES = {
+    "Namespace": 0,
+    "CustomResourceDefinition": 0,
+    "StorageClass": 0,
+    "PersistentVolume": 0,
+    "ConfigMap": 1,
+    "Secret": 1,
+    "PersistentVolumeClaim": 1,
+    "ServiceAccount": 1,
+    "Role": 1,
+    "ClusterRole": 1,
+    "RoleBinding": 1,
+    "ClusterRoleBinding": 1,
+}
+LAST_WAVE = 2
+
+# config path -> (files signature, parsed manifests)
+_manifest_cache: dict[str, tuple[tuple, list[dict]]] = {}
+_manifest_cache_lock = threading.Lock()
+
 
 class KubeCtl:
     def __init__(self):
-        """Initialize the KubeCtl object and load the Kubernetes configuration."""
-        kube_context = get_kube_context()
-        config.load_kube_config(context=kube_context)
-        self.core_v1_api = client.CoreV1Api()
-        self.apps_v1_api = client.AppsV1Api()
+        """Initialize the KubeCtl object on top of the shared Kubernetes API client."""
+        self.api_client = get_api_client()
+        self.core_v1_api = client.CoreV1Api(self.api_client)
+        self.apps_v1_api = client.AppsV1Api(self.api_client)
+        self.last_apply_latencies = {}
     
 
     def list_namespaces(self):
         """Return a list of all namespaces in the cluster."""
         return self.core_v1_api.list_namespace()
 
-    def list_pods(self, namespace):
-        """Return a list of all pods within a specified namespace."""
-        return self.core_v1_api.list_namespaced_pod(namespace)
+    def _informer(self, kind, namespace, resource_version=None):
+        """Return the shared informer for (kind, namespace) once it is fresh enough.
+
+        `resource_version` is that of an object this process just wrote; reads that
+        must see changes made elsewhere (e.g. mitigation evals) bypass the cache.
+        Returns None when the informer cache is disabled or cannot catch up, in which
+        case callers fall back to a direct API read.
+        """
+        if not InformerCache.enabled:
+            return None
+
+        list_funcs = {
+            "pods": self.core_v1_api.list_namespaced_pod,
+            "services": self.core_v1_api.list_namespaced_service,
+            "deployments": self.apps_v1_api.list_namespaced_deployment,
+        }
+        informer = InformerCache.informer(kind, namespace, list_funcs[kind])
+        if not informer.wait_fresh(resource_version):
+            return None
+        return informer
+
+    def list_pods(self, namespace, label_selector=None, resource_version=None, consistent=False):
+        """Return a list of all pods within a specified namespace.
+
+        Args:
+            namespace (str): The namespace to list.
+            label_selector (str): Optional label selector (e.g. "app=user-service").
+            resource_version (str): With the informer cache, wait until it reflects this
+                version of an object this process wrote.
+            consistent (bool): Read from the API server, not the informer cache (e.g. to
+                evaluate changes made by the agent).
+        """
+        informer = None if consistent else self._informer("pods", namespace, resource_version)
+        if informer:
+            return client.V1PodList(
+                items=informer.list(label_selector),
+                metadata=client.V1ListMeta(resource_version=informer.resource_version),
+            )
+        return self.core_v1_api.list_namespaced_pod(
+            namespace, label_selector=label_selector
+        )
 
     def list_services(self, namespace):
         """Return a list of all services within a specified namespace."""
+        informer = self._informer("services", namespace)
+        if informer:
+            return client.V1ServiceList(
+                items=informer.list(),
+                metadata=client.V1ListMeta(resource_version=informer.resource_version),
+            )
         return self.core_v1_api.list_namespaced_service(namespace)
 
+    def list_pods_by_owner(self, namespace, owner_name, owner_kind=None):
+        """Return the pods in a namespace owned by a given object (e.g. a ReplicaSet)."""
+        informer = self._informer("pods", namespace)
+        if informer:
+            return informer.by_owner(owner_name, owner_kind)
+        return [
+            pod
+            for pod in self.core_v1_api.list_namespaced_pod(namespace).items
+            if any(
+                ref.name == owner_name and (owner_kind is None or ref.kind == owner_kind)
+                for ref in (pod.metadata.owner_references or [])
+            )
+        ]
+
+    def get_service(self, service_name, namespace):
+        """Fetch a service object."""
+        informer = self._informer("services", namespace)
+        if informer:
+            service = informer.get(service_name)
+            if service is None:
+                raise ApiException(status=404, reason=f"service '{service_name}' not found")
+            return service
+        return self.core_v1_api.read_namespaced_service(service_name, namespace)
+
     def get_cluster_ip(self, service_name, namespace):
         """Retrieve the cluster IP address of a specified service within a namespace."""
-        service_info = self.core_v1_api.read_namespaced_service(service_name, namespace)
+        service_info = self.get_service(service_name, namespace)
         return service_info.spec.cluster_ip  # type: ignore
     
     def get_container_runtime(self):
@@ -53,9 +158,7 @@ class KubeCtl:
 
     def get_pod_name(self, namespace, label_selector):
         """Get the name of the first pod in a namespace that matches a given label selector."""
-        pod_info = self.core_v1_api.list_namespaced_pod(
-            namespace, label_selector=label_selector
-        )
+        pod_info = self.list_pods(namespace, label_selector=label_selector)
         return pod_info.items[0].metadata.name
 
     def get_pod_logs(self, pod_name, namespace):
@@ -64,6 +167,12 @@ class KubeCtl:
 
     def get_service_json(self, service_name, namespace, deserialize=True):
         """Retrieve the JSON description of a specified service within a namespace."""
+        if NATIVE_API:
+            service = self.api_client.sanitize_for_serialization(
+                self.get_service(service_name, namespace)
+            )
+            return service if deserialize else json.dumps(service, indent=4)
+
         kube_context = get_kube_context()
         command = f"kubectl get service {service_name} -n {namespace} -o json"
         if kube_context:
@@ -73,61 +182,165 @@ class KubeCtl:
         return json.loads(result) if deserialize else result
 
     def get_deployment(self, name: str, namespace: str):
-        """Fetch the deployment configuration."""
+        """Fetch the deployment configuration.
+
+        Always read from the API server: callers modify it and send it back with
+        `update_deployment`, which needs its current resourceVersion.
+        """
         return self.apps_v1_api.read_namespaced_deployment(name, namespace)
 
-    def wait_for_ready(self, namespace, sleep=2, max_wait=300):
-        """Wait for all pods in a namespace to be in a Ready state before proceeding."""
+    def are_pods_ready(self, namespace) -> bool:
+        """Return True if the namespace has pods and all of their containers are ready."""
+        try:
+            pod_list = self.list_pods(namespace)
+        except ApiException:
+            return False
 
-        console = Console()
-        console.log(f"[bold green]Waiting for all pods in namespace '{namespace}' to be ready...")
+        return bool(pod_list.items) and all(
+            self._is_pod_ready(pod) for pod in pod_list.items
+        )
 
-        with console.status("[bold green]Waiting for pods to be ready...") as status:
-            wait = 0
+    @staticmethod
+    def _is_pod_ready(pod) -> bool:
+        statuses = pod.status.container_statuses if pod.status else None
+        return bool(statuses) and all(cs.ready for cs in statuses)
 
-            while wait < max_wait:
-                try:
-                    pod_list = self.list_pods(namespace)
-                    
-                    if pod_list.items:
-                        ready_pods = [
-                            pod for pod in pod_list.items
-                            if pod.status.container_statuses and
-                            all(cs.ready for cs in pod.status.container_statuses)
-                        ]
-
-                        if len(ready_pods) == len(pod_list.items):
-                            console.log(f"[bold green]All pods in namespace '{namespace}' are ready.")
-                            return
-
-                except Exception as e:
-                    console.log(f"[red]Error checking pod statuses: {e}")
+    def wait_for_ready(self, namespace, sleep=2, max_wait=300, resource_version=None):
+        """Wait for all pods in one or more namespaces to be in a Ready state.
 
-                time.sleep(sleep)
-                wait += sleep
+        Pod changes are followed with the watch API, so the wait returns as soon as
+        the last pod turns Ready instead of on the next polling interval.
 
-            raise Exception(f"[red]Timeout: Not all pods in namespace '{namespace}' reached the Ready state within {max_wait} seconds.")
-    
-    def wait_for_namespace_deletion(self, namespace, sleep=2, max_wait=300):
-        """Wait for a namespace to be fully deleted before proceeding."""
+        Args:
+            namespace (str | list[str]): Namespace(s) to wait for.
+            sleep (int): Back-off before re-listing when a watch fails.
+            max_wait (int): Overall timeout in seconds (shared by all namespaces).
+            resource_version (str): Only consider pod state at least as new as this version.
+
+        Returns:
+            dict: namespace -> seconds spent waiting for it (namespaces are waited on in order).
 
+        Raises:
+            TimeoutError: If a namespace is not done within `max_wait`.
+        """
+        namespaces = [namespace] if isinstance(namespace, str) else list(namespace)
         console = Console()
-        console.log(f"[bold green]Waiting for namespace '{namespace}' to be deleted...")
+        console.log(f"[bold green]Waiting for all pods in namespace(s) {namespaces} to be ready...")
+
+        start = time.time()
+        deadline = start + max_wait
+        durations = {}
+
+        with console.status("[bold green]Waiting for pods to be ready..."):
+            for ns in namespaces:
+                ns_start = time.time()
+                if not self._watch_pods_ready(ns, deadline, sleep, resource_version, console):
+                    raise TimeoutError(f"[red]Timeout: Not all pods in namespace '{ns}' reached the Ready state within {max_wait} seconds.")
+                durations[ns] = time.time() - ns_start
+                console.log(f"[bold green]All pods in namespace '{ns}' are ready ({durations[ns]:.1f}s).")
+
+        return durations
+
+    def _watch_pods_ready(self, namespace, deadline, sleep, resource_version, console) -> bool:
+        """Track pod readiness in a namespace via list + watch until all are ready or the deadline passes."""
+        while time.time() < deadline:
+            try:
+                list_kwargs = {}
+                if resource_version:
+                    list_kwargs = {"resource_version": resource_version, "resource_version_match": "NotOlderThan"}
+                pod_list = self.core_v1_api.list_namespaced_pod(namespace, **list_kwargs)
+                ready = {pod.metadata.name: self._is_pod_ready(pod) for pod in pod_list.items}
+                if ready and all(ready.values()):
+                    return True
+
+                w = watch.Watch()
+                for event in w.stream(
+                    self.core_v1_api.list_namespaced_pod,
+                    namespace,
+                    resource_version=pod_list.metadata.resource_version,
+                    timeout_seconds=max(1, int(deadline - time.time())),
+                ):
+                    pod = event["object"]
+                    if event["type"] == "DELETED":
+                        ready.pop(pod.metadata.name, None)
+                    else:
+                        ready[pod.metadata.name] = self._is_pod_ready(pod)
+
+                    if ready and all(ready.values()):
+                        w.stop()
+                        return True
+            except ApiException as e:
+                if e.status != 410:  # 410 Gone: resource version too old, just re-list
+                    console.log(f"[red]Error checking pod statuses: {e}")
+                    time.sleep(sleep)
+                resource_version = None
+            except Exception as e:
+                console.log(f"[red]Error checking pod statuses: {e}")
+                time.sleep(sleep)
 
-        with console.status("[bold green]Waiting for namespace deletion...") as status:
-            wait = 0
+        return False
 
-            while wait < max_wait:
-                try:
-                    self.core_v1_api.read_namespace(name=namespace)
-                except Exception as e:
-                    console.log(f"[bold green]Namespace '{namespace}' has been deleted.")
-                    return
+    def wait_for_namespace_deletion(self, namespace, sleep=2, max_wait=300, resource_version=None):
+        """Wait for one or more namespaces to be fully deleted before proceeding.
 
+        Args:
+            namespace (str | list[str]): Namespace(s) to wait for.
+            sleep (int): Back-off before re-checking when a watch fails.
+            max_wait (int): Overall timeout in seconds (shared by all namespaces).
+            resource_version (str): Resource version to start watching from.
+
+        Returns:
+            dict: namespace -> seconds spent waiting for it (namespaces are waited on in order).
+
+        Raises:
+            TimeoutError: If a namespace is not done within `max_wait`.
+        """
+        namespaces = [namespace] if isinstance(namespace, str) else list(namespace)
+        console = Console()
+        console.log(f"[bold green]Waiting for namespace(s) {namespaces} to be deleted...")
+
+        start = time.time()
+        deadline = start + max_wait
+        durations = {}
+
+        with console.status("[bold green]Waiting for namespace deletion..."):
+            for ns in namespaces:
+                ns_start = time.time()
+                if not self._watch_namespace_deleted(ns, deadline, sleep, resource_version, console):
+                    raise TimeoutError(f"[red]Timeout: Namespace '{ns}' was not deleted within {max_wait} seconds.")
+                durations[ns] = time.time() - ns_start
+                console.log(f"[bold green]Namespace '{ns}' has been deleted ({durations[ns]:.1f}s).")
+
+        return durations
+
+    def _watch_namespace_deleted(self, namespace, deadline, sleep, resource_version, console) -> bool:
+        """Watch a single namespace until a DELETED event arrives or the deadline passes."""
+        while time.time() < deadline:
+            try:
+                ns_list = self.core_v1_api.list_namespace(field_selector=f"metadata.name={namespace}")
+                if not ns_list.items:
+                    return True
+
+                w = watch.Watch()
+                for event in w.stream(
+                    self.core_v1_api.list_namespace,
+                    field_selector=f"metadata.name={namespace}",
+                    resource_version=resource_version or ns_list.metadata.resource_version,
+                    timeout_seconds=max(1, int(deadline - time.time())),
+                ):
+                    if event["type"] == "DELETED":
+                        w.stop()
+                        return True
+            except ApiException as e:
+                if e.status != 410:
+                    console.log(f"[red]Error watching namespace '{namespace}': {e}")
+                    time.sleep(sleep)
+                resource_version = None
+            except Exception as e:
+                console.log(f"[red]Error watching namespace '{namespace}': {e}")
                 time.sleep(sleep)
-                wait += sleep
 
-            raise Exception(f"[red]Timeout: Namespace '{namespace}' was not deleted within {max_wait} seconds.")
+        return False
 
     def update_deployment(self, name: str, namespace: str, deployment):
         """Update the deployment configuration."""
@@ -212,8 +425,225 @@ class KubeCtl:
             print(f"Exception when updating configmap: {e}\n")
             return
 
+    @staticmethod
+    def load_manifests(config_path) -> list[dict]:
+        """Parse every manifest under a file or directory (recursively, like `kubectl -R`).
+
+        The parsed tree is cached and only re-read when a file is added, removed or modified.
+
+        Returns:
+            list[dict]: The resource documents, with `List` kinds flattened.
+        """
+        config_path = str(config_path)
+        if os.path.isdir(config_path):
+            files = sorted(
+                os.path.join(root, name)
+                for root, _, names in os.walk(config_path)
+                for name in names
+                if name.endswith(MANIFEST_EXTENSIONS)
+            )
+        else:
+            files = [config_path]
+
+        signature = tuple((path, os.stat(path).st_mtime_ns) for path in files)
+        with _manifest_cache_lock:
+            cached = _manifest_cache.get(config_path)
+        if cached and cached[0] == signature:
+            return list(cached[1])
+
+        manifests = []
+        for path in files:
+            with open(path, "r") as f:
+                for doc in yaml.safe_load_all(f):
+                    if not doc:
+                        continue
+                    if doc.get("kind", "").endswith("List") and "items" in doc:
+                        manifests.extend(item for item in doc["items"] if item)
+                    else:
+                        manifests.append(doc)
+
+        with _manifest_cache_lock:
+            _manifest_cache[config_path] = (signature, manifests)
+        return list(manifests)
+
+    @staticmethod
+    def _manifest_waves(manifests: list[dict], reverse: bool = False) -> list[list[dict]]:
+        """Group manifests into dependency waves (see APPLY_WAVES)."""
+        waves = [[] for _ in range(LAST_WAVE + 1)]
+        for manifest in manifests:
+            waves[APPLY_WAVES.get(manifest.get("kind"), LAST_WAVE)].append(manifest)
+        waves = [wave for wave in waves if wave]
+        return waves[::-1] if reverse else waves
+
+    def _run_waves(self, manifests: list[dict], func, reverse: bool = False) -> dict:
+        """Run `func(manifest)` over the manifests, wave by wave, each wave concurrently.
+
+        Returns:
+            dict: "Kind/name" -> (seconds, result of func)
+        """
+
+        def timed(manifest):
+            start = time.time()
+            result = func(manifest)
+            return time.time() - start, result
+
+        # Resolve every kind once up front; discovery is lazy and not meant to be raced
+        dyn = get_dynamic_client(self.api_client)
+        for api_version, kind in {(m["apiVersion"], m["kind"]) for m in manifests}:
+            dyn.resources.get(api_version=api_version, kind=kind)
+
+        results = {}
+        with ThreadPoolExecutor(
+            max_workers=APPLY_WORKERS, thread_name_prefix="kubectl-apply"
+        ) as pool:
+            for wave in self._manifest_waves(manifests, reverse):
+                # Worker threads don't inherit the caller's run scope
+                futures = {
+                    f"{m['kind']}/{m['metadata']['name']}": pool.submit(bind_run_scope(timed), m)
+                    for m in wave
+                }
+                # Wait for the whole wave (and surface the first error) before the next one
+                for key, future in futures.items():
+                    results[key] = future.result()
+        return results
+
+    @staticmethod
+    def _print_latencies(action: str, results: dict, elapsed: float, top: int = 5):
+        slowest = sorted(results.items(), key=lambda kv: kv[1][0], reverse=True)[:top]
+        print(
+            f"{action} {len(results)} resources in {elapsed:.2f}s; slowest: "
+            + ", ".join(f"{key} {seconds:.2f}s" for key, (seconds, _) in slowest)
+        )
+
+    def apply_manifest(self, manifest: dict, namespace: str | None = None):
+        """Server-side apply a single resource document."""
+        dyn = get_dynamic_client(self.api_client)
+        resource = dyn.resources.get(
+            api_version=manifest["apiVersion"], kind=manifest["kind"]
+        )
+        body = dict(manifest, metadata=dict(manifest.get("metadata") or {}))
+        if resource.namespaced:
+            body["metadata"]["namespace"] = namespace or body["metadata"].get(
+                "namespace", "default"
+            )
+        else:
+            body["metadata"].pop("namespace", None)
+
+        return dyn.server_side_apply(
+            resource,
+            body=body,
+            namespace=body["metadata"].get("namespace"),
+            field_manager=FIELD_MANAGER,
+            force_conflicts=True,
+        )
+
+    def delete_manifest(self, manifest: dict, namespace: str | None = None) -> bool:
+        """Delete the resource described by a document. Returns False if it did not exist."""
+        dyn = get_dynamic_client(self.api_client)
+        resource = dyn.resources.get(
+            api_version=manifest["apiVersion"], kind=manifest["kind"]
+        )
+        metadata = manifest.get("metadata") or {}
+        try:
+            dyn.delete(
+                resource,
+                name=metadata["name"],
+                namespace=(namespace or metadata.get("namespace")) if resource.namespaced else None,
+                body={"propagationPolicy": "Background"},
+            )
+            return True
+        except ApiException as e:
+            if e.status == 404:
+                return False
+            raise
+
+    def delete_by_label(self, namespace: str, label_selector: str, kinds=None):
+        """Bulk-delete namespaced resources matching a label selector.
+
+        Args:
+            namespace (str): The namespace to delete from.
+            label_selector (str): K8S label selector (e.g. "app=geo").
+            kinds (list[tuple[str, str]]): (apiVersion, kind) pairs to delete; defaults to
+                the workload, network and config kinds the applications deploy.
+        """
+        kinds = kinds or [
+            ("apps/v1", "Deployment"),
+            ("apps/v1", "StatefulSet"),
+            ("apps/v1", "DaemonSet"),
+            ("batch/v1", "Job"),
+            ("v1", "Service"),
+            ("v1", "ConfigMap"),
+            ("v1", "PersistentVolumeClaim"),
+            ("v1", "Pod"),
+        ]
+        dyn = get_dynamic_client(self.api_client)
+        for api_version, kind in kinds:
+            resource = dyn.resources.get(api_version=api_version, kind=kind)
+            try:
+                dyn.delete(
+                    resource,
+                    namespace=namespace,
+                    label_selector=label_selector,
+                    body={"propagationPolicy": "Background"},
+                )
+            except ApiException as e:
+                # Services only support DELETE collection on newer API servers
+                if e.status != 405:
+                    raise
+                for item in dyn.get(resource, namespace=namespace, label_selector=label_selector).items:
+                    self.delete_manifest(item.to_dict(), namespace)
+
+    def _has_resources(self, namespace: str) -> bool:
+        """Rough equivalent of `kubectl get all -n <namespace>` being non-empty."""
+        return bool(
+            self.core_v1_api.list_namespaced_pod(namespace, limit=1).items
+            or self.core_v1_api.list_namespaced_service(namespace, limit=1).items
+            or self.apps_v1_api.list_namespaced_deployment(namespace, limit=1).items
+            or self.apps_v1_api.list_namespaced_stateful_set(namespace, limit=1).items
+        )
+
+    def _wait_for_manifests_deleted(self, manifests, namespace, timeout=10):
+        """Wait (up to `timeout`) for deleted resources to disappear, like `kubectl delete --timeout`."""
+        dyn = get_dynamic_client(self.api_client)
+        deadline = time.time() + timeout
+        for manifest in manifests:
+            resource = dyn.resources.get(
+                api_version=manifest["apiVersion"], kind=manifest["kind"]
+            )
+            while time.time() < deadline:
+                try:
+                    dyn.get(
+                        resource,
+                        name=manifest["metadata"]["name"],
+                        namespace=namespace if resource.namespaced else None,
+                    )
+                except ApiException as e:
+                    if e.status == 404:
+                        break
+                    raise
+                time.sleep(0.5)
+
     def apply_configs(self, namespace: str, config_path: str):
-        """Apply Kubernetes configurations from a specified path to a namespace."""
+        """Apply Kubernetes configurations from a specified path to a namespace.
+
+        Uses server-side apply; `kubectl apply` is only used for manifests whose kinds
+        the dynamic client cannot resolve (e.g. a CRD not discovered yet). API errors are raised.
+        """
+        if NATIVE_API:
+            try:
+                start = time.time()
+                self.last_apply_latencies = self._run_waves(
+                    self.load_manifests(config_path),
+                    lambda manifest: self.apply_manifest(manifest, namespace),
+                )
+                self._print_latencies(
+                    "Applied", self.last_apply_latencies, time.time() - start
+                )
+                return
+            except (ResourceNotFoundError, ResourceNotUniqueError) as e:
+                # Kinds are resolved before anything is applied: nothing was changed yet
+                print(f"Cannot resolve a resource kind ({e}); falling back to kubectl apply.")
+
         kube_context = get_kube_context()
         command = f"kubectl apply -Rf {config_path} -n {namespace}"
         if kube_context:
@@ -221,7 +651,35 @@ class KubeCtl:
         self.exec_command(command)
 
     def delete_configs(self, namespace: str, config_path: str):
-        """Delete Kubernetes configurations from a specified path in a namespace."""
+        """Delete Kubernetes configurations from a specified path in a namespace.
+
+        Falls back to `kubectl delete` under the same condition as `apply_configs`.
+        """
+        if NATIVE_API:
+            try:
+                if not self._has_resources(namespace):
+                    print(f"No resources found in: {namespace}. Skipping deletion.")
+                    return
+                print(f"Deleting K8S configs in namespace: {namespace}")
+                start = time.time()
+                manifests = self.load_manifests(config_path)
+                # Workloads go first, their configs and volumes last
+                results = self._run_waves(
+                    manifests,
+                    lambda manifest: self.delete_manifest(manifest, namespace),
+                    reverse=True,
+                )
+                deleted = [
+                    m
+                    for m in manifests
+                    if results[f"{m['kind']}/{m['metadata']['name']}"][1]
+                ]
+                self._wait_for_manifests_deleted(deleted, namespace)
+                self._print_latencies("Deleted", results, time.time() - start)
+                return
+            except (ResourceNotFoundError, ResourceNotUniqueError) as e:
+                print(f"Cannot resolve a resource kind ({e}); falling back to kubectl delete.")
+
         try:
             kube_context = get_kube_context()
             
@@ -247,6 +705,7 @@ class KubeCtl:
         try:
             self.core_v1_api.delete_namespace(name=namespace)
             self.wait_for_namespace_deletion(namespace)
+            InformerCache.stop(namespace)
             print(f"Namespace '{namespace}' deleted successfully.")
         except ApiException as e:
             if e.status == 404:
@@ -268,6 +727,58 @@ class KubeCtl:
             else:
                 print(f"Error checking/creating namespace '{namespace}': {e}")
 
+    def create_secret_if_not_exist(self, name: str, namespace: str, files: dict) -> bool:
+        """Create a generic secret from local files, like `kubectl create secret generic --from-file`.
+
+        Args:
+            name (str): The secret name.
+            namespace (str): The namespace of the secret.
+            files (dict): secret key -> local file path.
+
+        Returns:
+            bool: True if the secret was created, False if it already existed.
+        """
+        try:
+            self.core_v1_api.read_namespaced_secret(name, namespace)
+            return False
+        except ApiException as e:
+            if e.status != 404:
+                raise
+
+        data = {}
+        for key, path in files.items():
+            with open(path, "rb") as f:
+                data[key] = base64.b64encode(f.read()).decode("ascii")
+
+        body = client.V1Secret(
+            metadata=client.V1ObjectMeta(name=name), type="Opaque", data=data
+        )
+        self.core_v1_api.create_namespaced_secret(namespace, body)
+        return True
+
+    def delete_released_pvs(self, namespace: str) -> list[str]:
+        """Delete the PVs bound to claims of a namespace, clearing finalizers that keep them Terminating.
+
+        Returns:
+            list[str]: Names of the deleted PersistentVolumes.
+        """
+        deleted = []
+        for pv in self.core_v1_api.list_persistent_volume().items:
+            claim = pv.spec.claim_ref
+            if not claim or claim.namespace != namespace:
+                continue
+            try:
+                if pv.metadata.finalizers:
+                    self.core_v1_api.patch_persistent_volume(
+                        pv.metadata.name, {"metadata": {"finalizers": None}}
+                    )
+                self.core_v1_api.delete_persistent_volume(pv.metadata.name)
+                deleted.append(pv.metadata.name)
+            except ApiException as e:
+                if e.status != 404:
+                    print(f"Error deleting PersistentVolume {pv.metadata.name}: {e}")
+        return deleted
+
     def exec_command(self, command: str, input_data=None):
         """Execute an arbitrary kubectl command with automatic context support."""
         # If the command contains kubectl and doesn't already have --context, add it
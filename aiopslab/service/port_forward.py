@@ -0,0 +1,209 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Process-wide manager of `kubectl port-forward` tunnels.
+
+Observer clients (Prometheus, Jaeger) ask for a local endpoint of an in-cluster
+target and release it when done. Tunnels are shared and reference-counted per
+(namespace, target, remote port), bound to a free local port, declared ready as
+soon as the local port accepts connections, restarted when they die, and kept
+open for a short idle period so back-to-back telemetry calls reuse them.
+"""
+
+import atexit
+import socket
+import subprocess
+import threading
+import time
+from collections import deque
+
+from aiopslab.config import get_kube_context
+
+
+def find_free_port() -> int:
+    """Ask the OS for a free local TCP port."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _port_accepts(port: int, timeout: float = 0.5) -> bool:
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+class PortForward:
+    """A single `kubectl port-forward <target> <local>:<remote> -n <namespace>` process."""
+
+    def __init__(self, namespace: str, target: str, remote_port: int):
+        self.namespace = namespace
+        self.target = target
+        self.remote_port = remote_port
+        self.local_port = None
+        self.process = None
+        self.refcount = 0
+        self.idle_since = None
+        # Serializes (re)starts of this tunnel; the manager's lock is not held meanwhile
+        self.lock = threading.Lock()
+        self._log = deque(maxlen=20)
+
+    def start(self, ready_timeout: float = 15, attempts: int = 3):
+        """Start the tunnel on a free local port and wait until it accepts connections."""
+        for attempt in range(attempts):
+            self.stop()
+            # Reconnect on the same port when possible, so clients' URLs stay valid
+            if attempt > 0 or self.local_port is None or _port_accepts(self.local_port):
+                self.local_port = find_free_port()
+            command = ["kubectl"]
+            kube_context = get_kube_context()
+            if kube_context:
+                command += ["--context", kube_context]
+            command += [
+                "port-forward",
+                self.target,
+                f"{self.local_port}:{self.remote_port}",
+                "-n",
+                self.namespace,
+            ]
+            self.process = subprocess.Popen(
+                command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+            )
+            threading.Thread(target=self._drain, args=(self.process,), daemon=True).start()
+
+            if self.wait_ready(ready_timeout):
+                print(
+                    f"Port forwarding {self.namespace}/{self.target}:{self.remote_port} "
+                    f"-> localhost:{self.local_port} established."
+                )
+                return
+            print(
+                f"Port forwarding {self.namespace}/{self.target} failed "
+                f"(attempt {attempt + 1} of {attempts}): {' '.join(self._log).strip()}"
+            )
+        self.stop()
+        raise RuntimeError(f"Could not port-forward {self.namespace}/{self.target}")
+
+    def _drain(self, process):
+        # kubectl logs a line per forwarded connection; keep the last few for errors
+        for line in process.stdout:
+            self._log.append(line)
+
+    def wait_ready(self, timeout: float) -> bool:
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                return False
+            if _port_accepts(self.local_port):
+                return True
+            time.sleep(0.1)
+        return False
+
+    def is_healthy(self) -> bool:
+        return (
+            self.process is not None
+            and self.process.poll() is None
+            and _port_accepts(self.local_port)
+        )
+
+    def stop(self):
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+
+
+class PortForwardManager:
+    """Hands out shared, reference-counted local ports for in-cluster targets.
+
+    The manager's lock only guards the tunnel table and reference counts; a tunnel
+    is started under its own lock, so a slow start does not block other targets.
+
+    Args:
+        idle_timeout (float): Seconds an unused tunnel stays open for reuse.
+    """
+
+    def __init__(self, idle_timeout: float = 60):
+        self.idle_timeout = idle_timeout
+        self._tunnels: dict[tuple[str, str, int], PortForward] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, namespace: str, target: str, remote_port: int) -> int:
+        """Return a local port forwarding to `target` (e.g. "svc/jaeger"), starting it if needed.
+
+        Every call must be paired with `release`.
+        """
+        key = (namespace, target, remote_port)
+        with self._lock:
+            self._close_idle()
+            tunnel = self._tunnels.setdefault(key, PortForward(*key))
+            tunnel.refcount += 1
+            tunnel.idle_since = None
+        # The reference keeps the tunnel from being closed while it starts
+        try:
+            with tunnel.lock:
+                if not tunnel.is_healthy():
+                    tunnel.start()
+                return tunnel.local_port
+        except Exception:
+            self.release(namespace, target, remote_port)
+            raise
+
+    def ensure(self, namespace: str, target: str, remote_port: int) -> int:
+        """Health-check an acquired tunnel, reconnecting it if it died. Returns its local port."""
+        key = (namespace, target, remote_port)
+        with self._lock:
+            tunnel = self._tunnels[key]
+        with tunnel.lock:
+            if not tunnel.is_healthy():
+                print(f"Port forwarding {namespace}/{target} is down. Reconnecting...")
+                tunnel.start()
+            return tunnel.local_port
+
+    def release(self, namespace: str, target: str, remote_port: int):
+        key = (namespace, target, remote_port)
+        with self._lock:
+            tunnel = self._tunnels.get(key)
+            if tunnel is None or tunnel.refcount == 0:
+                return
+            tunnel.refcount -= 1
+            if tunnel.refcount == 0:
+                tunnel.idle_since = time.time()
+                reaper = threading.Timer(self.idle_timeout + 0.1, self._reap)
+                reaper.daemon = True
+                reaper.start()
+            self._close_idle()
+
+    def _reap(self):
+        with self._lock:
+            self._close_idle()
+
+    def _close_idle(self):
+        now = time.time()
+        for key, tunnel in list(self._tunnels.items()):
+            if tunnel.refcount == 0 and (
+                tunnel.idle_since is None or now - tunnel.idle_since >= self.idle_timeout
+            ):
+                tunnel.stop()
+                del self._tunnels[key]
+
+    def stop_all(self):
+        with self._lock:
+            for tunnel in self._tunnels.values():
+                tunnel.stop()
+            self._tunnels.clear()
+
+
+port_forwards = PortForwardManager()
+atexit.register(port_forwards.stop_all)
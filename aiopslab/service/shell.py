@@ -4,18 +4,40 @@
 """Interface to run shell commands in the service cluster."""
 
 import subprocess
-import paramiko
-import os
+import threading
 from aiopslab.paths import config
+from aiopslab.service.docker_shell import DockerShellPool, ShellTimeout, ShellUnavailable
+from aiopslab.service.ssh_pool import SSHConnectionPool
+from aiopslab.service.stateful_shell import CommandResult, StatefulShell, run_streaming, truncate_output
+from aiopslab.utils.run_scope import get_run_id
+
+# Larger outputs keep only their head and tail
+MAX_OUTPUT_BYTES = int(config.get("shell_max_output_bytes", 65536))
+
+# Seconds an agent command may run; stateful sessions (and installs run in them) get longer
+SHELL_TIMEOUT = config.get("shell_timeout", 10)
+SESSION_TIMEOUT = config.get("session_timeout", 300)
 
 
 class Shell:
     """Interface to run shell commands in the service cluster.
 
-    Note: this can only run a single command and get its output.
-    TODO: expand to a stateful shell session interface.
+    Note: on localhost, `exec` runs commands in the current run's agent session, so
+    `cd` and `export` carry over between commands until `Shell.close_session()`;
+    use `Shell.session()` for a separate stateful session.
     """
 
+    # Persistent `docker exec` sessions, reused across calls (kind clusters)
+    _docker_sessions = DockerShellPool()
+    # Authenticated SSH connections, reused across calls (remote clusters)
+    _ssh_pool = SSHConnectionPool(
+        max_connections=config.get("ssh_max_connections", 2),
+        max_channels=config.get("ssh_max_channels", 8),
+    )
+    # Agent sessions on localhost, one per run id
+    _agent_sessions: dict[str | None, StatefulShell] = {}
+    _agent_lock = threading.Lock()
+
     @staticmethod
     def exec(command: str, input_data=None, cwd=None):
         """Execute a shell command on localhost, via SSH, or inside kind's control-plane container."""
@@ -32,7 +54,9 @@ class Shell:
             #     "This may pose safety and security risks when using an AI agent locally. "
             #     "I hope you know what you're doing!!!"
             # )
-            return Shell.local_exec(command, input_data, cwd)
+            if cwd is not None:
+                return Shell.local_exec(command, input_data, cwd)
+            return Shell.agent_exec(command, input_data)
 
         else:
             k8s_user = config.get("k8s_user")
@@ -40,51 +64,85 @@ class Shell:
             return Shell.ssh_exec(k8s_host, k8s_user, ssh_key_path, command)
 
     @staticmethod
-    def local_exec(command: str, input_data=None, cwd=None):
-        if input_data is not None:
-            input_data = input_data.encode("utf-8")
+    def session(cwd=None) -> StatefulShell:
+        """Open a stateful local shell session (cwd and exported variables persist)."""
+        return StatefulShell(
+            cwd=cwd,
+            timeout=SESSION_TIMEOUT,
+            max_bytes=MAX_OUTPUT_BYTES,
+        )
+
+    @staticmethod
+    def agent_session() -> StatefulShell:
+        """Return the agent's local session for the current run, opening it on first use."""
+        run_id = get_run_id()
+        with Shell._agent_lock:
+            if run_id not in Shell._agent_sessions:
+                Shell._agent_sessions[run_id] = Shell.session()
+            return Shell._agent_sessions[run_id]
 
+    @staticmethod
+    def close_session():
+        """Close the current run's agent session; the next command starts a fresh one."""
+        with Shell._agent_lock:
+            session = Shell._agent_sessions.pop(get_run_id(), None)
+        if session is not None:
+            session.close()
+
+    @staticmethod
+    def agent_exec(command: str, input_data=None, timeout=None):
+        """Run a command in the current run's agent session (cwd and environment persist)."""
         try:
-            out = subprocess.run(
+            out = Shell.agent_session().run(
+                command, input_data=input_data, timeout=timeout or SHELL_TIMEOUT
+            )
+        except Exception as e:
+            raise RuntimeError(f"Failed to execute command: {command}\nError: {str(e)}")
+        return Shell._local_output(command, out)
+
+    @staticmethod
+    def local_exec(command: str, input_data=None, cwd=None, timeout=None):
+        try:
+            out = run_streaming(
                 command,
-                input=input_data,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                shell=True,
+                input_data=input_data,
                 cwd=cwd,
-                timeout=10, # need to account for this properly
+                timeout=timeout or SHELL_TIMEOUT,
+                max_bytes=MAX_OUTPUT_BYTES,
             )
-
-            if out.returncode != 0:
-                error_message = out.stderr.decode("utf-8")
-                print(f"[ERROR] Command execution failed: {error_message}")
-                return error_message
-            else:
-                output_message = out.stdout.decode("utf-8") + out.stderr.decode("utf-8")
-                print(f"===== Output Message from local ====")
-                print(output_message)
-                return output_message
-
         except Exception as e:
             raise RuntimeError(f"Failed to execute command: {command}\nError: {str(e)}")
+        return Shell._local_output(command, out)
 
     @staticmethod
-    def ssh_exec(host: str, user: str, ssh_key_path: str, command: str):
-        ssh_key_path = os.path.expanduser(ssh_key_path)
-        ssh_client = paramiko.SSHClient()
-        ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    def _local_output(command: str, out: CommandResult) -> str:
+        if out.timed_out:
+            output_message = (
+                out.stdout + out.stderr + f"\n[Command timed out; partial output shown]"
+            )
+            print(f"[ERROR] Command timed out: {command}")
+            return output_message
+        elif out.returncode != 0:
+            error_message = out.stderr
+            print(f"[ERROR] Command execution failed: {error_message}")
+            return error_message
+        else:
+            output_message = out.stdout + out.stderr
+            print(f"===== Output Message from local ====")
+            print(output_message)
+            return output_message
 
+    @staticmethod
+    def ssh_exec(host: str, user: str, ssh_key_path: str, command: str):
+        """Execute a command over SSH, reusing a pooled, authenticated connection."""
         try:
-            ssh_client.connect(hostname=host, username=user, key_filename=ssh_key_path)
-
-            stdin, stdout, stderr = ssh_client.exec_command(command)
-            exit_status = stdout.channel.recv_exit_status()
+            exit_status, output_message, error_message = Shell._ssh_pool.exec(
+                host, user, ssh_key_path, command, max_bytes=MAX_OUTPUT_BYTES
+            )
 
             if exit_status != 0:
-                error_message = stderr.read().decode("utf-8")
                 return error_message
             else:
-                output_message = stdout.read().decode("utf-8")
                 print(f"===== Output Message from ssh ====")
                 print(output_message)
                 return output_message
@@ -92,12 +150,43 @@ class Shell:
         except Exception as e:
             raise RuntimeError(f"Failed to execute command via SSH: {command}\nError: {str(e)}")
 
-        finally:
-            ssh_client.close()
-
     @staticmethod
-    def docker_exec(container_name: str, command: str):
-        """Execute a command inside a running Docker container."""
+    def docker_exec(container_name: str, command: str, timeout: float | None = None):
+        """Execute a command inside a running Docker container.
+
+        Uses a persistent shell session in the container (see `docker_shell`) unless
+        `persistent_shell: false` is set in config.yml or the session cannot be started.
+        A command that reached the session is never re-run by the fallback. Commands
+        run to completion unless a `timeout` is given; then a timed-out command
+        returns its partial output.
+        """
+        if config.get("persistent_shell", True):
+            try:
+                returncode, stdout, stderr = Shell._docker_sessions.run(
+                    container_name, command, timeout=timeout
+                )
+            except ShellUnavailable as e:
+                print(f"[WARNING] Persistent shell unavailable ({e}); falling back to docker exec.")
+            except ShellTimeout as e:
+                output_message = (
+                    truncate_output(e.stdout, MAX_OUTPUT_BYTES)
+                    + truncate_output(e.stderr, MAX_OUTPUT_BYTES)
+                    + f"\n[Command timed out; partial output shown]"
+                )
+                print(f"[ERROR] Command timed out: {command}")
+                return output_message
+            except RuntimeError as e:
+                raise RuntimeError(f"Failed to execute command in Docker container: {container_name}\nError: {str(e)}")
+            else:
+                stdout = truncate_output(stdout, MAX_OUTPUT_BYTES)
+                stderr = truncate_output(stderr, MAX_OUTPUT_BYTES)
+                if stderr or returncode != 0:
+                    print(f"[ERROR] Docker command execution failed: {stderr}")
+                    return stderr
+                print(f"===== Output Message from docker ====")
+                print(stdout)
+                return stdout
+
         escaped_command = command.replace('"', '\\"')
         
         docker_command = f'docker exec {container_name} sh -c "{escaped_command}"'
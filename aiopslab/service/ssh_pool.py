@@ -0,0 +1,181 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Pool of authenticated, keep-alive SSH connections for remote shell commands.
+
+Connections are keyed by (host, user, key) and reused across calls. Every
+command runs on its own channel, and a single transport carries several
+channels at once, so concurrent sessions share a few handshakes instead of
+paying one per command.
+"""
+
+import os
+import threading
+
+import paramiko
+
+from aiopslab.service.stateful_shell import BoundedOutput
+
+
+class _Connection:
+    def __init__(self, host: str, user: str, key_path: str, keepalive: int):
+        self.client = paramiko.SSHClient()
+        self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        self.client.connect(hostname=host, username=user, key_filename=key_path)
+        self.client.get_transport().set_keepalive(keepalive)
+        self.active_channels = 0
+
+    def is_healthy(self) -> bool:
+        transport = self.client.get_transport()
+        return transport is not None and transport.is_active()
+
+    def close(self):
+        self.client.close()
+
+
+def _drain(stdout, stderr, max_bytes: int) -> tuple[BoundedOutput, BoundedOutput]:
+    """Read both streams of a channel to EOF into bounded buffers."""
+    sinks = (BoundedOutput(max_bytes), BoundedOutput(max_bytes))
+    errors = []
+
+    def pump(stream, sink):
+        try:
+            for chunk in iter(lambda: stream.read(4096), b""):
+                sink.write(chunk)
+        except Exception as e:
+            errors.append(e)
+
+    # stderr gets its own reader so a chatty stderr can't stall the channel's window
+    reader = threading.Thread(target=pump, args=(stderr, sinks[1]), daemon=True)
+    reader.start()
+    pump(stdout, sinks[0])
+    reader.join()
+    if errors:
+        raise errors[0]
+    return sinks
+
+
+class SSHConnectionPool:
+    """Shares SSH transports between commands (and threads).
+
+    Args:
+        max_connections (int): Connections opened per (host, user, key).
+        max_channels (int): Concurrent channels per connection (stay below sshd's MaxSessions).
+        keepalive (int): Seconds between transport keep-alive packets.
+    """
+
+    def __init__(self, max_connections: int = 2, max_channels: int = 8, keepalive: int = 30):
+        self.max_connections = max_connections
+        self.max_channels = max_channels
+        self.keepalive = keepalive
+        self._pools: dict[tuple[str, str, str], list[_Connection]] = {}
+        self._connecting: dict[tuple[str, str, str], int] = {}
+        self._cond = threading.Condition()
+
+    def exec(
+        self,
+        host: str,
+        user: str,
+        key_path: str,
+        command: str,
+        timeout: float | None = None,
+        max_bytes: int = 65536,
+    ):
+        """Run a command on a pooled connection.
+
+        Output is streamed into bounded buffers as it arrives, so a command that
+        prints a lot never has its whole output held in memory.
+
+        Returns:
+            tuple[int, str, str]: exit status, stdout and stderr (each capped at `max_bytes`).
+        """
+        key_path = os.path.expanduser(key_path)
+        key = (host, user, key_path)
+
+        # One retry: a pooled transport may have been dropped by the server since its last use.
+        # Only opening the channel is retried; once the command is sent it may have run.
+        for attempt in range(2):
+            conn = self._acquire(key)
+            try:
+                try:
+                    transport = conn.client.get_transport()
+                    if transport is None:
+                        raise paramiko.SSHException("SSH session not active")
+                    channel = transport.open_session(timeout=timeout)
+                except (paramiko.SSHException, EOFError, OSError):
+                    if conn.is_healthy() or attempt == 1:
+                        raise
+                    self._discard(key, conn)
+                    continue
+
+                with channel:
+                    channel.settimeout(timeout)
+                    channel.exec_command(command)
+                    stdout, stderr = channel.makefile("rb"), channel.makefile_stderr("rb")
+                    out, err = _drain(stdout, stderr, max_bytes)
+                    exit_status = channel.recv_exit_status()
+                return exit_status, out.getvalue(), err.getvalue()
+            finally:
+                self._release(conn)
+
+    def _acquire(self, key) -> _Connection:
+        with self._cond:
+            while True:
+                pool = self._pools.setdefault(key, [])
+                for conn in list(pool):
+                    if not conn.is_healthy():
+                        pool.remove(conn)
+                        conn.close()
+
+                available = [c for c in pool if c.active_channels < self.max_channels]
+                if available:
+                    conn = min(available, key=lambda c: c.active_channels)
+                    conn.active_channels += 1
+                    return conn
+
+                if len(pool) + self._connecting.get(key, 0) < self.max_connections:
+                    self._connecting[key] = self._connecting.get(key, 0) + 1
+                    break
+                self._cond.wait()
+
+        # Connect outside the lock; the handshake is the slow part
+        try:
+            conn = _Connection(*key, keepalive=self.keepalive)
+        except Exception:
+            with self._cond:
+                self._connecting[key] -= 1
+                self._cond.notify_all()
+            raise
+
+        with self._cond:
+            self._connecting[key] -= 1
+            conn.active_channels += 1
+            self._pools.setdefault(key, []).append(conn)
+        return conn
+
+    def _release(self, conn: _Connection):
+        with self._cond:
+            conn.active_channels -= 1
+            self._cond.notify_all()
+
+    def _discard(self, key, conn: _Connection):
+        with self._cond:
+            pool = self._pools.get(key, [])
+            if conn in pool:
+                pool.remove(conn)
+        conn.close()
+
+    def health_check(self) -> dict:
+        """Return (host, user, key) -> number of healthy connections."""
+        with self._cond:
+            return {
+                key: sum(conn.is_healthy() for conn in pool)
+                for key, pool in self._pools.items()
+            }
+
+    def close(self):
+        with self._cond:
+            conns = [conn for pool in self._pools.values() for conn in pool]
+            self._pools.clear()
+        for conn in conns:
+            conn.close()
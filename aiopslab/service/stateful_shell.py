@@ -0,0 +1,223 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Streaming command execution with bounded output, and stateful shell sessions.
+
+Output is read as it is produced and kept in a `BoundedOutput`: up to a byte
+cap, everything is kept; past it, only the head and the tail are, with a
+marker for what was dropped in between. Commands that time out are killed
+and return whatever they printed so far.
+"""
+
+import os
+import shlex
+import signal
+import subprocess
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import Callable
+
+
+class BoundedOutput:
+    """Byte sink that keeps at most `max_bytes`: the first half and the most recent half."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def write(self, data: bytes):
+        self.total += len(data)
+        head_room = self.max_bytes // 2 - len(self.head)
+        if head_room > 0:
+            self.head += data[:head_room]
+            data = data[head_room:]
+        if data:
+            self.tail += data
+            tail_room = self.max_bytes - self.max_bytes // 2
+            if len(self.tail) > tail_room:
+                del self.tail[: len(self.tail) - tail_room]
+
+    @property
+    def truncated(self) -> int:
+        """Number of bytes dropped between the head and the tail."""
+        return max(0, self.total - len(self.head) - len(self.tail))
+
+    def getvalue(self) -> str:
+        head = self.head.decode("utf-8", errors="replace")
+        tail = self.tail.decode("utf-8", errors="replace")
+        if not self.truncated:
+            return head + tail
+        return f"{head}\n... [{self.truncated} bytes truncated] ...\n{tail}"
+
+
+def truncate_output(text: str, max_bytes: int) -> str:
+    """Apply the head/tail truncation of `BoundedOutput` to an already captured string."""
+    sink = BoundedOutput(max_bytes)
+    sink.write(text.encode("utf-8"))
+    return sink.getvalue()
+
+
+@dataclass
+class CommandResult:
+    returncode: int | None
+    stdout: str
+    stderr: str
+    timed_out: bool = False
+
+
+def run_streaming(
+    command: str,
+    input_data: str | None = None,
+    cwd: str | None = None,
+    env: dict | None = None,
+    timeout: float | None = None,
+    max_bytes: int = 65536,
+    on_output: Callable[[str, bytes], None] | None = None,
+) -> CommandResult:
+    """Run a shell command, streaming stdout/stderr into bounded buffers.
+
+    Args:
+        command (str): The shell command.
+        input_data (str): Data written to the command's stdin.
+        cwd (str): Working directory.
+        env (dict): Environment (default: inherited).
+        timeout (float): Seconds before the command (and its children) are killed.
+        max_bytes (int): Cap on the bytes kept per stream.
+        on_output (Callable): Called with ("stdout" | "stderr", chunk) as output arrives.
+
+    Returns:
+        CommandResult: Exit code (None on timeout), the captured output and whether it timed out.
+    """
+    proc = subprocess.Popen(
+        command,
+        shell=True,
+        stdin=subprocess.PIPE if input_data is not None else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=cwd,
+        env=env,
+        start_new_session=True,  # so a timeout can kill the whole process group
+    )
+    sinks = {"stdout": BoundedOutput(max_bytes), "stderr": BoundedOutput(max_bytes)}
+
+    def pump(name, stream):
+        for chunk in iter(lambda: stream.read1(4096), b""):
+            sinks[name].write(chunk)
+            if on_output:
+                on_output(name, chunk)
+        stream.close()
+
+    readers = [
+        threading.Thread(target=pump, args=("stdout", proc.stdout), daemon=True),
+        threading.Thread(target=pump, args=("stderr", proc.stderr), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+
+    if input_data is not None:
+        try:
+            proc.stdin.write(input_data.encode("utf-8"))
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+
+    timed_out = False
+    try:
+        proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        proc.wait()
+
+    for reader in readers:
+        # Orphaned grandchildren may hold the pipes open; don't wait on them forever
+        reader.join(timeout=1)
+
+    return CommandResult(
+        returncode=None if timed_out else proc.returncode,
+        stdout=sinks["stdout"].getvalue(),
+        stderr=sinks["stderr"].getvalue(),
+        timed_out=timed_out,
+    )
+
+
+class StatefulShell:
+    """A local shell session whose working directory and environment persist across commands.
+
+    Each command runs in a fresh `sh`, started in the session's directory with the
+    session's environment; afterwards the resulting directory and exported variables
+    are read back, so `cd` and `export` behave as in an interactive shell.
+    """
+
+    # Variables owned by the shell itself, not carried over between commands
+    _SHELL_VARS = {"PWD", "OLDPWD", "SHLVL", "_"}
+
+    def __init__(
+        self,
+        cwd: str | None = None,
+        env: dict | None = None,
+        timeout: float | None = 300,
+        max_bytes: int = 65536,
+    ):
+        self.cwd = cwd or os.getcwd()
+        self.env = dict(os.environ if env is None else env)
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        fd, self._state_path = tempfile.mkstemp(prefix="aiopslab-shell-")
+        os.close(fd)
+
+    def run(
+        self,
+        command: str,
+        input_data: str | None = None,
+        timeout: float | None = None,
+        on_output: Callable[[str, bytes], None] | None = None,
+    ) -> CommandResult:
+        """Run a command in the session (see `run_streaming` for the arguments)."""
+        state = shlex.quote(self._state_path)
+        script = (
+            f"{command}\n"
+            "__aiopslab_rc=$?\n"
+            f"{{ pwd; env -0; }} > {state} 2>/dev/null\n"
+            "exit $__aiopslab_rc\n"
+        )
+        open(self._state_path, "w").close()
+
+        result = run_streaming(
+            script,
+            input_data=input_data,
+            cwd=self.cwd,
+            env=self.env,
+            timeout=timeout or self.timeout,
+            max_bytes=self.max_bytes,
+            on_output=on_output,
+        )
+        if not result.timed_out:
+            self._load_state()
+        return result
+
+    def _load_state(self):
+        with open(self._state_path, "rb") as f:
+            raw = f.read().decode("utf-8", errors="replace")
+        if not raw:
+            return  # the command exited the shell before the state was saved
+
+        cwd, _, env = raw.partition("\n")
+        if os.path.isdir(cwd):
+            self.cwd = cwd
+        if env:
+            self.env = {
+                key: value
+                for key, _, value in (entry.partition("=") for entry in env.split("\0") if entry)
+                if key not in self._SHELL_VARS
+            }
+
+    def close(self):
+        if os.path.exists(self._state_path):
+            os.remove(self._state_path)
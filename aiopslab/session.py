@@ -8,6 +8,7 @@ import uuid
 import json
 import wandb
 import sys
+import threading
 from io import StringIO
 from pydantic import BaseModel
 
@@ -19,6 +20,55 @@ class SessionItem(BaseModel):
     content: str
 
 
+class _PrintRouter:
+    """Process-wide stdout wrapper that routes prints to the session of the printing thread.
+
+    Sessions of concurrent runs live on different threads, so a per-thread
+    registry keeps their captured logs apart while everything still reaches the console.
+    """
+
+    _lock = threading.Lock()
+    _sessions: dict[int, "Session"] = {}
+    _original_stdout = None
+
+    def __init__(self, original_stdout):
+        self.original_stdout = original_stdout
+
+    def write(self, text):
+        session = self._sessions.get(threading.get_ident())
+        if session is None and len(self._sessions) == 1:
+            # A single session also owns prints from helper threads (e.g. port-forward readers)
+            session = next(iter(self._sessions.values()), None)
+        if session is not None and text.strip():  # Only capture non-empty lines
+            session.print_logs.append(text.rstrip())
+        self.original_stdout.write(text)  # Still print to console
+
+    def flush(self):
+        self.original_stdout.flush()
+
+    @classmethod
+    def install(cls):
+        with cls._lock:
+            if not isinstance(sys.stdout, cls):
+                cls._original_stdout = sys.stdout
+                sys.stdout = cls(sys.stdout)
+
+    @classmethod
+    def register(cls, session):
+        with cls._lock:
+            cls._sessions[threading.get_ident()] = session
+            session.original_stdout = cls._original_stdout
+
+    @classmethod
+    def unregister(cls, session):
+        with cls._lock:
+            for ident, registered in list(cls._sessions.items()):
+                if registered is session:
+                    del cls._sessions[ident]
+            if not cls._sessions and isinstance(sys.stdout, cls):
+                sys.stdout = cls._original_stdout
+
+
 class Session:
     def __init__(self, results_dir=None) -> None:
         self.session_id = uuid.uuid4()
@@ -103,26 +153,12 @@ class Session:
     
     def start_print_capture(self):
         """Start capturing print output to logs."""
-        class PrintCapture:
-            def __init__(self, session):
-                self.session = session
-                self.original_stdout = sys.stdout
-            
-            def write(self, text):
-                if text.strip():  # Only capture non-empty lines
-                    self.session.print_logs.append(text.rstrip())
-                self.original_stdout.write(text)  # Still print to console
-            
-            def flush(self):
-                self.original_stdout.flush()
-        
-        self.original_stdout = sys.stdout
-        sys.stdout = PrintCapture(self)
-    
+        _PrintRouter.install()
+        _PrintRouter.register(self)
+
     def stop_print_capture(self):
         """Stop capturing print output."""
-        if self.original_stdout:
-            sys.stdout = self.original_stdout
+        _PrintRouter.unregister(self)
 
     def get_duration(self) -> float:
         """Get the duration of the session."""
@@ -0,0 +1,90 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Per-run scoping of namespaces and cluster object names.
+
+When several problems run concurrently, each run gets a short run id and
+every application namespace (and a few shared object names, e.g. the wrk2
+job) is suffixed with it, so runs never touch each other's resources.
+Outside of a run scope all helpers return their input unchanged.
+
+The run id lives in a ContextVar, which atexit handlers and new threads do not
+inherit: callbacks that run there must be wrapped with `bind_run_scope`.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable
+
+# Namespaces that are not owned by a single application and must never be rewritten
+SHARED_NAMESPACES = {"docker", "default", "observe", "openebs", "chaos-mesh"}
+
+_run_id: ContextVar[str | None] = ContextVar("aiopslab_run_id", default=None)
+
+
+def get_run_id() -> str | None:
+    """Return the run id of the current context (None outside a run scope)."""
+    return _run_id.get()
+
+
+@contextmanager
+def run_scope(run_id: str | None):
+    """Context manager that activates `run_id` for the current thread/task.
+
+    Args:
+        run_id (str | None): Short, DNS-label safe run identifier.
+    """
+    token = _run_id.set(run_id)
+    try:
+        yield run_id
+    finally:
+        _run_id.reset(token)
+
+
+def bind_run_scope(func: Callable) -> Callable:
+    """Bind `func` to the current run id, for calls from atexit handlers or worker threads.
+
+    Args:
+        func (Callable): The callback.
+
+    Returns:
+        Callable: A wrapper running `func` inside the run scope active at bind time.
+    """
+    run_id = get_run_id()
+
+    def bound(*args, **kwargs):
+        with run_scope(run_id):
+            return func(*args, **kwargs)
+
+    return bound
+
+
+def run_namespace(namespace: str | None) -> str | None:
+    """Rewrite an application namespace for the active run.
+
+    Args:
+        namespace (str): The namespace declared in the application metadata.
+
+    Returns:
+        str: `<namespace>-<run_id>` inside a run scope, otherwise `namespace`.
+    """
+    run_id = get_run_id()
+    if not run_id or not namespace or namespace in SHARED_NAMESPACES:
+        return namespace
+    if namespace.endswith(f"-{run_id}"):
+        return namespace
+    return f"{namespace}-{run_id}"
+
+
+def run_scoped(name: str) -> str:
+    """Suffix a cluster object name (e.g. a job in a shared namespace) with the run id."""
+    run_id = get_run_id()
+    return f"{name}-{run_id}" if run_id else name
+
+
+def base_namespace(namespace: str | None) -> str | None:
+    """Strip the active run suffix from a namespace, if present."""
+    run_id = get_run_id()
+    if run_id and namespace and namespace.endswith(f"-{run_id}"):
+        return namespace[: -len(run_id) - 1]
+    return namespace
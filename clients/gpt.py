@@ -7,10 +7,9 @@ Code: https://openai.com/index/gpt-4-research/
 Paper: https://arxiv.org/abs/2303.08774
 """
 import os
-import asyncio
 import tiktoken
 import wandb
-from aiopslab.orchestrator import Orchestrator
+from aiopslab.orchestrator import BatchRunner
 from aiopslab.orchestrator.problems.registry import ProblemRegistry
 from clients.utils.llm import GPTClient
 from dotenv import load_dotenv
@@ -110,16 +109,17 @@ if __name__ == "__main__":
         # Initialize wandb running
         wandb.init(project="AIOpsLab", entity="AIOpsLab")
 
-    problems = ProblemRegistry().PROBLEM_REGISTRY
-    for pid in problems:
-        agent = Agent()
-
-        orchestrator = Orchestrator()
-        orchestrator.register_agent(agent, name="gpt-w-shell")
-
-        problem_desc, instructs, apis = orchestrator.init_problem(pid)
-        agent.init_context(problem_desc, instructs, apis)
-        asyncio.run(orchestrator.start_problem(max_steps=30))
+    # Number of problems to run concurrently, each in its own namespace
+    max_concurrency = int(os.getenv("AIOPSLAB_MAX_CONCURRENCY", "1"))
+
+    problems = ProblemRegistry().get_problem_ids()
+    runner = BatchRunner(
+        agent_factory=Agent,
+        agent_name="gpt-w-shell",
+        max_concurrency=max_concurrency,
+        max_steps=30,
+    )
+    runner.run(problems)
 
     if use_wandb:
         # Finish the wandb run
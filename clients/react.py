@@ -7,10 +7,10 @@ Code: https://github.com/ysymyth/ReAct
 Paper: https://arxiv.org/abs/2210.03629
 """
 
-import asyncio
 import json
+import os
 import tiktoken
-from aiopslab.orchestrator import Orchestrator
+from aiopslab.orchestrator import BatchRunner
 from aiopslab.orchestrator.problems.registry import ProblemRegistry
 from clients.utils.llm import GPTClient
 from clients.utils.templates import DOCS
@@ -108,23 +108,23 @@ class Agent:
 
 
 if __name__ == "__main__":
-    problems = ProblemRegistry().PROBLEM_REGISTRY
-
-    for pid in problems:
-        agent = Agent()
-        orchestrator = Orchestrator()
-        orchestrator.register_agent(agent, name="react")
-
-        try:
-            problem_desc, instructs, apis = orchestrator.init_problem(pid)
-            agent.init_context(problem_desc, instructs, apis)
-
-            full_output = asyncio.run(orchestrator.start_problem(max_steps=30))
-            results = full_output.get("results", {})
-
-            filename = f"react_{pid}.json"
-            with open(filename, "w") as f:
-                json.dump(results, f, indent=2)
-
-        except Exception as e:
-            print(f"Error while running problem {pid}: {e}")
+    # Number of problems to run concurrently, each in its own namespace
+    max_concurrency = int(os.getenv("AIOPSLAB_MAX_CONCURRENCY", "1"))
+
+    problems = ProblemRegistry().get_problem_ids()
+    runner = BatchRunner(
+        agent_factory=Agent,
+        agent_name="react",
+        max_concurrency=max_concurrency,
+        max_steps=30,
+    )
+
+    for pid, run in runner.run(problems).items():
+        if "error" in run:
+            continue
+
+        results = run["output"].get("results", {})
+
+        filename = f"react_{pid}.json"
+        with open(filename, "w") as f:
+            json.dump(results, f, indent=2)
@@ -1,9 +1,7 @@
-import asyncio
 import os
-import time
 
 import wandb
-from aiopslab.orchestrator import Orchestrator
+from aiopslab.orchestrator import BatchRunner
 from aiopslab.orchestrator.problems.registry import ProblemRegistry
 from clients.utils.llm import vLLMClient
 from clients.utils.templates import DOCS_SHELL_ONLY
@@ -74,29 +72,24 @@ if __name__ == "__main__":
         # Initialize wandb run
         wandb.init(project="AIOpsLab", entity="AIOpsLab")
 
+    # Number of problems to run concurrently, each in its own namespace
+    max_concurrency = int(os.getenv("AIOPSLAB_MAX_CONCURRENCY", "1"))
+
     registry = ProblemRegistry()
     pids = registry.get_problem_ids()
 
-    for pid in pids:
-        agent = vLLMAgent() # Initialize the agent
-
-        orchestrator = Orchestrator()
-        orchestrator.register_agent(agent, name="Qwen2.5-Coder-3B-Instruct")
-        try:
-            print("*"*30)
-            print(f"Began processing pid {pid}.")
-            print("*"*30)
-            problem_desc, instructs, apis = orchestrator.init_problem(pid)
-            agent.init_context(problem_desc, instructs, apis)
-            asyncio.run(orchestrator.start_problem(max_steps=10))
-            print("*"*30)
+    runner = BatchRunner(
+        agent_factory=vLLMAgent,
+        agent_name="Qwen2.5-Coder-3B-Instruct",
+        max_concurrency=max_concurrency,
+        max_steps=10,
+    )
+
+    for pid, run in runner.run(pids).items():
+        if "error" in run:
+            print(f"Failed to process pid {pid}. Error: {run['error']}")
+        else:
             print(f"Successfully processed pid {pid}.")
-            print("*"*30)
-
-        except Exception as e:
-            print(f"Failed to process pid {pid}. Error: {e}")
-            time.sleep(60)
-            continue
 
     if use_wandb:
         # Finish the wandb run
@@ -0,0 +1,88 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import unittest
+import numpy as np
+import pandas as pd
+from aiopslab.observer.downsample import (
+    change_point_scores,
+    choose_step,
+    detail_windows,
+    over_time_query,
+    splice,
+)
+
+
+def series(values, step=15, pod="pod-a", kpi="cpu"):
+    return pd.DataFrame(
+        {
+            "timestamp": np.arange(len(values)) * step,
+            "cmdb_id": pod,
+            "kpi_name": kpi,
+            "value": np.asarray(values, dtype=float),
+        }
+    )
+
+
+class TestChooseStep(unittest.TestCase):
+    def test_ladder(self):
+        self.assertEqual(choose_step(3600), 15)
+        self.assertEqual(choose_step(6 * 3600), 120)
+        self.assertEqual(choose_step(3600, min_step=60), 60)
+        self.assertEqual(choose_step(10**9), 86400)
+
+
+class TestOverTimeQuery(unittest.TestCase):
+    def test_gauge_aggregated(self):
+        self.assertEqual(
+            over_time_query('m{pod="a"}', "container_memory_usage_bytes", 60, "max"),
+            'max_over_time(m{pod="a"}[60s])',
+        )
+
+    def test_counter_and_no_aggregation_unchanged(self):
+        self.assertEqual(over_time_query("m", "requests_total", 60, "max"), "m")
+        self.assertEqual(over_time_query("m", "cpu", 60, None), "m")
+
+    def test_unsupported(self):
+        with self.assertRaises(ValueError):
+            over_time_query("m", "cpu", 60, "sum")
+
+
+class TestChangePoints(unittest.TestCase):
+    def test_step_change_scores_highest(self):
+        rng = np.random.default_rng(0)
+        values = np.concatenate([np.full(50, 10.0), np.full(50, 50.0)]) + rng.normal(0, 0.5, 100)
+        scores = change_point_scores(series(values))
+        self.assertEqual(scores.idxmax(), 50 * 15)
+
+    def test_counter_uses_rate(self):
+        # A counter growing steadily has no change point until its rate jumps
+        increments = np.concatenate([np.full(30, 1.0), np.full(30, 10.0)])
+        scores = change_point_scores(series(np.cumsum(increments)), counter=True)
+        self.assertEqual(scores.idxmax(), 30 * 15)
+
+    def test_empty(self):
+        self.assertTrue(change_point_scores(None).empty)
+
+    def test_detail_windows_merged(self):
+        scores = pd.Series({100: 5.0, 110: 4.0, 500: 6.0, 900: 1.0})
+        windows = detail_windows(scores, threshold=3, pad=20, start=0, end=510)
+        self.assertEqual(windows, [(80, 130), (480, 510)])
+
+
+class TestSplice(unittest.TestCase):
+    def test_replaces_coarse_inside_windows(self):
+        coarse = series([1, 2, 3, 4], step=60)
+        fine = series([9, 9, 9], step=15).assign(timestamp=[60, 75, 90])
+        result = splice(coarse, fine, [(60, 90)])
+        self.assertEqual(result["timestamp"].tolist(), [0, 60, 75, 90, 120, 180])
+        self.assertEqual(result["value"].tolist(), [1, 9, 9, 9, 3, 4])
+
+    def test_missing_side(self):
+        coarse = series([1, 2])
+        self.assertIs(splice(coarse, None, []), coarse)
+        self.assertIs(splice(None, coarse, []), coarse)
+
+
+if __name__ == "__main__":
+    unittest.main()
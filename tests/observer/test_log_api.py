@@ -0,0 +1,81 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import threading
+import unittest
+from unittest import mock
+from aiopslab.observer import monitor_config
+from aiopslab.observer.log_api import LogAPI
+
+
+class FakeElasticsearch:
+    """Point-in-time search over in-memory hits; every search returns a new pit id."""
+
+    def __init__(self, count, fail_after=None):
+        self.hits = [{"_id": str(i), "sort": [i, i]} for i in range(count)]
+        self.fail_after = fail_after
+        self.searches = []
+        self.closed = []
+        self._pits = 0
+        self._lock = threading.Lock()
+
+    def open_point_in_time(self, index, keep_alive):
+        return {"id": "pit-0"}
+
+    def search(self, pit, query, sort, size, track_total_hits, slice=None, search_after=None):
+        with self._lock:
+            self.searches.append({"pit": pit["id"], "slice": slice, "search_after": search_after})
+            if self.fail_after is not None and len(self.searches) > self.fail_after:
+                raise RuntimeError("search failed")
+            self._pits += 1
+            pit_id = f"pit-{self._pits}"
+
+        hits = self.hits
+        if slice is not None:
+            hits = [h for h in hits if int(h["_id"]) % slice["max"] == slice["id"]]
+        if search_after is not None:
+            hits = [h for h in hits if h["sort"] > search_after]
+        return {"pit_id": pit_id, "hits": {"hits": hits[:size]}}
+
+    def close_point_in_time(self, id):
+        self.closed.append(id)
+
+
+class TestPitSearch(unittest.TestCase):
+    def search(self, elastic, slices=1, page_size=2):
+        api = LogAPI.__new__(LogAPI)
+        api.elastic = elastic
+        with mock.patch.dict(monitor_config, {"log_extract_slices": slices}):
+            return api._pit_search(["logstash-1"], {"match_all": {}}, page_size=page_size)
+
+    def test_pages_with_search_after(self):
+        elastic = FakeElasticsearch(5)
+        pages = self.search(elastic)
+        ids = [[h["_id"] for h in page] for page in pages]
+        self.assertEqual(ids, [["0", "1"], ["2", "3"], ["4"]])
+        self.assertEqual([s["search_after"] for s in elastic.searches], [None, [1, 1], [3, 3]])
+
+    def test_latest_pit_id_used_and_closed(self):
+        elastic = FakeElasticsearch(5)
+        self.search(elastic)
+        self.assertEqual([s["pit"] for s in elastic.searches], ["pit-0", "pit-1", "pit-2"])
+        self.assertEqual(elastic.closed, ["pit-3"])
+
+    def test_slices(self):
+        elastic = FakeElasticsearch(9)
+        pages = self.search(elastic, slices=3)
+        ids = sorted(int(h["_id"]) for page in pages for h in page)
+        self.assertEqual(ids, list(range(9)))
+        self.assertEqual({s["slice"]["id"] for s in elastic.searches}, {0, 1, 2})
+        self.assertTrue(all(s["slice"]["max"] == 3 for s in elastic.searches))
+        self.assertEqual(len(elastic.closed), 1)
+
+    def test_closed_on_error(self):
+        elastic = FakeElasticsearch(5, fail_after=1)
+        with self.assertRaises(RuntimeError):
+            self.search(elastic)
+        self.assertEqual(elastic.closed, ["pit-1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import unittest
+import pandas as pd
+from aiopslab.observer.metric_cache import MetricCache, merge_intervals
+
+
+def samples(timestamps, value, pod="pod-a"):
+    return pd.DataFrame(
+        {
+            "timestamp": timestamps,
+            "cmdb_id": pod,
+            "kpi_name": "cpu",
+            "value": value,
+        }
+    )
+
+
+class TestMetricCache(unittest.TestCase):
+    def test_merge_intervals(self):
+        self.assertEqual(merge_intervals([(5, 8), (0, 2), (2, 4)]), [(0, 4), (5, 8)])
+
+    def test_missing_gaps(self):
+        cache = MetricCache(lag=0)
+        key = ("ns", 1, "mean", "cpu")
+        self.assertEqual(cache.missing(key, 0, 100), [(0, 100)])
+        cache.add(key, 20, 50, samples([20, 30], 1.0), now=1000)
+        self.assertEqual(cache.missing(key, 0, 100), [(0, 20), (50, 100)])
+        self.assertEqual(cache.missing(key, 25, 45), [])
+
+    def test_lag_not_covered(self):
+        cache = MetricCache(lag=30)
+        key = ("ns", 1, "mean", "cpu")
+        cache.add(key, 0, 100, samples([10], 1.0), now=100)
+        self.assertEqual(cache.missing(key, 0, 100), [(70, 100)])
+
+    def test_chunks_deduplicated_on_read(self):
+        cache = MetricCache(lag=0)
+        key = ("ns", 1, "mean", "cpu")
+        cache.add(key, 0, 20, samples([0, 10, 20], 1.0), now=1000)
+        cache.add(key, 20, 40, samples([20, 30, 40], 2.0), now=1000)
+        cache.add(key, 40, 50, None, now=1000)
+
+        df = cache.get(key, 0, 50)
+        self.assertEqual(df["timestamp"].tolist(), [0, 10, 20, 30, 40])
+        # The later sample of a duplicated timestamp wins
+        self.assertEqual(df.loc[df["timestamp"] == 20, "value"].tolist(), [2.0])
+        self.assertEqual(cache.get(key, 15, 35)["timestamp"].tolist(), [20, 30])
+        self.assertIsNone(cache.get(("other",), 0, 50))
+
+    def test_evicts_least_recently_used(self):
+        cache = MetricCache(max_bytes=1, lag=0)
+        cache.add("a", 0, 10, samples([0], 1.0), now=1000)
+        cache.add("b", 0, 10, samples([0], 1.0), now=1000)
+        self.assertIsNone(cache.get("a", 0, 10))
+        self.assertEqual(len(cache.get("b", 0, 10)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
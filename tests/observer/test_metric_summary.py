@@ -0,0 +1,59 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import unittest
+import numpy as np
+import pandas as pd
+from aiopslab.observer.metric_summary import format_summary, summarize_metrics
+
+
+def series(values, pod="pod-a", kpi="cpu"):
+    return pd.DataFrame(
+        {
+            "timestamp": np.arange(len(values)) * 15,
+            "cmdb_id": pod,
+            "kpi_name": kpi,
+            "value": np.asarray(values, dtype=float),
+        }
+    )
+
+
+class TestSummarizeMetrics(unittest.TestCase):
+    def test_noise_not_flagged(self):
+        rng = np.random.default_rng(0)
+        df = pd.concat([series(rng.normal(10, 1, 120), pod=f"pod-{i}") for i in range(50)])
+        summary = summarize_metrics(df)
+        self.assertEqual(len(summary), 50)
+        self.assertEqual(int(summary["anomalous"].sum()), 0)
+
+    def test_step_change_flagged(self):
+        rng = np.random.default_rng(1)
+        noise = series(rng.normal(10, 1, 120), pod="pod-noise")
+        step = rng.normal(10, 1, 120)
+        step[80:] += 8
+        summary = summarize_metrics(pd.concat([noise, series(step, pod="pod-step")]))
+        self.assertEqual(summary["cmdb_id"].tolist(), ["pod-step", "pod-noise"])
+        self.assertEqual(summary["anomalous"].tolist(), [True, False])
+
+    def test_quantized_step_flagged(self):
+        values = np.full(60, 2.0)
+        values[40:] = 3.0
+        summary = summarize_metrics(series(values, kpi="replicas"))
+        self.assertTrue(summary["anomalous"].iloc[0])
+
+    def test_warmup(self):
+        # Too few samples to score: a jump in the first samples is not flagged
+        summary = summarize_metrics(series([1, 2, 3, 4, 50]))
+        self.assertTrue(np.isnan(summary["anomaly_score"].iloc[0]))
+        self.assertFalse(summary["anomalous"].iloc[0])
+
+    def test_statistics(self):
+        summary = summarize_metrics(series([1, 2, 3, 4]))
+        row = summary.iloc[0]
+        self.assertEqual((row["count"], row["min"], row["max"], row["last"]), (4, 1, 4, 4))
+        self.assertAlmostEqual(row["slope_per_min"], 4.0)
+        self.assertIn("1 series (4 samples), 0 flagged", format_summary(summary, rows=4))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import math
+import unittest
+from datetime import timezone
+from aiopslab.observer.prom_decode import decode_matrix, matrix_to_frame, to_local_times
+
+SERIES = [
+    {"metric": {"pod": "a"}, "values": [[1700000000.0, "1.5"], [1700000015.5, "NaN"]]},
+    {"metric": {"pod": "b"}, "values": []},
+    {"metric": {"pod": "c"}, "values": [[1700000000, "+Inf"]]},
+]
+
+
+class TestDecodeMatrix(unittest.TestCase):
+    def test_flattens_samples(self):
+        timestamps, values, series_index = decode_matrix(SERIES)
+        self.assertEqual(timestamps.tolist(), [1700000000, 1700000015, 1700000000])
+        self.assertEqual(values[0], 1.5)
+        self.assertTrue(math.isnan(values[1]))
+        self.assertEqual(values[2], math.inf)
+        # The empty series has no samples, so the third one's index is 2
+        self.assertEqual(series_index.tolist(), [0, 0, 2])
+
+    def test_no_samples(self):
+        for series in ([], [{"metric": {}, "values": []}]):
+            timestamps, values, series_index = decode_matrix(series)
+            self.assertEqual((len(timestamps), len(values), len(series_index)), (0, 0, 0))
+
+
+class TestMatrixToFrame(unittest.TestCase):
+    def test_labels_per_sample(self):
+        df = matrix_to_frame(SERIES, ["pod-a", "pod-b", "pod-c"], ["cpu", "cpu", "mem"])
+        self.assertEqual(list(df.columns), ["timestamp", "cmdb_id", "kpi_name", "value"])
+        self.assertEqual(df["cmdb_id"].tolist(), ["pod-a", "pod-a", "pod-c"])
+        self.assertEqual(df["kpi_name"].tolist(), ["cpu", "cpu", "mem"])
+
+    def test_values_rounded(self):
+        series = [{"metric": {}, "values": [[0, "0.123456"]]}]
+        df = matrix_to_frame(series, ["pod"], ["cpu"])
+        self.assertEqual(df["value"].tolist(), [0.123])
+
+    def test_local_times(self):
+        times = to_local_times(decode_matrix(SERIES)[0][:1], timezone.utc)
+        self.assertEqual(times[0].timestamp(), 1700000000)
+        self.assertIsNotNone(times[0].tzinfo)
+
+
+if __name__ == "__main__":
+    unittest.main()
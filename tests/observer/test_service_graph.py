@@ -0,0 +1,107 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import os
+import tempfile
+import unittest
+import pandas as pd
+from aiopslab.observer import service_graph
+from aiopslab.observer.service_graph import ServiceGraph
+from aiopslab.observer.telemetry_store import write_table
+from aiopslab.utils.run_scope import run_scope
+
+
+def spans(rows):
+    """rows: (trace_id, span_id, parent_span, service_name, start_time s, duration ms, has_error)"""
+    df = pd.DataFrame(
+        rows,
+        columns=[
+            "trace_id",
+            "span_id",
+            "parent_span",
+            "service_name",
+            "start_time",
+            "duration",
+            "has_error",
+        ],
+    )
+    df["start_time"] = df["start_time"] * 1_000_000
+    df["duration"] = df["duration"] * 1000
+    return df
+
+
+class TestServiceGraph(unittest.TestCase):
+    def test_incremental_update(self):
+        graph = ServiceGraph()
+        added = graph.update(
+            spans(
+                [
+                    ("t1", "a", "ROOT", "frontend", 0, 10, False),
+                    ("t1", "b", "a", "geo", 0, 2, False),
+                    ("t1", "c", "a", "geo", 1, 4, True),
+                ]
+            )
+        )
+        self.assertEqual(added, 3)
+        self.assertEqual(graph.edges[("frontend", "geo")]["count"], 2)
+
+        # A repeated span is ignored; a child whose parent arrives later is held back
+        added = graph.update(
+            spans(
+                [
+                    ("t1", "b", "a", "geo", 0, 2, False),
+                    ("t2", "e", "d", "mongo", 5, 1, False),
+                ]
+            )
+        )
+        self.assertEqual(added, 1)
+        self.assertNotIn(("geo", "mongo"), graph.edges)
+        graph.update(spans([("t2", "d", "ROOT", "geo", 5, 3, False)]))
+        self.assertEqual(graph.edges[("geo", "mongo")]["count"], 1)
+
+        table = graph.table().set_index(["caller", "callee"])
+        self.assertEqual(table.loc[("frontend", "geo"), "requests"], 2)
+        self.assertEqual(table.loc[("frontend", "geo"), "error_rate"], 0.5)
+        self.assertEqual(list(graph.adjacency()), ["frontend", "geo"])
+        self.assertEqual(graph.degraded(1)["caller"].tolist(), ["frontend"])
+
+    def test_rate_ignores_idle_gaps(self):
+        graph = ServiceGraph()
+        for trace_id, start in [("t1", 0), ("t2", 3600)]:
+            # Two exports an hour apart: the hour in between is not part of the rate window
+            root = (trace_id, "a", "ROOT", "frontend", start, 10_000, False)
+            calls = [(trace_id, f"x{i}", "a", "geo", start + i, 1, False) for i in range(10)]
+            graph.update(spans([root] + calls))
+        self.assertEqual(graph.windows, [(0, 10_000_000), (3600_000_000, 3610_000_000)])
+        # 20 calls over two 10s windows
+        self.assertAlmostEqual(graph.table()["rate"].iloc[0], 1.0)
+
+    def test_seen_bounded(self):
+        graph = ServiceGraph(max_seen=5)
+        graph.update(spans([("t1", f"s{i}", "ROOT", "frontend", i, 1, False) for i in range(20)]))
+        self.assertEqual(len(graph._seen), 5)
+
+    def test_graph_per_namespace_and_run(self):
+        with run_scope("run1"):
+            first = service_graph.graph_for("hotel-reservation")
+            self.assertIs(service_graph.graph_for("hotel-reservation"), first)
+        with run_scope("run2"):
+            self.assertIsNot(service_graph.graph_for("hotel-reservation"), first)
+        self.assertIsNot(service_graph.graph_for("social-network"), first)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = write_table(
+                spans([("t1", "a", "ROOT", "frontend", 0, 10, False)]),
+                os.path.join(directory, "traces"),
+                "csv",
+            )
+            first.mark_ingested(path)
+            self.assertIs(service_graph.graph_for_file(path), first)
+            service_graph.drop_graphs("hotel-reservation")
+            self.assertIsNot(service_graph.graph_for_file(path), first)
+        with run_scope("run1"):
+            self.assertIsNot(service_graph.graph_for("hotel-reservation"), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import os
+import tempfile
+import unittest
+import pandas as pd
+from aiopslab.observer.telemetry_query import build_filters, format_page, query_table, table_columns
+
+
+class TestTelemetryQuery(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "metrics.csv")
+        pd.DataFrame(
+            {
+                "timestamp": [100, 100, 160, 160, 220],
+                "cmdb_id": ["geo-1", "rate-1", "geo-1", "rate-1", "geo-1"],
+                "kpi_name": ["cpu"] * 5,
+                "value": [1.0, 5.0, 2.0, 7.0, 3.0],
+            }
+        ).to_csv(self.path, index=False)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_build_filters(self):
+        columns = table_columns(self.path)
+        self.assertEqual(
+            build_filters(columns, service="geo", kpi="cpu", start=100, end=200),
+            [
+                ("cmdb_id", "contains", "geo"),
+                ("kpi_name", "contains", "cpu"),
+                ("timestamp", ">=", 100),
+                ("timestamp", "<=", 200),
+            ],
+        )
+        # Trace start times are in microseconds
+        self.assertEqual(
+            build_filters(["service_name", "start_time"], service="geo", start=2),
+            [("service_name", "==", "geo"), ("start_time", ">=", 2_000_000)],
+        )
+        with self.assertRaises(ValueError):
+            build_filters(["value"], start=1)
+
+    def test_page_and_total(self):
+        page, total = query_table(
+            self.path, columns=["timestamp", "value"], sort_by="value", descending=True, limit=2, offset=1
+        )
+        self.assertEqual(total, 5)
+        self.assertEqual(page["value"].tolist(), [5.0, 3.0])
+        self.assertEqual(list(page.columns), ["timestamp", "value"])
+        text = format_page(page, total, offset=1)
+        self.assertTrue(text.startswith("Rows 2-3 of 5:"))
+        self.assertIn("offset=3", text)
+
+    def test_group_by(self):
+        page, total = query_table(
+            self.path,
+            filters=[("timestamp", ">=", 160)],
+            group_by=["cmdb_id"],
+            aggregates={"value": ["mean", "max"]},
+            sort_by="cmdb_id",
+        )
+        self.assertEqual(total, 2)
+        self.assertEqual(page["value_mean"].tolist(), [2.5, 7.0])
+        self.assertEqual(page["value_max"].tolist(), [3.0, 7.0])
+
+        counts, _ = query_table(self.path, group_by=["cmdb_id"], sort_by="count", descending=True)
+        self.assertEqual(counts["count"].tolist(), [3, 2])
+
+    def test_unsupported_aggregate(self):
+        with self.assertRaises(ValueError):
+            query_table(self.path, group_by=["cmdb_id"], aggregates={"value": "mode"})
+
+    def test_no_rows(self):
+        self.assertEqual(format_page(pd.DataFrame(), 0, 0), "No matching rows.")
+
+
+if __name__ == "__main__":
+    unittest.main()
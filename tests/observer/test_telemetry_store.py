@@ -0,0 +1,77 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import os
+import tempfile
+import unittest
+import pandas as pd
+from aiopslab.observer.telemetry_store import TelemetryWriter, apply_filters, read_table
+
+FRAME = pd.DataFrame(
+    {
+        "timestamp": [1, 2, 3, 4],
+        "cmdb_id": ["frontend-1", "frontend-1", "geo-2", "geo-2"],
+        "kpi_name": ["cpu", "mem", "cpu", "mem"],
+        "value": [0.5, 10.0, 0.7, 12.0],
+    }
+)
+
+
+class TestTelemetryStore(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write(self, fmt: str) -> str:
+        with TelemetryWriter(os.path.join(self.dir.name, "metrics"), fmt) as writer:
+            writer.write(FRAME.iloc[:2])
+            writer.write(FRAME.iloc[2:])
+        self.assertEqual(writer.rows, 4)
+        return writer.path
+
+    def test_round_trip(self):
+        for fmt in ["csv", "parquet", "arrow"]:
+            with self.subTest(fmt=fmt):
+                df = read_table(self.write(fmt))
+                self.assertEqual(df["cmdb_id"].astype(str).tolist(), FRAME["cmdb_id"].tolist())
+                self.assertEqual(df["value"].tolist(), FRAME["value"].tolist())
+
+    def test_columns_and_filters(self):
+        for fmt in ["csv", "parquet", "arrow"]:
+            with self.subTest(fmt=fmt):
+                df = read_table(
+                    self.write(fmt),
+                    columns=["timestamp", "value"],
+                    filters=[("cmdb_id", "contains", "geo"), ("timestamp", ">=", 4)],
+                )
+                self.assertEqual(list(df.columns), ["timestamp", "value"])
+                self.assertEqual(df["value"].tolist(), [12.0])
+
+    def test_arrow_single_dictionary(self):
+        import pyarrow as pa
+
+        with pa.memory_map(self.write("arrow")) as source:
+            column = pa.ipc.open_file(source).read_all().column("cmdb_id")
+        self.assertTrue(pa.types.is_dictionary(column.type))
+        # Both batches share the file's dictionary, in first-seen order
+        for chunk in column.chunks:
+            self.assertEqual(chunk.dictionary.to_pylist(), ["frontend-1", "geo-2"])
+
+    def test_cached_frame_not_shared(self):
+        path = self.write("csv")
+        first = read_table(path)
+        first.loc[0, "value"] = -1.0
+        first["extra"] = 1
+        second = read_table(path)
+        self.assertEqual(second.loc[0, "value"], 0.5)
+        self.assertNotIn("extra", second.columns)
+
+    def test_apply_filters(self):
+        df = apply_filters(FRAME, [("kpi_name", "in", ["cpu"]), ("value", "!=", 0.5)])
+        self.assertEqual(df["cmdb_id"].tolist(), ["geo-2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import unittest
+import pandas as pd
+from aiopslab.observer.trace_analysis import (
+    analyze_traces,
+    critical_path,
+    error_origins,
+    format_analysis,
+    link_spans,
+    self_times,
+)
+
+# One trace (µs):
+#   root     frontend  [0, 100]
+#   ├─ a     geo       [10, 40]   error (passed on from a1)
+#   │  └─ a1 mongo     [15, 35]   error
+#   ├─ b     rate      [30, 90]
+#   └─ c     rate      [50, 60]   overlaps b
+COLUMNS = [
+    "trace_id",
+    "span_id",
+    "parent_span",
+    "service_name",
+    "operation_name",
+    "start_time",
+    "duration",
+    "has_error",
+]
+ROWS = [
+    ("t1", "root", "ROOT", "frontend", "GET /hotels", 0, 100, False),
+    ("t1", "a", "root", "geo", "Nearby", 10, 30, True),
+    ("t1", "a1", "a", "mongo", "find", 15, 20, "True"),
+    ("t1", "b", "root", "rate", "GetRates", 30, 60, False),
+    ("t1", "c", "root", "rate", "GetRates", 50, 10, False),
+]
+
+
+def spans():
+    return link_spans(pd.DataFrame(ROWS, columns=COLUMNS))
+
+
+class TestTraceAnalysis(unittest.TestCase):
+    def test_link_spans(self):
+        df = spans()
+        self.assertEqual(df["parent_idx"].tolist(), [-1, 0, 1, 0, 0])
+        self.assertEqual(df["end_time"].tolist(), [100, 40, 35, 90, 60])
+        self.assertEqual(df["has_error"].tolist(), [False, True, True, False, False])
+
+    def test_missing_parent_is_root(self):
+        df = link_spans(pd.DataFrame([ROWS[2]], columns=COLUMNS))
+        self.assertEqual(df["parent_idx"].tolist(), [-1])
+
+    def test_self_times(self):
+        # root: children cover [10, 90] -> 20 left; a: a1 covers 20 of 30
+        self.assertEqual(self_times(spans()).tolist(), [20, 10, 20, 60, 10])
+
+    def test_error_origins(self):
+        self.assertEqual(error_origins(spans()).tolist(), [False, False, True, False, False])
+
+    def test_critical_path(self):
+        df = spans()
+        path = dict(critical_path(df, 0))
+        # root ends at 100, b (ends last) covers [30, 90], then a covers [10, 30] of the rest
+        self.assertEqual(set(path), {0, 1, 2, 3})
+        self.assertEqual(path[3], 60)
+        self.assertEqual(path[0], 20)
+        self.assertEqual(path[1] + path[2], 20)
+        self.assertEqual(sum(path.values()), 100)
+
+    def test_analyze_traces(self):
+        result = analyze_traces(pd.DataFrame(ROWS, columns=COLUMNS))
+        self.assertEqual((result["traces"], result["spans"], result["slowest"]), (1, 5, 1))
+
+        origins = result["error_origins"]
+        self.assertEqual(origins["service_name"].tolist(), ["mongo"])
+        self.assertEqual(origins["operation_name"].tolist(), ["find"])
+        self.assertEqual(origins["root_operations"].tolist(), ["frontend:GET /hotels"])
+
+        critical = result["critical_path"]
+        self.assertEqual(critical.iloc[0]["service_name"], "rate")
+        self.assertAlmostEqual(critical["share"].sum(), 1.0)
+
+        operations = result["operations"].set_index("operation_name")
+        self.assertEqual(operations.loc["GetRates", "count"], 2)
+        self.assertIn("Error origins", format_analysis(result))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import unittest
+from aiopslab.observer.trace_store import TraceStore
+
+
+def span(span_id, process_id="p1"):
+    return {"spanID": span_id, "processID": process_id, "operationName": "op"}
+
+
+class TestTraceStore(unittest.TestCase):
+    def test_copies_merged(self):
+        store = TraceStore()
+        # The same trace returned for two services, each with a partial set of spans
+        store.add(
+            {
+                "traceID": "t1",
+                "spans": [span("a"), span("b", "p2")],
+                "processes": {"p1": {"serviceName": "frontend"}, "p2": {"serviceName": "geo"}},
+            }
+        )
+        store.add(
+            {
+                "traceID": "t1",
+                "spans": [span("b"), span("c", "p2")],
+                "processes": {"p1": {"serviceName": "geo"}, "p2": {"serviceName": "rate"}},
+            }
+        )
+        store.add({"traceID": "t2", "spans": [span("a")], "processes": {"p1": {"serviceName": "geo"}}})
+
+        self.assertEqual(len(store), 2)
+        self.assertEqual(store.span_count, 4)
+        self.assertEqual(
+            store.stats(), "traces: 3 received, 2 unique; spans: 5 received, 4 unique"
+        )
+
+        trace = store.traces()[0]
+        self.assertEqual([s["spanID"] for s in trace["spans"]], ["a", "b", "c"])
+        services = {s["spanID"]: s["serviceName"] for s in trace["spans"]}
+        self.assertEqual(services, {"a": "frontend", "b": "geo", "c": "rate"})
+
+    def test_process_ids_remapped(self):
+        store = TraceStore()
+        store.add({"traceID": "t1", "spans": [span("a")], "processes": {"p1": {"serviceName": "frontend"}}})
+        store.add({"traceID": "t1", "spans": [span("b")], "processes": {"p1": {"serviceName": "geo"}}})
+
+        trace = store.traces()[0]
+        processes = trace["processes"]
+        # The second copy's "p1" means another process, so it gets a new key
+        self.assertEqual(processes["p1"], {"serviceName": "frontend"})
+        new_span = trace["spans"][1]
+        self.assertNotEqual(new_span["processID"], "p1")
+        self.assertEqual(processes[new_span["processID"]], {"serviceName": "geo"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import json
+import unittest
+from aiopslab.observer.trace_stream import SPAN_COLUMNS, SpanBatcher, flatten_spans, iter_json_array
+
+
+def trace(trace_id, span_ids, service="frontend"):
+    spans = []
+    for i, span_id in enumerate(span_ids):
+        references = [] if i == 0 else [{"refType": "CHILD_OF", "spanID": span_ids[0]}]
+        spans.append(
+            {
+                "spanID": span_id,
+                "operationName": "GET",
+                "references": references,
+                "startTime": 1000 + i,
+                "duration": 10,
+                "processID": "p1",
+                "tags": [{"key": "error", "value": i == 1}, {"key": "http.status_code", "value": 500}],
+            }
+        )
+    return {"traceID": trace_id, "spans": spans, "processes": {"p1": {"serviceName": service}}}
+
+
+def chunked(data: bytes, size: int):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+class ListWriter:
+    def __init__(self):
+        self.batches = []
+
+    def write(self, df):
+        self.batches.append(df)
+
+
+class TestIterJsonArray(unittest.TestCase):
+    def test_any_chunk_boundary(self):
+        items = [{"traceID": "t1", "name": "café → ok", "n": [1, 2]}, {"traceID": "t2"}, 3]
+        data = json.dumps({"total": 2, "data": items, "errors": None}, ensure_ascii=False).encode()
+        for size in range(1, 12):
+            with self.subTest(size=size):
+                self.assertEqual(list(iter_json_array(chunked(data, size))), items)
+
+    def test_empty_or_missing(self):
+        self.assertEqual(list(iter_json_array([b'{"data": []}'])), [])
+        self.assertEqual(list(iter_json_array([b'{"data": null}'])), [])
+        self.assertEqual(list(iter_json_array([b'{"errors": []}'])), [])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array([b'{"data": {"a": [1]}}']))
+        with self.assertRaises(ValueError):
+            list(iter_json_array([b'{"data": [{"a": 1}, {"b"']))
+
+
+class TestSpanBatcher(unittest.TestCase):
+    def test_flatten(self):
+        rows = list(flatten_spans(trace("t1", ["a", "b"])))
+        self.assertEqual(len(rows[0]), len(SPAN_COLUMNS))
+        self.assertEqual(rows[0][:4], ("t1", "a", "ROOT", "frontend"))
+        self.assertEqual(rows[1][2], "a")
+        self.assertEqual((rows[1][7], rows[1][8]), (True, 500))
+
+    def test_batches_and_dedup(self):
+        writer = ListWriter()
+        batches = []
+        batcher = SpanBatcher(writer, batch_size=2, on_batch=batches.append)
+        batcher.add(trace("t1", ["a", "b"]))
+        # The copy returned for another service, with one more span
+        batcher.add(trace("t1", ["a", "b", "c"], service="geo"))
+        batcher.add(trace("t2", ["a"]))
+        batcher.flush()
+
+        self.assertEqual([len(b) for b in writer.batches], [2, 2])
+        self.assertEqual(batches, writer.batches)
+        rows = [(t, s) for b in writer.batches for t, s in zip(b["trace_id"], b["span_id"])]
+        self.assertEqual(rows, [("t1", "a"), ("t1", "b"), ("t1", "c"), ("t2", "a")])
+        self.assertEqual(
+            batcher.stats(), "traces: 3 received, 2 unique; spans: 6 received, 4 unique"
+        )
+
+    def test_dedup_memory_bounded(self):
+        writer = ListWriter()
+        batcher = SpanBatcher(writer, batch_size=100, max_tracked_spans=4)
+        for i in range(10):
+            batcher.add(trace(f"t{i}", ["a", "b"]))
+        self.assertLessEqual(batcher._tracked_spans, 4)
+        self.assertLessEqual(len(batcher._traces), 2)
+
+        # A recent trace is still deduplicated
+        batcher.add(trace("t9", ["a", "b"]))
+        self.assertEqual(batcher.spans, 20)
+
+    def test_evicted_copies_dropped(self):
+        writer = ListWriter()
+        batcher = SpanBatcher(writer, batch_size=100, max_tracked_spans=2, max_tracked_traces=2)
+        for i in range(4):
+            batcher.add(trace(f"t{i}", ["a", "b"]))
+        # t2's spans were forgotten but its ID is not: the copy is dropped
+        batcher.add(trace("t2", ["a", "b"], service="geo"))
+        self.assertEqual(batcher.spans, 8)
+        # t0's ID was forgotten too, which stats() reports
+        self.assertEqual(batcher.forgotten_traces, 1)
+        self.assertIn("1 trace IDs forgotten", batcher.stats())
+
+
+if __name__ == "__main__":
+    unittest.main()
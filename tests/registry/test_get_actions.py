@@ -8,25 +8,40 @@ from aiopslab.utils.actions import get_actions
 class TestGetActions(unittest.TestCase):
     def test_get_actions(self):
         actions = get_actions("detection")
-        self.assertEqual(len(actions), 6)
+        self.assertEqual(len(actions), 11)
         self.assertEqual(
             set(actions.keys()),
             {
                 "get_logs",
                 "get_metrics",
+                "read_metrics",
+                "summarize_metrics",
+                "query_telemetry",
                 "get_traces",
+                "read_traces",
+                "analyze_traces",
+                "get_service_graph",
                 "exec_shell",
                 "submit",
-                "get_microservice_repo_diff",
             },
         )
 
     def test_get_read_actions(self):
         actions = get_actions("detection", "read")
-        self.assertEqual(len(actions), 4)
+        self.assertEqual(len(actions), 9)
         self.assertEqual(
             set(actions.keys()),
-            {"get_logs", "get_metrics", "get_traces", "get_microservice_repo_diff"},
+            {
+                "get_logs",
+                "get_metrics",
+                "read_metrics",
+                "summarize_metrics",
+                "query_telemetry",
+                "get_traces",
+                "read_traces",
+                "analyze_traces",
+                "get_service_graph",
+            },
         )
 
     def test_get_write_actions(self):
@@ -0,0 +1,100 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import threading
+import time
+import unittest
+from unittest import mock
+from aiopslab.service import port_forward
+from aiopslab.service.port_forward import PortForwardManager
+
+
+class FakePortForward:
+    """Stands in for a `kubectl port-forward` process; starts are slow, to widen races."""
+
+    instances = []
+
+    def __init__(self, namespace, target, remote_port):
+        self.namespace = namespace
+        self.target = target
+        self.remote_port = remote_port
+        self.local_port = None
+        self.refcount = 0
+        self.idle_since = None
+        self.lock = threading.Lock()
+        self.starts = 0
+        self.stopped = False
+        self.alive = False
+        FakePortForward.instances.append(self)
+
+    def start(self):
+        time.sleep(0.05)
+        self.starts += 1
+        self.local_port = 10000 + self.starts
+        self.alive = True
+
+    def is_healthy(self):
+        return self.alive
+
+    def stop(self):
+        self.alive = False
+        self.stopped = True
+
+
+class TestPortForwardManager(unittest.TestCase):
+    def setUp(self):
+        FakePortForward.instances = []
+        patcher = mock.patch.object(port_forward, "PortForward", FakePortForward)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_concurrent_acquire_starts_once(self):
+        manager = PortForwardManager(idle_timeout=60)
+        ports = []
+
+        def acquire():
+            ports.append(manager.acquire("observe", "svc/jaeger", 16686))
+
+        threads = [threading.Thread(target=acquire) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        tunnels = [t for t in FakePortForward.instances if t.refcount]
+        self.assertEqual(len(tunnels), 1)
+        self.assertEqual(tunnels[0].starts, 1)
+        self.assertEqual(tunnels[0].refcount, 8)
+        self.assertEqual(set(ports), {10001})
+
+    def test_release_reaps_idle_tunnel(self):
+        manager = PortForwardManager(idle_timeout=0.2)
+        manager.acquire("observe", "svc/jaeger", 16686)
+        manager.acquire("observe", "svc/jaeger", 16686)
+        tunnel = FakePortForward.instances[0]
+
+        manager.release("observe", "svc/jaeger", 16686)
+        self.assertEqual(tunnel.refcount, 1)
+        manager.release("observe", "svc/jaeger", 16686)
+        # Kept open for reuse during the idle period...
+        self.assertFalse(tunnel.stopped)
+        # ...then closed by the reaper without any further call
+        time.sleep(0.5)
+        self.assertTrue(tunnel.stopped)
+        self.assertEqual(manager._tunnels, {})
+
+    def test_reacquire_after_dead_tunnel(self):
+        manager = PortForwardManager(idle_timeout=60)
+        self.assertEqual(manager.acquire("observe", "svc/prometheus", 9090), 10001)
+        tunnel = FakePortForward.instances[0]
+        manager.release("observe", "svc/prometheus", 9090)
+
+        tunnel.alive = False  # e.g. the pod behind it was restarted
+        self.assertEqual(manager.acquire("observe", "svc/prometheus", 9090), 10002)
+        self.assertIs(manager._tunnels[("observe", "svc/prometheus", 9090)], tunnel)
+        self.assertEqual(tunnel.starts, 2)
+        self.assertEqual(tunnel.refcount, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import os
+import stat
+import tempfile
+import unittest
+from unittest import mock
+from aiopslab.service.docker_shell import DockerShellPool, ShellTimeout, ShellUnavailable
+
+
+class TestDockerShell(unittest.TestCase):
+    """Runs the sessions against a fake `docker` that opens a local shell."""
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        docker = os.path.join(self.dir.name, "docker")
+        with open(docker, "w") as f:
+            f.write("#!/bin/sh\nexec sh\n")
+        os.chmod(docker, os.stat(docker).st_mode | stat.S_IEXEC)
+        path = self.dir.name + os.pathsep + os.environ.get("PATH", "")
+        self.env = mock.patch.dict(os.environ, {"PATH": path})
+        self.env.start()
+        self.pool = DockerShellPool()
+
+    def tearDown(self):
+        self.pool.close()
+        self.env.stop()
+        self.dir.cleanup()
+
+    def test_run(self):
+        self.assertEqual(
+            self.pool.run("kind-control-plane", "echo 'a \"b\"'; echo err >&2; exit 3"),
+            (3, 'a "b"\n', "err\n"),
+        )
+
+    def test_timeout_keeps_partial_output_and_session(self):
+        with self.assertRaises(ShellTimeout) as raised:
+            self.pool.run("kind-control-plane", "echo start; sleep 10; echo end", timeout=1)
+        self.assertEqual(raised.exception.stdout, "start\n")
+
+        session = self.pool._idle["kind-control-plane"][0]
+        self.assertTrue(session.alive)
+        self.assertEqual(self.pool.run("kind-control-plane", "echo again"), (0, "again\n", ""))
+
+    def test_unavailable(self):
+        with mock.patch.dict(os.environ, {"PATH": ""}):
+            with self.assertRaises(ShellUnavailable):
+                self.pool.run("kind-control-plane", "echo hi")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import unittest
+from aiopslab.service.stateful_shell import BoundedOutput, StatefulShell, run_streaming
+
+
+class TestBoundedOutput(unittest.TestCase):
+    def test_keeps_head_and_tail(self):
+        sink = BoundedOutput(max_bytes=8)
+        sink.write(b"abcd")
+        sink.write(b"0123456789")
+        sink.write(b"wxyz")
+        self.assertEqual(sink.truncated, 10)
+        self.assertEqual(sink.getvalue(), "abcd\n... [10 bytes truncated] ...\nwxyz")
+
+    def test_small_output_untouched(self):
+        sink = BoundedOutput(max_bytes=8)
+        sink.write(b"abcdefgh")
+        self.assertEqual(sink.getvalue(), "abcdefgh")
+
+
+class TestStatefulShell(unittest.TestCase):
+    def test_timeout_returns_partial_output(self):
+        result = run_streaming("echo start; sleep 5; echo end", timeout=0.5)
+        self.assertTrue(result.timed_out)
+        self.assertEqual(result.stdout, "start\n")
+
+    def test_cwd_and_env_persist(self):
+        shell = StatefulShell()
+        try:
+            shell.run("cd / && export AIOPSLAB_TEST=1")
+            result = shell.run("pwd; echo $AIOPSLAB_TEST")
+            self.assertEqual(result.stdout, "/\n1\n")
+        finally:
+            shell.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
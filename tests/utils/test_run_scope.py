@@ -0,0 +1,51 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import threading
+import unittest
+from aiopslab.utils.run_scope import (
+    bind_run_scope,
+    run_scope,
+    run_namespace,
+    run_scoped,
+    base_namespace,
+)
+
+
+class TestRunScope(unittest.TestCase):
+    def test_no_scope(self):
+        self.assertEqual(run_namespace("test-social-network"), "test-social-network")
+        self.assertEqual(run_scoped("wrk2-job"), "wrk2-job")
+        self.assertEqual(base_namespace("test-social-network"), "test-social-network")
+
+    def test_scoped_namespace(self):
+        with run_scope("ab12"):
+            ns = run_namespace("test-hotel-reservation")
+            self.assertEqual(ns, "test-hotel-reservation-ab12")
+            self.assertEqual(run_namespace(ns), ns)
+            self.assertEqual(base_namespace(ns), "test-hotel-reservation")
+            self.assertEqual(run_scoped("wrk2-job"), "wrk2-job-ab12")
+
+        self.assertEqual(run_namespace("test-hotel-reservation"), "test-hotel-reservation")
+
+    def test_shared_namespaces(self):
+        with run_scope("ab12"):
+            self.assertEqual(run_namespace("docker"), "docker")
+            self.assertEqual(run_namespace("observe"), "observe")
+
+    def test_bound_callback_outside_scope(self):
+        with run_scope("ab12"):
+            callback = bind_run_scope(lambda: run_scoped("chaos"))
+
+        # e.g. an atexit handler, or a worker thread that doesn't inherit the context
+        self.assertEqual(callback(), "chaos-ab12")
+        results = []
+        thread = threading.Thread(target=lambda: results.append(callback()))
+        thread.start()
+        thread.join()
+        self.assertEqual(results, ["chaos-ab12"])
+        self.assertEqual(run_scoped("chaos"), "chaos")
+
+
+if __name__ == "__main__":
+    unittest.main()